@@ -0,0 +1,49 @@
+"""Combat session store
+
+Revision ID: 003
+Revises: 35591c12dc29
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '35591c12dc29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'combat_sessions',
+        sa.Column('session_id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('spawn_id', sa.Integer(), nullable=False),
+        sa.Column('enemy_id', sa.Integer(), nullable=False),
+        sa.Column('enemy_level', sa.Integer(), nullable=False),
+        sa.Column('enemy_hp', sa.Integer(), nullable=False),
+        sa.Column('enemy_max_hp', sa.Integer(), nullable=False),
+        sa.Column('enemy_attack', sa.Integer(), nullable=False),
+        sa.Column('enemy_defense', sa.Integer(), nullable=False),
+        sa.Column('enemy_crit_chance', sa.Float(), nullable=False),
+        sa.Column('xp_reward', sa.Integer(), nullable=False),
+        sa.Column('coin_reward', sa.Integer(), nullable=False),
+        sa.Column('turn', sa.Integer(), nullable=False),
+        sa.Column('rng_seed', sa.BigInteger(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('session_id')
+    )
+    op.create_index(op.f('ix_combat_sessions_user_id'), 'combat_sessions', ['user_id'], unique=False)
+    op.create_index(op.f('ix_combat_sessions_expires_at'), 'combat_sessions', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_combat_sessions_expires_at'), table_name='combat_sessions')
+    op.drop_index(op.f('ix_combat_sessions_user_id'), table_name='combat_sessions')
+    op.drop_table('combat_sessions')
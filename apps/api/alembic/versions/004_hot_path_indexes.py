@@ -0,0 +1,51 @@
+"""Indexes for zone-scoped entities and per-user lookups
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Zone-scoped entity lookups scanned the whole table
+    for table in ('enemy_spawns', 'npcs', 'world_chests'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_index(op.f(f'ix_{table}_zone_id'), ['zone_id'], unique=False)
+
+    # Expired-session sweep filters on (user_id, expires_at)
+    with op.batch_alter_table('combat_sessions') as batch_op:
+        batch_op.create_index('ix_combat_sessions_user_id_expires_at', ['user_id', 'expires_at'], unique=False)
+        batch_op.drop_index('ix_combat_sessions_user_id')
+
+    # uq_user_item / uq_user_chest already index (user_id, ...), so the
+    # single-column user_id indexes only cost writes
+    with op.batch_alter_table('player_inventory') as batch_op:
+        batch_op.drop_index('ix_player_inventory_user_id')
+    with op.batch_alter_table('chest_progress') as batch_op:
+        batch_op.drop_index('ix_chest_progress_user_id')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('chest_progress') as batch_op:
+        batch_op.create_index('ix_chest_progress_user_id', ['user_id'], unique=False)
+    with op.batch_alter_table('player_inventory') as batch_op:
+        batch_op.create_index('ix_player_inventory_user_id', ['user_id'], unique=False)
+
+    with op.batch_alter_table('combat_sessions') as batch_op:
+        batch_op.create_index('ix_combat_sessions_user_id', ['user_id'], unique=False)
+        batch_op.drop_index('ix_combat_sessions_user_id_expires_at')
+
+    for table in ('world_chests', 'npcs', 'enemy_spawns'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_index(op.f(f'ix_{table}_zone_id'))
@@ -9,12 +9,72 @@ class Settings(BaseSettings):
 
     # Database (defaults to SQLite for easy local dev, use PostgreSQL in production)
     DATABASE_URL: str = "sqlite:///./codingcrazy.db"
+    # Optional explicit async URL; derived from DATABASE_URL (asyncpg / aiosqlite) when unset
+    ASYNC_DATABASE_URL: str | None = None
+    # Read replicas (sessions read from one until they write, then stick to the primary)
+    DATABASE_REPLICA_URLS: list[str] = []
+
+    # Connection pool, per engine and per worker process (in-memory SQLite ignores the sizing)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # Seconds to wait for a free connection before erroring
+    DB_POOL_RECYCLE: int = 1800  # Seconds; reconnect before server or proxy idle timeouts
+    DB_POOL_PRE_PING: bool = True
+
+    # SQLite tuning (ignored for other databases)
+    SQLITE_WAL: bool = True  # WAL + synchronous=NORMAL + one writer per database file; False = driver defaults
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_WRITE_GATE_TIMEOUT_MS: int = 2000  # Queueing for the writer gate; a write waits at most this plus busy_timeout
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_MMAP_SIZE_MB: int = 256
+
+    # Per-request SQL stats (Server-Timing header; one log line when a threshold is crossed)
+    QUERY_STATS_ENABLED: bool = True
+    QUERY_STATS_TOP_N: int = 3
+    SLOW_QUERY_MS: float = 100
+    SLOW_REQUEST_DB_MS: float = 250
+    SLOW_REQUEST_QUERY_COUNT: int = 25
+
+    # Sampling profiler (opt-in; folded stacks of requests slower than the threshold)
+    PROFILE_SAMPLE_RATE: float = 0.0  # Fraction of requests to sample, 0 = off
+    PROFILE_INTERVAL_MS: float = 5
+    PROFILE_THRESHOLD_MS: float = 500
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_MAX_FILES: int = 100
+
+    # Game content catalog cache (0 = only rebuild on invalidation; set for multi-worker reseeds)
+    CATALOG_TTL_SECONDS: int = 0
+
+    # Player progression (XP table is precomputed up to this level)
+    MAX_PLAYER_LEVEL: int = 100
+
+    # Combat sessions ("memory" per process, or "database" for multi-worker deployments)
+    COMBAT_SESSION_BACKEND: str = "memory"
+    COMBAT_SESSION_TTL_SECONDS: int = 15 * 60
+    COMBAT_SESSION_MAX: int = 10000  # LRU bound for the memory backend
+
+    # Position write-behind (/world/move is flushed in batches; interval 0 = write every move)
+    POSITION_FLUSH_INTERVAL_SECONDS: float = 1.0
+    POSITION_FLUSH_MAX_PENDING: int = 500
+    WS_MOVE_COALESCE_MS: int = 50  # /ws/world: moves within this window after an update are merged
 
     # Auth
     SECRET_KEY: str = "dev-secret-key-change-in-production-must-be-at-least-32-chars"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
 
+    # Password hashing (bcrypt runs on its own bounded pool; 503 once the queue is full)
+    BCRYPT_ROUNDS: int = 12  # Used until startup calibration picks a cost
+    BCRYPT_TARGET_MS: int = 250  # Calibration target per hash; 0 keeps BCRYPT_ROUNDS
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_MAX_ROUNDS: int = 16
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE: int = 16  # Waiting hashes allowed beyond the running ones
+
+    # Identity cache (verified tokens and user rows; user TTL 0 = always reload the row)
+    AUTH_CACHE_MAX: int = 10000
+    AUTH_USER_TTL_SECONDS: int = 5  # Snapshots are version-checked before a write, so the TTL only bounds read staleness
+
     # Cookie settings
     COOKIE_NAME: str = "codingcrazy_session"
     COOKIE_SECURE: bool = False  # Set True in production
@@ -1,15 +1,224 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import asyncio
+import os
+import random
+import re
+import threading
+import weakref
+
+from sqlalchemy import TextClause, create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
+from sqlalchemy.util import await_only
 from app.core.config import settings
 
 
-# Handle SQLite vs PostgreSQL connection args
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+def get_async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver (asyncpg / aiosqlite)"""
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://") or url.startswith("sqlite+pysqlite://"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    return url
+
+
+_WRITE_STATEMENT = re.compile(r"\s*(INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+_GATE_KEY = "sqlite_write_gate_release"
+
+
+class SQLiteWriteGate:
+    """
+    Lets one transaction per database file write at a time.
+
+    pysqlite and aiosqlite only send BEGIN right before the first write, so the
+    gate is taken there and held until commit/rollback: writers queue here
+    instead of polling in SQLite's busy handler, and reads never wait. The sync
+    and async engines on a file share one gate (a threading lock; async callers
+    wait for it in a worker thread so the event loop keeps running). A writer
+    that waits longer than SQLITE_WRITE_GATE_TIMEOUT_MS goes ahead and leaves it
+    to SQLite's own locking, so a transaction can't deadlock on the gate.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    def acquire(self, is_async: bool):
+        """Returns the release callable, or None if the wait timed out"""
+        if self._lock.acquire(blocking=False):
+            return self._lock.release
+        if is_async:
+            return await_only(self._acquire_async())
+        return self._lock.release if self._lock.acquire(timeout=self.timeout) else None
+
+    async def _acquire_async(self):
+        waiter = asyncio.get_running_loop().run_in_executor(None, self._lock.acquire, True, self.timeout)
+        try:
+            acquired = await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            # The thread may still get the lock after we stop waiting; hand it straight back
+            waiter.add_done_callback(lambda done: done.result() and self._lock.release())
+            raise
+        return self._lock.release if acquired else None
+
+
+# One gate per database file, shared by every engine configured for it
+_write_gates: weakref.WeakValueDictionary[str, SQLiteWriteGate] = weakref.WeakValueDictionary()
+_write_gates_lock = threading.Lock()
+
+
+def _write_gate(engine: Engine) -> SQLiteWriteGate:
+    timeout = settings.SQLITE_WRITE_GATE_TIMEOUT_MS / 1000
+    database = engine.url.database
+    if database in (None, "", ":memory:"):
+        return SQLiteWriteGate(timeout)  # Each connection has its own in-memory database
+    key = os.path.realpath(database)
+    with _write_gates_lock:
+        gate = _write_gates.get(key)
+        if gate is None:
+            gate = _write_gates[key] = SQLiteWriteGate(timeout)
+        return gate
+
+
+def configure_sqlite(engine: Engine) -> SQLiteWriteGate:
+    """WAL pragmas on every new connection plus the file's single-writer gate (pass AsyncEngine.sync_engine for async)"""
+    gate = _write_gate(engine)
+    is_async = engine.dialect.is_async
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; only the last commits can be lost on power failure
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+        cursor.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _take_gate(conn, cursor, statement, parameters, context, executemany):
+        if _GATE_KEY not in conn.info and _WRITE_STATEMENT.match(statement):
+            release = gate.acquire(is_async)
+            if release is not None:
+                conn.info[_GATE_KEY] = release
+
+    def _release(info: dict, end=None) -> None:
+        release = info.pop(_GATE_KEY, None)
+        if release is None:
+            return
+        try:
+            if end is not None:
+                end()  # Finish the transaction before the next writer starts; the engine's own call is then a no-op
+        finally:
+            release()
 
-engine = create_engine(settings.DATABASE_URL, echo=settings.DEBUG, connect_args=connect_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # The commit/rollback events fire before the DBAPI call, so end the transaction here
+    event.listen(engine, "commit", lambda conn: _release(conn.info, conn.connection.commit))
+    event.listen(engine, "rollback", lambda conn: _release(conn.info, conn.connection.rollback))
+    # Connections returned without an explicit commit/rollback (reset on return)
+    event.listen(engine, "checkin", lambda dbapi_connection, record: _release(record.info))
+    return gate
+
+
+def engine_options(url: str) -> dict:
+    """create_engine / create_async_engine keyword arguments for `url` from the pool settings"""
+    options = {
+        "echo": settings.DEBUG,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.get_driver_name() != "aiosqlite":
+            options["connect_args"] = {"check_same_thread": False}
+        if parsed.database in (None, "", ":memory:"):
+            return options  # In-memory SQLite uses a single-connection pool with no sizing
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+def _is_write(clause) -> bool:
+    if clause is None:
+        return False
+    if getattr(clause, "is_dml", False) or getattr(clause, "_for_update_arg", None) is not None:
+        return True
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().upper().startswith("SELECT")
+    return False
+
+
+class RoutingSession(Session):
+    """
+    Reads go to one replica (picked per session so a request sees one
+    consistent copy) until the session writes; from then on every statement
+    goes to the primary, so a request always reads its own writes. Writes
+    are flushes, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE and non-SELECT text.
+    """
+
+    def __init__(self, primary: Engine, replicas: list[Engine], **kwargs):
+        super().__init__(**kwargs)
+        self.primary = primary
+        self.replica = random.choice(replicas) if replicas else primary
+        self.sticky = not replicas
+
+    def use_primary(self) -> None:
+        """Send the rest of this session to the primary (e.g. right after another request's write)"""
+        self.sticky = True
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if not self.sticky and (self._flushing or _is_write(clause)):
+            self.sticky = True
+        return self.primary if self.sticky else self.replica
+
+
+# Sync engine - used by Alembic, seed scripts and the non-gameplay routers
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+
+# Async engine - used by the hot gameplay routers so they don't occupy threadpool workers
+async_database_url = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(async_database_url, **engine_options(async_database_url))
+
+# Read replicas; without any, sessions are plain and bound to the primary
+replica_engines = [create_engine(url, **engine_options(url)) for url in settings.DATABASE_REPLICA_URLS]
+async_replica_engines = [
+    create_async_engine(url, **engine_options(url))
+    for url in map(get_async_database_url, settings.DATABASE_REPLICA_URLS)
+]
+
+if settings.SQLITE_WAL:
+    for sqlite_engine in [engine, *replica_engines] + [e.sync_engine for e in (async_engine, *async_replica_engines)]:
+        if sqlite_engine.dialect.name == "sqlite":
+            configure_sqlite(sqlite_engine)
+
+# Responses are built after the request's single commit (deps.get_unit_of_work),
+# so objects keep their loaded state instead of being expired and reloaded
+if not replica_engines:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,  # Attributes must stay loaded: lazy refresh can't run outside a greenlet
+    )
+else:
+    SessionLocal = sessionmaker(
+        class_=RoutingSession,
+        primary=engine,
+        replicas=replica_engines,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        sync_session_class=RoutingSession,
+        primary=async_engine.sync_engine,
+        replicas=[e.sync_engine for e in async_replica_engines],
+        autoflush=False,
+        expire_on_commit=False,
+    )
 
 
 class Base(DeclarativeBase):
@@ -22,3 +231,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,11 +1,17 @@
+import time
 from typing import Annotated
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import Depends, HTTPException, status, Request, WebSocket
+from fastapi.requests import HTTPConnection
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import RoutingSession, get_db, get_async_db
 from app.core.config import settings
-from app.core.security import decode_access_token
+from app.core.identity_cache import identity_cache
+from app.core.metrics import record_pool_wait
 from app.models.user import User
+from app.services.catalog import Catalog, catalog_service
 
 # DEV MODE: Skip authentication during development
 DEV_MODE = True
@@ -18,24 +24,134 @@ def get_or_create_dev_user(db: Session) -> User:
         dev_user = db.query(User).first()
     if not dev_user:
         # Create dev user if none exists
-        from app.core.security import get_password_hash
+        from app.core.hashing import password_hasher
         dev_user = User(
             email="dev@test.com",
-            password_hash=get_password_hash("dev"),
+            password_hash=password_hasher.hash_blocking("dev"),
             is_admin=True,
         )
         db.add(dev_user)
-        db.commit()
-        db.refresh(dev_user)
+        db.commit()  # Not part of the request's unit of work: the user is cached right away
     return dev_user
 
 
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
-    """Get current user from session cookie"""
-    # DEV MODE: Return dev user without auth
-    if DEV_MODE:
-        return get_or_create_dev_user(db)
+async def get_or_create_dev_user_async(db: AsyncSession) -> User:
+    """Async variant of get_or_create_dev_user"""
+    dev_user = await db.get(User, 1)
+    if not dev_user:
+        dev_user = (await db.execute(select(User).limit(1))).scalar_one_or_none()
+    if not dev_user:
+        from app.core.hashing import password_hasher
+        dev_user = User(
+            email="dev@test.com",
+            password_hash=await password_hasher.hash("dev"),
+            is_admin=True,
+        )
+        db.add(dev_user)
+        await db.commit()
+    return dev_user
+
+
+def get_dev_user(db: Session) -> User:
+    """DEV_MODE user, served from the identity cache after the first lookup"""
+    if identity_cache.dev_user_id is not None:
+        user = identity_cache.get_user(db, identity_cache.dev_user_id)
+        if user is not None:
+            return user
+    user = get_or_create_dev_user(db)
+    identity_cache.dev_user_id = user.id
+    identity_cache.remember(user)
+    return user
+
+
+async def get_dev_user_async(db: AsyncSession) -> User:
+    """Async variant of get_dev_user"""
+    if identity_cache.dev_user_id is not None:
+        user = await identity_cache.get_user_async(db, identity_cache.dev_user_id)
+        if user is not None:
+            return user
+    user = await get_or_create_dev_user_async(db)
+    identity_cache.dev_user_id = user.id
+    identity_cache.remember(user)
+    return user
+
+
+_READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _uses_unit_of_work(dependant) -> bool:
+    return any(
+        dep.call in (get_unit_of_work, get_async_unit_of_work) or _uses_unit_of_work(dep)
+        for dep in dependant.dependencies
+    )
+
+
+def _route_writes(route) -> bool:
+    dependant = getattr(route, "dependant", None)
+    return dependant is not None and _uses_unit_of_work(dependant)
+
+
+def _route_to_primary(connection: HTTPConnection, db: Session) -> None:
+    """
+    With read replicas, everything a mutating request (non-GET, or any route
+    with a unit of work) reads goes to the primary from its first statement:
+    those reads feed the values it writes back, so replica lag would turn
+    into lost updates. Only read-only GETs use a replica.
+    """
+    if not isinstance(db, RoutingSession) or db.sticky:
+        return
+    scope = connection.scope
+    if scope["type"] != "http" or scope["method"] not in _READ_METHODS or _route_writes(scope.get("route")):
+        db.use_primary()
+
+
+def get_request_db(connection: HTTPConnection, db: Session = Depends(get_db)) -> Session:
+    """
+    The request's session, routed to the primary for requests that write. Its
+    connection is checked out here so the pool wait is recorded (db_pool_wait_seconds).
+    """
+    _route_to_primary(connection, db)
+    started = time.perf_counter()
+    bound = db.connection()
+    record_pool_wait(bound.engine.pool, time.perf_counter() - started)
+    return db
+
+
+async def get_request_async_db(connection: HTTPConnection, db: AsyncSession = Depends(get_async_db)) -> AsyncSession:
+    """Async variant of get_request_db"""
+    _route_to_primary(connection, db.sync_session)
+    started = time.perf_counter()
+    bound = await db.connection()
+    record_pool_wait(bound.sync_engine.pool, time.perf_counter() - started)
+    return db
+
+
+def get_unit_of_work(db: Session = Depends(get_request_db)):
+    """
+    The request's transaction: handlers only add/flush and it is committed once
+    after the handler returns (before the response is sent), or rolled back if
+    the handler raised. Used with scope="function" so a failed commit is a 500.
+    """
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    db.commit()
 
+
+async def get_async_unit_of_work(db: AsyncSession = Depends(get_request_async_db)):
+    """Async variant of get_unit_of_work"""
+    try:
+        yield db
+    except Exception:
+        await db.rollback()
+        raise
+    await db.commit()
+
+
+def get_token_user_id(request: Request | WebSocket) -> int:
+    """Extract the user id from the session cookie, raising 401 if missing or invalid"""
     token = request.cookies.get(settings.COOKIE_NAME)
     if not token:
         raise HTTPException(
@@ -43,7 +159,7 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
             detail="Not authenticated"
         )
 
-    payload = decode_access_token(token)
+    payload = identity_cache.claims(token)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -57,7 +173,33 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
             detail="Invalid token payload"
         )
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    return int(user_id)
+
+
+def get_current_user(request: Request, db: Session = Depends(get_request_db)) -> User:
+    """Get current user from session cookie"""
+    # DEV MODE: Return dev user without auth
+    if DEV_MODE:
+        return get_dev_user(db)
+
+    user_id = get_token_user_id(request)
+    user = identity_cache.get_user(db, user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+
+    return user
+
+
+async def get_current_user_async(request: Request, db: AsyncSession = Depends(get_request_async_db)) -> User:
+    """Get current user from session cookie, loaded through the async session"""
+    if DEV_MODE:
+        return await get_dev_user_async(db)
+
+    user_id = get_token_user_id(request)
+    user = await identity_cache.get_user_async(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,13 +209,25 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     return user
 
 
-def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -> User | None:
+async def get_websocket_user(websocket: WebSocket, db: AsyncSession) -> User | None:
+    """User for a WebSocket handshake (same cookie as HTTP), or None if it must be refused"""
+    if DEV_MODE:
+        return await get_dev_user_async(db)
+
+    try:
+        user_id = get_token_user_id(websocket)
+    except HTTPException:
+        return None
+    return await identity_cache.get_user_async(db, user_id)
+
+
+def get_current_user_optional(request: Request, db: Session = Depends(get_request_db)) -> User | None:
     """Get current user if authenticated, None otherwise"""
     token = request.cookies.get(settings.COOKIE_NAME)
     if not token:
         return None
 
-    payload = decode_access_token(token)
+    payload = identity_cache.claims(token)
     if payload is None:
         return None
 
@@ -81,7 +235,7 @@ def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -
     if user_id is None:
         return None
 
-    return db.query(User).filter(User.id == int(user_id)).first()
+    return identity_cache.get_user(db, int(user_id))
 
 
 def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
@@ -94,8 +248,24 @@ def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
+async def get_catalog(db: AsyncSession = Depends(get_request_async_db)) -> Catalog:
+    """Get the cached game content catalog"""
+    return await catalog_service.get(db)
+
+
+def get_catalog_sync(db: Session = Depends(get_request_db)) -> Catalog:
+    """Get the cached game content catalog (sync routers)"""
+    return catalog_service.get_sync(db)
+
+
 # Type aliases for dependency injection
 CurrentUser = Annotated[User, Depends(get_current_user)]
 OptionalUser = Annotated[User | None, Depends(get_current_user_optional)]
 AdminUser = Annotated[User, Depends(get_admin_user)]
-DbSession = Annotated[Session, Depends(get_db)]
+DbSession = Annotated[Session, Depends(get_unit_of_work, scope="function")]
+
+# Async variants for the gameplay routers (user is bound to the same AsyncSession as AsyncDbSession)
+AsyncDbSession = Annotated[AsyncSession, Depends(get_async_unit_of_work, scope="function")]
+AsyncCurrentUser = Annotated[User, Depends(get_current_user_async)]
+GameCatalog = Annotated[Catalog, Depends(get_catalog)]
+GameCatalogSync = Annotated[Catalog, Depends(get_catalog_sync)]
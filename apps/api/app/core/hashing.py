@@ -0,0 +1,76 @@
+"""
+Bounded executor for bcrypt.
+
+Hashing takes hundreds of milliseconds of CPU, so it runs on a small dedicated
+thread pool instead of the shared request threadpool. At most workers + queue
+hashes can be pending; beyond that callers get PasswordHasherBusy (served as a
+503) immediately rather than piling up behind a signup burst.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.core import security
+from app.core.config import settings
+
+
+class PasswordHasherBusy(Exception):
+    """Every hashing worker is busy and the queue is full"""
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = 2, max_queue: int = 16):
+        self.workers = workers
+        self.limit = workers + max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.limit:
+                raise PasswordHasherBusy()
+            self._pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def _run(self, fn, *args):
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    async def hash(self, password: str) -> str:
+        return await self._run(security.get_password_hash, password)
+
+    def hash_blocking(self, password: str) -> str:
+        """hash() for sync callers; blocks the calling thread, not the event loop"""
+        return self._submit(security.get_password_hash, password).result()
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(security.verify_password, password, hashed_password)
+
+    async def calibrate(self) -> int:
+        """Run bcrypt cost calibration on the hashing pool (called at startup)"""
+        return await asyncio.wrap_future(self._executor.submit(
+            security.calibrate_bcrypt_rounds,
+            settings.BCRYPT_TARGET_MS,
+            settings.BCRYPT_MIN_ROUNDS,
+            settings.BCRYPT_MAX_ROUNDS,
+        ))
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE,
+)
@@ -0,0 +1,226 @@
+"""
+Identity cache for the auth dependencies.
+
+Two per-process LRU maps sit in front of get_current_user:
+
+- token -> verified JWT claims, so the HS256 verify runs once per token; an
+  entry is dropped as soon as its `exp` passes
+- user id -> User column snapshot, re-attached to the request's session with
+  merge(load=False) instead of a SELECT
+
+User snapshots are invalidated when a session commits a change to that user
+(ORM flushes are tracked automatically, Core UPDATEs call mark_user_dirty()).
+Writes made by other processes are only picked up after AUTH_USER_TTL_SECONDS
+(default 5; 0 loads the row on every request). A user served from a snapshot is
+version-checked against its row before it is flushed: if another writer changed
+the row, the flush raises StaleDataError (the unit of work rolls back) instead
+of overwriting the newer values.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.models.user import User
+
+
+# Called as hook(cache, hit) for every lookup; cache is "token" or "user"
+MetricsHook = Callable[[str, bool], None]
+
+_USER_COLUMNS = tuple(attr.key for attr in inspect(User).column_attrs)
+
+
+class IdentityCache:
+    def __init__(self, max_entries: int = 10000, user_ttl_seconds: int = 0):
+        self.max_entries = max_entries
+        self.user_ttl_seconds = user_ttl_seconds
+        self.dev_user_id: int | None = None
+        self.hits = {"token": 0, "user": 0}
+        self.misses = {"token": 0, "user": 0}
+        self._tokens: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._users: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+        self._generation = 0
+        self._hooks: list[MetricsHook] = []
+        self._lock = threading.Lock()
+
+    # --- metrics ---
+
+    def add_metrics_hook(self, hook: MetricsHook) -> None:
+        self._hooks.append(hook)
+
+    def _record(self, cache: str, hit: bool) -> None:
+        (self.hits if hit else self.misses)[cache] += 1
+        for hook in self._hooks:
+            hook(cache, hit)
+
+    def hit_rate(self, cache: str) -> float:
+        total = self.hits[cache] + self.misses[cache]
+        return self.hits[cache] / total if total else 0.0
+
+    # --- tokens ---
+
+    def claims(self, token: str) -> dict[str, Any] | None:
+        """Verified claims for a token, or None if it is invalid or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._tokens.get(token)
+            if entry is not None:
+                expires_at, claims = entry
+                if expires_at > now:
+                    self._tokens.move_to_end(token)
+                    self._record("token", True)
+                    return claims
+                del self._tokens[token]
+        self._record("token", False)
+
+        claims = decode_access_token(token)
+        if claims is None:
+            return None
+        expires_at = claims.get("exp", float("inf"))
+        with self._lock:
+            self._tokens[token] = (expires_at, claims)
+            while len(self._tokens) > self.max_entries:
+                self._tokens.popitem(last=False)
+        return claims
+
+    # --- users ---
+
+    def _snapshot(self, user_id: int) -> dict | None:
+        if self.user_ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            loaded_at, values = entry
+            if time.monotonic() - loaded_at > self.user_ttl_seconds:
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+            return values
+
+    def _store(self, user: User, generation: int) -> None:
+        if self.user_ttl_seconds <= 0:
+            return
+        values = {key: getattr(user, key) for key in _USER_COLUMNS}
+        with self._lock:
+            # Don't cache a row that was read before a concurrent invalidation
+            if generation != self._generation:
+                return
+            self._users[user.id] = (time.monotonic(), values)
+            self._users.move_to_end(user.id)
+            while len(self._users) > self.max_entries:
+                self._users.popitem(last=False)
+
+    def _detached(self, db: Session | AsyncSession, values: dict) -> User:
+        user = User(**values)
+        make_transient_to_detached(user)
+        db.info.setdefault("snapshot_users", {})[user.id] = self  # Version-checked on flush
+        return user
+
+    def get_user(self, db: Session, user_id: int) -> User | None:
+        """User attached to `db`, from the snapshot when possible"""
+        values = self._snapshot(user_id)
+        if values is not None:
+            self._record("user", True)
+            return db.merge(self._detached(db, values), load=False)
+        self._record("user", False)
+
+        generation = self._generation
+        user = db.get(User, user_id)
+        if user is not None:
+            self._store(user, generation)
+        return user
+
+    async def get_user_async(self, db: AsyncSession, user_id: int) -> User | None:
+        """Async variant of get_user"""
+        values = self._snapshot(user_id)
+        if values is not None:
+            self._record("user", True)
+            return await db.merge(self._detached(db, values), load=False)
+        self._record("user", False)
+
+        generation = self._generation
+        user = await db.get(User, user_id)
+        if user is not None:
+            self._store(user, generation)
+        return user
+
+    def remember(self, user: User) -> None:
+        """Cache a user loaded outside get_user (e.g. the DEV_MODE lookup)"""
+        self._store(user, self._generation)
+
+    # --- invalidation ---
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._tokens.clear()
+            self._users.clear()
+            self.dev_user_id = None
+
+
+identity_cache = IdentityCache(
+    max_entries=settings.AUTH_CACHE_MAX,
+    user_ttl_seconds=settings.AUTH_USER_TTL_SECONDS,
+)
+
+
+def mark_user_dirty(db: Session | AsyncSession, user_id: int) -> None:
+    """Invalidate this user's snapshot when `db` commits (for writes that bypass the ORM)"""
+    db.info.setdefault("dirty_user_ids", set()).add(user_id)
+
+
+def _committed_value(user: User, key: str) -> Any:
+    history = inspect(user).attrs[key].history
+    values = history.deleted or history.unchanged
+    return values[0] if values else None
+
+
+@event.listens_for(Session, "before_flush")
+def _check_snapshot_users(session, flush_context, instances):
+    """Refuse to flush a snapshot-served user whose row changed since the snapshot"""
+    snapshot_users = session.info.get("snapshot_users")
+    if not snapshot_users:
+        return
+    for obj in session.dirty:
+        if not (isinstance(obj, User) and obj.id in snapshot_users and session.is_modified(obj)):
+            continue
+        cache = snapshot_users.pop(obj.id)  # Checked once; the row is ours from here on
+        row = session.connection().execute(
+            select(*(getattr(User, key) for key in _USER_COLUMNS)).where(User.id == obj.id)
+        ).mappings().first()
+        if row is None or any(row[key] != _committed_value(obj, key) for key in _USER_COLUMNS):
+            cache.invalidate_user(obj.id)
+            raise StaleDataError(f"User {obj.id} was changed by another writer since it was cached")
+
+
+@event.listens_for(Session, "after_flush")
+def _track_user_writes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            session.info.setdefault("dirty_user_ids", set()).add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    for user_id in session.info.pop("dirty_user_ids", ()):
+        identity_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("dirty_user_ids", None)
+    session.info.pop("snapshot_users", None)
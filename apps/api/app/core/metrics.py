@@ -0,0 +1,307 @@
+"""
+Prometheus-style metrics without a client library.
+
+Counters and histograms keep one shard per thread, so recording is a plain
+dict/list update on the caller's own shard with no lock; the lock is only
+taken the first time a thread records anything. /metrics sums the shards and
+reads gauges (pool status, threadpool limiter) at scrape time.
+
+Recorded:
+- http_requests_total / http_request_errors_total / http_request_duration_seconds
+  per method and route template (unmatched paths share one label)
+- db_pool_* for every instrumented engine pool: checkouts, connections in use,
+  overflow, time request sessions wait for a connection, and time taken to open
+  new connections
+- threadpool_* for the AnyIO worker limiter used by sync routes
+- identity_cache_lookups_total from the identity cache hook
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# Seconds; fixed so histograms aggregate across processes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+GaugeCallback = Callable[[], Iterable[tuple[dict[str, str], float]]]
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Sharded:
+    """Per-thread storage; only the owning thread writes to its shard"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshots(self) -> list[dict]:
+        with self._lock:
+            shards = list(self._shards)
+        return [shard.copy() for shard in shards]
+
+
+class Counter(_Sharded):
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__()
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> dict[tuple, float]:
+        totals: dict[tuple, float] = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram(_Sharded):
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__()
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels) -> None:
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            # One slot per bucket plus +Inf, then the sum
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def values(self) -> dict[tuple, list]:
+        totals: dict[tuple, list] = {}
+        for shard in self._snapshots():
+            for labels, counts in shard.items():
+                counts = list(counts)
+                merged = totals.get(labels)
+                totals[labels] = counts if merged is None else [a + b for a, b in zip(merged, counts)]
+        return totals
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, counts in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {counts[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Read at scrape time from a callback returning (labels, value) pairs"""
+
+    def __init__(self, name: str, help: str, callback: GaugeCallback):
+        self.name = name
+        self.help = help
+        self.callback = callback
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.callback():
+            names = tuple(labels)
+            lines.append(f"{self.name}{_format_labels(names, tuple(labels[n] for n in names))} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[Counter | Histogram | Gauge] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, callback: GaugeCallback) -> Gauge:
+        return self.register(Gauge(name, help, callback))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter("http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+http_errors = registry.counter("http_request_errors_total", "HTTP requests that raised or returned 5xx", ("method", "route"))
+http_latency = registry.histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+
+pool_checkouts = registry.counter("db_pool_checkouts_total", "Connections checked out of the pool", ("pool",))
+pool_checkins = registry.counter("db_pool_checkins_total", "Connections returned to the pool", ("pool",))
+pool_wait = registry.histogram("db_pool_wait_seconds", "Time a request session waited for a pooled connection", ("pool",))
+pool_connect = registry.histogram("db_pool_connect_seconds", "Time taken to open a new database connection", ("pool",))
+
+identity_cache_lookups = registry.counter("identity_cache_lookups_total", "Identity cache lookups", ("cache", "result"))
+
+
+# --- HTTP ---
+
+def _route_label(scope: Scope) -> str:
+    """Route template with its include prefix, e.g. /api/npcs/{npc_id}"""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    path = scope["path"]
+    # Routes from included routers may report their path without the include prefix
+    if not route.path_regex.match(path):
+        for i in range(1, len(path)):
+            if path[i] == "/" and route.path_regex.match(path[i:]):
+                return path[:i] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Counts and times every HTTP request by its route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException:
+            status_code = 500
+            raise
+        finally:
+            method, route = scope["method"], _route_label(scope)
+            http_latency.observe(time.perf_counter() - started, method, route)
+            http_requests.inc(method, route, str(status_code))
+            if status_code >= 500:
+                http_errors.inc(method, route)
+
+
+# --- Database pools ---
+
+_pools: dict[str, Pool] = {}
+
+
+def instrument_pool(name: str, engine: Engine) -> None:
+    """Track checkouts, in-use connections and connect time for an engine's pool (AsyncEngine.sync_engine for async)"""
+    if name in _pools:
+        return
+    pool = _pools[name] = engine.pool
+
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_checkouts.inc(name)
+
+    @event.listens_for(pool, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        pool_checkins.inc(name)
+
+    # do_connect runs right before the driver connects, the pool's connect event right after
+    @event.listens_for(engine, "do_connect")
+    def _connect_started(dialect, connection_record, cargs, cparams):
+        connection_record.info["connect_started"] = time.perf_counter()
+
+    @event.listens_for(pool, "connect")
+    def _connected(dbapi_connection, connection_record):
+        started = connection_record.info.pop("connect_started", None)
+        if started is not None:
+            pool_connect.observe(time.perf_counter() - started, name)
+
+
+def record_pool_wait(pool: Pool, seconds: float) -> None:
+    """Record how long a checkout from `pool` took; pools that aren't instrumented are ignored"""
+    for name, instrumented in _pools.items():
+        if instrumented is pool:
+            pool_wait.observe(seconds, name)
+            return
+
+
+def _pool_status(method_name: str) -> GaugeCallback:
+    def read():
+        for name, pool in _pools.items():
+            method = getattr(pool, method_name, None)
+            if callable(method):
+                yield {"pool": name}, method()
+    return read
+
+
+registry.gauge("db_pool_connections_in_use", "Connections currently checked out", _pool_status("checkedout"))
+registry.gauge("db_pool_size", "Configured pool size", _pool_status("size"))
+registry.gauge("db_pool_overflow", "Connections opened beyond pool_size", _pool_status("overflow"))
+registry.gauge("db_pool_checked_in", "Idle connections in the pool", _pool_status("checkedin"))
+
+
+# --- Threadpool ---
+
+def _threadpool_stats():
+    # Only meaningful on the event loop thread, which is where /metrics renders
+    from anyio.to_thread import current_default_thread_limiter
+    try:
+        limiter = current_default_thread_limiter()
+    except Exception:
+        return  # No event loop in this thread
+    stats = limiter.statistics()
+    yield {"state": "busy"}, stats.borrowed_tokens
+    yield {"state": "limit"}, limiter.total_tokens
+    yield {"state": "waiting"}, stats.tasks_waiting
+
+
+registry.gauge("threadpool_workers", "AnyIO worker threads for sync routes", _threadpool_stats)
+
+
+# --- Identity cache ---
+
+def record_identity_cache(cache: str, hit: bool) -> None:
+    identity_cache_lookups.inc(cache, "hit" if hit else "miss")
@@ -0,0 +1,178 @@
+"""
+Sampling profiler for slow requests (opt-in, stdlib only).
+
+For PROFILE_SAMPLE_RATE of requests, a background thread snapshots every
+thread's stack with sys._current_frames() each PROFILE_INTERVAL_MS while the
+request runs. If the request took at least PROFILE_THRESHOLD_MS the collapsed
+stacks are written in folded format ("root;caller;callee count", readable by
+flamegraph.pl / speedscope) to PROFILE_DIR, keeping the newest
+PROFILE_MAX_FILES. Faster requests are discarded.
+
+All threads are sampled, so async requests that overlap on the event loop show
+up in each other's profiles; frames idle in a wait/select are dropped. With
+nothing being sampled the thread is parked and the middleware only draws one
+random number per request.
+"""
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+# Leaf frames in these files are threads waiting, not working
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+
+PROFILE_NAME = re.compile(r"^\d+-[A-Z]+-[\w]+-\d+ms\.folded$")
+
+
+class StackSampler:
+    """One daemon thread that samples all stacks while any profile is active"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._labels: dict[tuple, str] = {}
+
+    def start(self) -> Counter:
+        stacks = Counter()
+        with self._lock:
+            self._active[id(stacks)] = stacks
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return stacks
+
+    def stop(self, stacks: Counter) -> dict[str, int]:
+        with self._lock:
+            self._active.pop(id(stacks), None)
+            return dict(stacks)
+
+    def _label(self, code, lineno: int) -> str:
+        key = (code, lineno)
+        label = self._labels.get(key)
+        if label is None:
+            label = self._labels[key] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{lineno})"
+        return label
+
+    def _fold(self, frame, thread_name: str) -> str | None:
+        if os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+            return None
+        names = []
+        while frame is not None:
+            names.append(self._label(frame.f_code, frame.f_lineno))
+            frame = frame.f_back
+        names.append(thread_name)
+        return ";".join(reversed(names))
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while True:
+            self._wake.wait()
+            with self._lock:
+                if not self._active:
+                    self._wake.clear()
+                    continue
+            time.sleep(self.interval)
+
+            thread_names = {t.ident: t.name for t in threading.enumerate()}
+            folded = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = self._fold(frame, thread_names.get(thread_id, str(thread_id)))
+                if stack:
+                    folded.append(stack)
+            with self._lock:
+                for stacks in self._active.values():
+                    stacks.update(folded)
+
+
+@dataclass
+class ProfileFile:
+    name: str
+    size: int
+    created_at: datetime
+
+
+class ProfileStore:
+    """Bounded ring of folded-stack files on disk"""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+
+    def write(self, method: str, path: str, duration_ms: float, stacks: dict[str, int]) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"\W+", "_", path).strip("_") or "root"
+        name = f"{time.time_ns() // 1000}-{method}-{slug}-{int(duration_ms)}ms.folded"
+        with open(os.path.join(self.directory, name), "w") as f:
+            for stack, count in sorted(stacks.items()):
+                f.write(f"{stack} {count}\n")
+        self._evict()
+        return name
+
+    def _evict(self) -> None:
+        names = sorted(n for n in os.listdir(self.directory) if PROFILE_NAME.match(n))
+        for name in names[:-self.max_files] if self.max_files else names:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def list(self) -> list[ProfileFile]:
+        if not os.path.isdir(self.directory):
+            return []
+        files = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if PROFILE_NAME.match(name):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append(ProfileFile(name, stat.st_size, datetime.fromtimestamp(stat.st_mtime, timezone.utc)))
+        return files
+
+    def path(self, name: str) -> str | None:
+        """Absolute path of a stored profile, or None (also for names that aren't ours)"""
+        if not PROFILE_NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+sampler = StackSampler(settings.PROFILE_INTERVAL_MS / 1000)
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+
+
+class ProfilerMiddleware:
+    """Profiles a random PROFILE_SAMPLE_RATE of requests and keeps the slow ones"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rate = settings.PROFILE_SAMPLE_RATE
+        if scope["type"] != "http" or not rate or random.random() >= rate:
+            await self.app(scope, receive, send)
+            return
+
+        stacks = sampler.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            collected = sampler.stop(stacks)
+            if duration_ms >= settings.PROFILE_THRESHOLD_MS and collected:
+                await run_in_threadpool(profile_store.write, scope["method"], scope["path"], duration_ms, collected)
@@ -0,0 +1,157 @@
+"""
+Per-request SQL statistics.
+
+Cursor-execute hooks on every Engine (sync and async) time each statement and
+add it to the stats of the request currently running, if any. The middleware
+reports the totals as a `Server-Timing: db;dur=..;desc="N queries"` header and
+logs one JSON line when a request crosses SLOW_REQUEST_DB_MS or
+SLOW_REQUEST_QUERY_COUNT, or runs a statement slower than SLOW_QUERY_MS.
+
+Statements are reported normalized (literals replaced by ?, IN lists and
+whitespace collapsed) so the same query groups together across requests.
+"""
+import heapq
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_NAMED_PARAM = re.compile(r"(?:%\(\w+\)s|:\w+|\$\d+)")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_statement(statement: str) -> str:
+    """Statement text with literals and bind markers replaced by ? for aggregation"""
+    text = _STRING_LITERAL.sub("?", statement)
+    text = _NAMED_PARAM.sub("?", text)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _IN_LIST.sub("IN (?)", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class QueryStats:
+    """Statements executed while handling one request"""
+    __slots__ = ("count", "total_ms", "slowest", "top_n")
+
+    def __init__(self, top_n: int = 3):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest: list[tuple[float, str]] = []  # min-heap of the top_n slowest
+        self.top_n = top_n
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if len(self.slowest) < self.top_n:
+            heapq.heappush(self.slowest, (elapsed_ms, statement))
+        elif elapsed_ms > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (elapsed_ms, statement))
+
+    def top(self) -> list[dict]:
+        return [
+            {"ms": round(ms, 2), "statement": normalize_statement(statement)}
+            for ms, statement in sorted(self.slowest, reverse=True)
+        ]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_ms:.2f};desc="{self.count} queries"'
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> QueryStats | None:
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started")
+    if started:
+        stats.record(statement, (time.perf_counter() - started.pop()) * 1000)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # after_cursor_execute doesn't run for a failed statement; drop its start time
+    conn = context.connection
+    if conn is not None:
+        started = conn.info.get("query_started")
+        if started:
+            started.pop()
+
+
+class QueryStatsMiddleware:
+    """Adds Server-Timing for DB work and logs requests over the slow thresholds"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.QUERY_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(settings.QUERY_STATS_TOP_N)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._log_if_slow(scope, stats, status_code, (time.perf_counter() - started) * 1000)
+
+    @staticmethod
+    def _log_if_slow(scope: Scope, stats: QueryStats, status_code: int, elapsed_ms: float) -> None:
+        slowest_ms = max((ms for ms, _ in stats.slowest), default=0.0)
+        if (
+            stats.total_ms < settings.SLOW_REQUEST_DB_MS
+            and stats.count < settings.SLOW_REQUEST_QUERY_COUNT
+            and slowest_ms < settings.SLOW_QUERY_MS
+        ):
+            return
+        logger.warning(json.dumps({
+            "event": "slow_request_db",
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(elapsed_ms, 2),
+            "db_ms": round(stats.total_ms, 2),
+            "queries": stats.count,
+            "slowest": stats.top(),
+        }, separators=(",", ":")))
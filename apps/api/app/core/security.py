@@ -1,3 +1,5 @@
+import math
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
@@ -7,6 +9,10 @@ import bcrypt
 from app.core.config import settings
 
 
+# Current bcrypt cost; replaced by calibrate_bcrypt_rounds() at startup
+bcrypt_rounds = settings.BCRYPT_ROUNDS
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
         plain_password.encode('utf-8'),
@@ -17,10 +23,43 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(
         password.encode('utf-8'),
-        bcrypt.gensalt()
+        bcrypt.gensalt(rounds=bcrypt_rounds)
     ).decode('utf-8')
 
 
+def hash_rounds(hashed_password: str) -> int | None:
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12)"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Only upgrade: a hash stronger than the calibrated cost is kept"""
+    rounds = hash_rounds(hashed_password)
+    return rounds is None or rounds < bcrypt_rounds
+
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = 10, max_rounds: int = 16) -> int:
+    """
+    Pick the highest bcrypt cost whose hash time stays within target_ms on this
+    machine and make it the current cost. Each extra round doubles the work, so
+    one cheap measurement is enough to extrapolate.
+    """
+    global bcrypt_rounds
+    probe_rounds = 6
+    salt = bcrypt.gensalt(rounds=probe_rounds)
+    start = time.perf_counter()
+    for _ in range(3):
+        bcrypt.hashpw(b"calibration", salt)
+    probe_ms = (time.perf_counter() - start) * 1000 / 3
+
+    rounds = probe_rounds + math.floor(math.log2(target_ms / max(probe_ms, 1e-3)))
+    bcrypt_rounds = min(max(rounds, min_rounds), max_rounds)
+    return bcrypt_rounds
+
+
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -1,11 +1,31 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import settings
-from app.routers import auth, levels, progress, characters, progression, dev, world, combat, inventory, npcs, chests
+from app.core.database import async_engine, async_replica_engines, engine, replica_engines
+from app.core.identity_cache import identity_cache
+from app.core.metrics import MetricsMiddleware, instrument_pool, record_identity_cache, registry
+from app.core.profiler import ProfilerMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.hashing import PasswordHasherBusy, password_hasher
+from app.services.position_buffer import position_buffer
+from app.routers import auth, levels, progress, characters, progression, dev, world, combat, inventory, npcs, chests, catalog, realtime, profiles
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.BCRYPT_TARGET_MS:
+        await password_hasher.calibrate()
+    position_buffer.start()
+    yield
+    await position_buffer.stop()
 
 
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.APP_NAME,
     description="Learn to code by playing - Open World RPG API backend",
     version="0.2.0",
@@ -20,7 +40,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilerMiddleware)
+
+instrument_pool("sync", engine)
+instrument_pool("async", async_engine.sync_engine)
+for index, (replica, async_replica) in enumerate(zip(replica_engines, async_replica_engines)):
+    instrument_pool(f"replica{index}", replica)
+    instrument_pool(f"async_replica{index}", async_replica.sync_engine)
+identity_cache.add_metrics_hook(record_identity_cache)
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many sign-ins right now, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 
 # Include routers
 app.include_router(auth.router, prefix="/api")
@@ -36,6 +77,13 @@ app.include_router(combat.router, prefix="/api")
 app.include_router(inventory.router, prefix="/api")
 app.include_router(npcs.router, prefix="/api")
 app.include_router(chests.router, prefix="/api")
+app.include_router(catalog.router, prefix="/api")
+
+# Admin
+app.include_router(profiles.router, prefix="/api")
+
+# Realtime channels (not under /api)
+app.include_router(realtime.router)
 
 
 @app.get("/health")
@@ -44,6 +92,12 @@ def health_check():
     return {"status": "healthy", "app": settings.APP_NAME}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition (async: the threadpool gauge must be read on the event loop)"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api")
 def api_root():
     """API root endpoint"""
@@ -12,6 +12,7 @@ from app.models.player_inventory import PlayerInventory
 from app.models.npc import NPC
 from app.models.world_chest import WorldChest
 from app.models.chest_progress import ChestProgress
+from app.models.combat_session import CombatSession
 
 __all__ = [
     # Core models
@@ -28,4 +29,5 @@ __all__ = [
     "NPC",
     "WorldChest",
     "ChestProgress",
+    "CombatSession",
 ]
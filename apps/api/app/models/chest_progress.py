@@ -9,7 +9,7 @@ class ChestProgress(Base):
     __tablename__ = "chest_progress"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     chest_id: Mapped[int] = mapped_column(ForeignKey("world_chests.id"), nullable=False)
 
     # When the chest was opened
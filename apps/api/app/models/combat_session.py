@@ -0,0 +1,34 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime, Float, BigInteger, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class CombatSession(Base):
+    """Persisted combat encounter (database backend for the combat session store)"""
+    __tablename__ = "combat_sessions"
+
+    session_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    spawn_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    enemy_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Scaled enemy stats rolled at combat start
+    enemy_level: Mapped[int] = mapped_column(Integer, nullable=False)
+    enemy_hp: Mapped[int] = mapped_column(Integer, nullable=False)
+    enemy_max_hp: Mapped[int] = mapped_column(Integer, nullable=False)
+    enemy_attack: Mapped[int] = mapped_column(Integer, nullable=False)
+    enemy_defense: Mapped[int] = mapped_column(Integer, nullable=False)
+    enemy_crit_chance: Mapped[float] = mapped_column(Float, default=0.05)
+    xp_reward: Mapped[int] = mapped_column(Integer, default=0)
+    coin_reward: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Turn counter and RNG seed (per-turn RNG is derived from both)
+    turn: Mapped[int] = mapped_column(Integer, default=0)
+    rng_seed: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_combat_sessions_user_id_expires_at", "user_id", "expires_at"),
+    )
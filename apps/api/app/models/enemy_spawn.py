@@ -8,7 +8,7 @@ class EnemySpawn(Base):
     __tablename__ = "enemy_spawns"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    zone_id: Mapped[int] = mapped_column(ForeignKey("world_zones.id"), nullable=False)
+    zone_id: Mapped[int] = mapped_column(ForeignKey("world_zones.id"), nullable=False, index=True)
     enemy_id: Mapped[int] = mapped_column(ForeignKey("enemies.id"), nullable=False)
 
     # Spawn position
@@ -14,7 +14,7 @@ class NPC(Base):
     display_name: Mapped[str] = mapped_column(String(100), nullable=False)
 
     # Zone and position
-    zone_id: Mapped[int] = mapped_column(ForeignKey("world_zones.id"), nullable=False)
+    zone_id: Mapped[int] = mapped_column(ForeignKey("world_zones.id"), nullable=False, index=True)
     position_x: Mapped[int] = mapped_column(Integer, nullable=False)
     position_y: Mapped[int] = mapped_column(Integer, nullable=False)
 
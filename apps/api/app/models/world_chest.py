@@ -12,7 +12,7 @@ class WorldChest(Base):
     chest_id: Mapped[str] = mapped_column(String(100), unique=True, index=True, nullable=False)
 
     # Zone and position
-    zone_id: Mapped[int] = mapped_column(ForeignKey("world_zones.id"), nullable=False)
+    zone_id: Mapped[int] = mapped_column(ForeignKey("world_zones.id"), nullable=False, index=True)
     position_x: Mapped[int] = mapped_column(Integer, nullable=False)
     position_y: Mapped[int] = mapped_column(Integer, nullable=False)
 
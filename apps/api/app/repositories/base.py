@@ -0,0 +1,16 @@
+"""Dialect helpers shared by the repositories"""
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def upsert_insert(db: Session | AsyncSession, table):
+    """Dialect-specific INSERT that supports ON CONFLICT (SQLite and PostgreSQL)"""
+    dialect = db.get_bind().dialect.name
+    try:
+        return _INSERTS[dialect](table)
+    except KeyError:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}") from None
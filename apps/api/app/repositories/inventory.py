@@ -0,0 +1,105 @@
+"""
+Set-based writes and fast-path reads on player_inventory.
+
+Statements go straight to the table instead of through loaded ORM objects, so
+each mutation is one round trip and concurrent requests can't lose updates:
+grants are INSERT ... ON CONFLICT DO UPDATE against uq_user_item, removals are
+a guarded UPDATE ... WHERE quantity >= n RETURNING. Listings return plain rows
+from a statement built once, so every call reuses its cached compiled form.
+"""
+from sqlalchemy import Row, bindparam, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import PlayerInventory
+from app.repositories.base import upsert_insert
+
+
+inventory = PlayerInventory.__table__
+
+_STACKS = select(inventory.c.item_id, inventory.c.quantity, inventory.c.is_equipped).where(
+    inventory.c.user_id == bindparam("user_id")
+)
+
+
+def _check_quantity(quantity: int) -> None:
+    if quantity <= 0:
+        raise ValueError(f"Quantity must be positive, got {quantity}")
+
+
+def _upsert(db: AsyncSession, rows: list[dict]):
+    stmt = upsert_insert(db, inventory).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[inventory.c.user_id, inventory.c.item_id],
+        set_={"quantity": inventory.c.quantity + stmt.excluded.quantity},
+    )
+
+
+async def add_item(db: AsyncSession, user_id: int, item_id: int, quantity: int) -> int:
+    """Add to one inventory stack, creating it if needed; returns the new quantity"""
+    _check_quantity(quantity)
+    stmt = _upsert(db, [{"user_id": user_id, "item_id": item_id, "quantity": quantity}])
+    return (await db.execute(stmt.returning(inventory.c.quantity))).scalar_one()
+
+
+async def add_items(db: AsyncSession, user_id: int, quantities: dict[int, int]) -> None:
+    """Add quantities (keyed by Item.id) to a user's inventory in a single statement"""
+    if not quantities:
+        return
+    for quantity in quantities.values():
+        _check_quantity(quantity)
+    # Pending ORM changes to the same rows must land first or they would overwrite the upsert
+    await db.flush()
+    await db.execute(_upsert(db, [
+        {"user_id": user_id, "item_id": item_id, "quantity": quantity}
+        for item_id, quantity in quantities.items()
+    ]))
+
+
+async def remove_item(
+    db: AsyncSession,
+    user_id: int,
+    item_id: int,
+    quantity: int,
+    include_equipped: bool = True,
+) -> int | None:
+    """
+    Take `quantity` off a stack if it holds that many; returns the remaining
+    quantity, or None if nothing was removed. Emptied stacks are deleted.
+    """
+    _check_quantity(quantity)
+    conditions = [
+        inventory.c.user_id == user_id,
+        inventory.c.item_id == item_id,
+        inventory.c.quantity >= quantity,
+    ]
+    if not include_equipped:
+        conditions.append(inventory.c.is_equipped.is_(False))
+
+    remaining = (await db.execute(
+        update(inventory)
+        .where(*conditions)
+        .values(quantity=inventory.c.quantity - quantity)
+        .returning(inventory.c.quantity)
+    )).scalar_one_or_none()
+
+    if remaining == 0:
+        await db.execute(delete(inventory).where(
+            inventory.c.user_id == user_id,
+            inventory.c.item_id == item_id,
+            inventory.c.quantity <= 0,
+        ))
+    return remaining
+
+
+async def stack_is_equipped(db: AsyncSession, user_id: int, item_id: int, quantity: int) -> bool:
+    """After a failed non-equipped removal: True if the stack had enough but is equipped"""
+    row = (await db.execute(select(inventory.c.quantity, inventory.c.is_equipped).where(
+        inventory.c.user_id == user_id,
+        inventory.c.item_id == item_id,
+    ))).one_or_none()
+    return row is not None and row.quantity >= quantity and row.is_equipped
+
+
+async def list_stacks(db: AsyncSession, user_id: int) -> list[Row]:
+    """(item_id, quantity, is_equipped) for every stack the user holds"""
+    return (await db.execute(_STACKS, {"user_id": user_id})).all()
@@ -0,0 +1,48 @@
+"""Atomic writes to level progress, and fast-path reads as plain rows (statements built once, compiled once)"""
+from sqlalchemy import Row, and_, bindparam, select
+from sqlalchemy.orm import Session
+
+from app.models import Level, Progress
+from app.repositories.base import upsert_insert
+
+
+progress = Progress.__table__
+levels = Level.__table__
+
+# Every level in order with this user's attempts/completion (NULL when never played)
+_LEVEL_SUMMARIES = (
+    select(
+        levels.c.id, levels.c.slug, levels.c.title, levels.c.order_index,
+        progress.c.attempts, progress.c.completed_at,
+    )
+    .select_from(levels.outerjoin(progress, and_(
+        progress.c.level_id == levels.c.id,
+        progress.c.user_id == bindparam("user_id"),
+    )))
+    .order_by(levels.c.order_index)
+)
+
+_LEVEL_PROGRESS = select(*progress.c).where(
+    progress.c.user_id == bindparam("user_id"),
+    progress.c.level_id == bindparam("level_id"),
+)
+
+
+def increment_attempts(db: Session, user_id: int, level_id: int):
+    """Bump the attempt count, creating the row on first attempt (upsert on uq_user_level); returns the row"""
+    stmt = upsert_insert(db, progress).values(user_id=user_id, level_id=level_id, attempts=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[progress.c.user_id, progress.c.level_id],
+        set_={"attempts": progress.c.attempts + 1},
+    )
+    return db.execute(stmt.returning(*progress.c)).one()
+
+
+def list_level_summaries(db: Session, user_id: int) -> list[Row]:
+    """One row per level: (id, slug, title, order_index, attempts, completed_at)"""
+    return db.execute(_LEVEL_SUMMARIES, {"user_id": user_id}).all()
+
+
+def get_level_progress(db: Session, user_id: int, level_id: int) -> Row | None:
+    """The user's progress row for one level, or None"""
+    return db.execute(_LEVEL_PROGRESS, {"user_id": user_id, "level_id": level_id}).one_or_none()
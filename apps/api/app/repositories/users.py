@@ -0,0 +1,49 @@
+"""Atomic counter updates on users"""
+from sqlalchemy import case, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.identity_cache import mark_user_dirty
+from app.models import User
+
+
+users = User.__table__
+
+
+async def add_coins(db: AsyncSession, user: User, amount: int) -> int:
+    """Add coins with `coins = coins + :n`; returns (and syncs onto `user`) the new balance"""
+    coins = (await db.execute(
+        update(users).where(users.c.id == user.id)
+        .values(coins=users.c.coins + amount)
+        .returning(users.c.coins)
+    )).scalar_one()
+    set_committed_value(user, "coins", coins)
+    mark_user_dirty(db, user.id)
+    return coins
+
+
+async def spend_coins(db: AsyncSession, user: User, amount: int) -> int | None:
+    """Deduct coins only if the balance covers it; returns the new balance or None"""
+    if amount <= 0:
+        raise ValueError(f"Amount must be positive, got {amount}")
+    coins = (await db.execute(
+        update(users).where(users.c.id == user.id, users.c.coins >= amount)
+        .values(coins=users.c.coins - amount)
+        .returning(users.c.coins)
+    )).scalar_one_or_none()
+    if coins is not None:
+        set_committed_value(user, "coins", coins)
+        mark_user_dirty(db, user.id)
+    return coins
+
+
+async def deduct_coins(db: AsyncSession, user: User, amount: int) -> int:
+    """Deduct up to `amount` coins, clamped at zero in SQL; returns the new balance"""
+    coins = (await db.execute(
+        update(users).where(users.c.id == user.id)
+        .values(coins=case((users.c.coins > amount, users.c.coins - amount), else_=0))
+        .returning(users.c.coins)
+    )).scalar_one()
+    set_committed_value(user, "coins", coins)
+    mark_user_dirty(db, user.id)
+    return coins
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, status, Response
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password, create_access_token
-from app.core.deps import DbSession, CurrentUser
+from app.core.hashing import password_hasher
+from app.core.security import create_access_token, needs_rehash
+from app.core.deps import DEV_MODE, AsyncDbSession, CurrentUser
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, AuthResponse
 
@@ -24,10 +26,10 @@ def set_auth_cookie(response: Response, token: str):
 
 
 @router.post("/signup", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-def signup(user_data: UserCreate, response: Response, db: DbSession):
+async def signup(user_data: UserCreate, response: Response, db: AsyncDbSession):
     """Register a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = (await db.execute(select(User).where(User.email == user_data.email))).scalar_one_or_none()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -37,15 +39,14 @@ def signup(user_data: UserCreate, response: Response, db: DbSession):
     # Create new user
     user = User(
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await password_hasher.hash(user_data.password),
     )
 
     try:
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.flush()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -62,27 +63,31 @@ def signup(user_data: UserCreate, response: Response, db: DbSession):
 
 
 @router.post("/login", response_model=AuthResponse)
-def login(user_data: UserLogin, response: Response, db: DbSession):
+async def login(user_data: UserLogin, response: Response, db: AsyncDbSession):
     """Authenticate a user - DEV MODE: auto-creates user if not exists, accepts any password"""
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = (await db.execute(select(User).where(User.email == user_data.email))).scalar_one_or_none()
 
     # DEV MODE: Auto-create user if doesn't exist
     if not user:
         user = User(
             email=user_data.email,
-            password_hash=get_password_hash(user_data.password),
+            password_hash=await password_hasher.hash(user_data.password),
             is_admin=True  # Make all dev users admin for testing
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
-
-    # DEV MODE: Skip password verification
-    # if not verify_password(user_data.password, user.password_hash):
-    #     raise HTTPException(
-    #         status_code=status.HTTP_401_UNAUTHORIZED,
-    #         detail="Invalid email or password"
-    #     )
+        await db.flush()
+    else:
+        password_ok = await password_hasher.verify(user_data.password, user.password_hash)
+        # DEV MODE: Skip password verification
+        if not password_ok and not DEV_MODE:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid email or password"
+            )
+
+        # Upgrade hashes made with an outdated cost while we have the plaintext
+        if password_ok and needs_rehash(user.password_hash):
+            user.password_hash = await password_hasher.hash(user_data.password)
 
     # Create and set auth token
     token = create_access_token(data={"sub": str(user.id)})
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+
+from app.core.deps import GameCatalog, AdminUser
+from app.services.catalog import catalog_service
+
+
+router = APIRouter(prefix="/catalog", tags=["catalog"])
+
+
+@router.get("/version")
+async def get_catalog_version(catalog: GameCatalog):
+    """Get the current game content version (changes whenever content is reseeded)"""
+    return {"version": catalog.version}
+
+
+@router.post("/invalidate")
+def invalidate_catalog(admin: AdminUser):
+    """Drop the cached game content so it is reloaded on next use (admin only)"""
+    catalog_service.invalidate()
+    return {"success": True, "message": "Catalog invalidated"}
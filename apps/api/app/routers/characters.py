@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, status
 
-from app.core.deps import DbSession, CurrentUser
-from app.models.character import Character
+from app.core.deps import AsyncDbSession, AsyncCurrentUser, DbSession, CurrentUser, GameCatalog, GameCatalogSync
+from app.repositories.users import spend_coins
 from app.schemas.character import (
     CharacterWithStatus,
     SelectCharacterRequest,
@@ -13,12 +13,10 @@ router = APIRouter(prefix="/characters", tags=["characters"])
 
 
 @router.get("", response_model=list[CharacterWithStatus])
-def list_characters(db: DbSession, current_user: CurrentUser):
+def list_characters(current_user: CurrentUser, catalog: GameCatalogSync):
     """Get all characters with unlock status"""
-    characters = db.query(Character).order_by(Character.sort_order).all()
-
     result = []
-    for char in characters:
+    for char in catalog.characters:
         # Check unlock conditions (level-based only, quests removed)
         level_ok = current_user.player_level >= char.level_required
 
@@ -55,9 +53,9 @@ def list_characters(db: DbSession, current_user: CurrentUser):
 
 
 @router.post("/select")
-def select_character(data: SelectCharacterRequest, db: DbSession, current_user: CurrentUser):
+def select_character(data: SelectCharacterRequest, db: DbSession, current_user: CurrentUser, catalog: GameCatalogSync):
     """Select a character for the player"""
-    char = db.query(Character).filter(Character.id == data.character_id).first()
+    char = catalog.characters_by_id.get(data.character_id)
     if not char:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Character not found")
 
@@ -70,27 +68,23 @@ def select_character(data: SelectCharacterRequest, db: DbSession, current_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Not enough coins (need {char.coin_cost})")
 
     current_user.selected_character_id = char.id
-    db.commit()
 
     return {"success": True, "selected_character_id": char.id}
 
 
 @router.post("/purchase")
-def purchase_character(data: PurchaseCharacterRequest, db: DbSession, current_user: CurrentUser):
+async def purchase_character(data: PurchaseCharacterRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Purchase a coin-locked character"""
-    char = db.query(Character).filter(Character.id == data.character_id).first()
+    char = catalog.characters_by_id.get(data.character_id)
     if not char:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Character not found")
 
     if char.coin_cost == 0:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Character is not purchasable")
 
-    if current_user.coins < char.coin_cost:
+    # Deduct coins (guarded, so concurrent purchases can't overdraw) and select the character
+    if await spend_coins(db, current_user, char.coin_cost) is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Not enough coins")
-
-    # Deduct coins and select the character
-    current_user.coins -= char.coin_cost
     current_user.selected_character_id = char.id
-    db.commit()
 
     return {"success": True, "remaining_coins": current_user.coins}
@@ -1,30 +1,32 @@
-import random
 from fastapi import APIRouter, HTTPException
-from app.core.deps import DbSession, CurrentUser
-from app.models import WorldChest, ChestProgress, Item, PlayerInventory
+from sqlalchemy import select
+from app.core.deps import AsyncDbSession, AsyncCurrentUser, GameCatalog
+from app.models import WorldChest, ChestProgress
 from app.schemas.chest import (
     ChestInfo,
     OpenChestRequest,
     OpenChestResponse,
-    LootItem,
 )
+from app.repositories.inventory import add_items, remove_item
+from app.repositories.users import add_coins
+from app.services.loot import EMPTY_LOOT_TABLE, loot_items
 
 
 router = APIRouter(prefix="/chests", tags=["chests"])
 
 
 @router.get("/{chest_id}", response_model=ChestInfo)
-def get_chest(chest_id: str, db: DbSession, current_user: CurrentUser):
+async def get_chest(chest_id: str, db: AsyncDbSession, current_user: AsyncCurrentUser):
     """Get chest information"""
-    chest = db.query(WorldChest).filter(WorldChest.chest_id == chest_id).first()
+    chest = (await db.execute(select(WorldChest).where(WorldChest.chest_id == chest_id))).scalar_one_or_none()
     if not chest:
         raise HTTPException(status_code=404, detail="Chest not found")
 
     # Check if already opened by this user
-    progress = db.query(ChestProgress).filter(
+    progress = (await db.execute(select(ChestProgress).where(
         ChestProgress.user_id == current_user.id,
         ChestProgress.chest_id == chest.id
-    ).first()
+    ))).scalar_one_or_none()
 
     return ChestInfo(
         id=chest.chest_id,
@@ -38,18 +40,18 @@ def get_chest(chest_id: str, db: DbSession, current_user: CurrentUser):
 
 
 @router.post("/open", response_model=OpenChestResponse)
-def open_chest(data: OpenChestRequest, db: DbSession, current_user: CurrentUser):
+async def open_chest(data: OpenChestRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Open a chest and receive loot"""
-    chest = db.query(WorldChest).filter(WorldChest.chest_id == data.chest_id).first()
+    chest = (await db.execute(select(WorldChest).where(WorldChest.chest_id == data.chest_id))).scalar_one_or_none()
     if not chest:
         raise HTTPException(status_code=404, detail="Chest not found")
 
     # Check if already opened (for one-time chests)
     if chest.is_one_time:
-        progress = db.query(ChestProgress).filter(
+        progress = (await db.execute(select(ChestProgress).where(
             ChestProgress.user_id == current_user.id,
             ChestProgress.chest_id == chest.id
-        ).first()
+        ))).scalar_one_or_none()
         if progress:
             raise HTTPException(status_code=400, detail="Chest already opened")
 
@@ -58,60 +60,25 @@ def open_chest(data: OpenChestRequest, db: DbSession, current_user: CurrentUser)
     key_name = None
     if chest.is_locked and chest.required_key_item_id:
         # Check if player has the key
-        key_item = db.query(Item).filter(Item.item_id == chest.required_key_item_id).first()
+        key_item = catalog.items_by_key.get(chest.required_key_item_id)
         if not key_item:
             raise HTTPException(status_code=400, detail="Chest is locked")
 
-        key_inv = db.query(PlayerInventory).filter(
-            PlayerInventory.user_id == current_user.id,
-            PlayerInventory.item_id == key_item.id
-        ).first()
-
-        if not key_inv or key_inv.quantity < 1:
-            raise HTTPException(status_code=400, detail=f"You need a {key_item.name} to open this chest")
-
         # Consume key
-        key_inv.quantity -= 1
-        if key_inv.quantity <= 0:
-            db.delete(key_inv)
+        if await remove_item(db, current_user.id, key_item.id, 1) is None:
+            raise HTTPException(status_code=400, detail=f"You need a {key_item.name} to open this chest")
         key_consumed = True
         key_name = key_item.name
 
-    # Generate loot
-    items_received = []
-    for loot_entry in chest.loot_table or []:
-        chance = loot_entry.get("chance", 1.0)
-        if random.random() <= chance:
-            item = db.query(Item).filter(Item.item_id == loot_entry.get("item_id")).first()
-            if item:
-                quantity = loot_entry.get("quantity", 1)
-
-                # Add to inventory
-                inv = db.query(PlayerInventory).filter(
-                    PlayerInventory.user_id == current_user.id,
-                    PlayerInventory.item_id == item.id
-                ).first()
-
-                if inv:
-                    inv.quantity += quantity
-                else:
-                    inv = PlayerInventory(
-                        user_id=current_user.id,
-                        item_id=item.id,
-                        quantity=quantity,
-                    )
-                    db.add(inv)
-
-                items_received.append(LootItem(
-                    item_id=item.item_id,
-                    name=item.name,
-                    quantity=quantity,
-                    rarity=item.rarity,
-                ))
+    # Roll loot and add it to the inventory in one statement
+    drops = catalog.chest_loot.get(chest.id, EMPTY_LOOT_TABLE).roll()
+    await add_items(db, current_user.id, {drop.item.id: drop.quantity for drop in drops})
+    items_received = loot_items(drops)
 
     # Add gold
     gold_received = chest.coin_amount
-    current_user.coins += gold_received
+    if gold_received:
+        await add_coins(db, current_user, gold_received)
 
     # Record chest progress
     if chest.is_one_time:
@@ -121,8 +88,6 @@ def open_chest(data: OpenChestRequest, db: DbSession, current_user: CurrentUser)
         )
         db.add(progress)
 
-    db.commit()
-
     # Build message
     if not items_received and gold_received == 0:
         message = "The chest was empty..."
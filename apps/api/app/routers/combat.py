@@ -1,7 +1,9 @@
 import random
 from fastapi import APIRouter, HTTPException
-from app.core.deps import DbSession, CurrentUser
-from app.models import EnemySpawn, Enemy, User, Item, PlayerInventory
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.deps import AsyncDbSession, AsyncCurrentUser, GameCatalog
+from app.models import EnemySpawn, Enemy, User, PlayerInventory
 from app.schemas.combat import (
     CombatStartRequest,
     CombatStartResponse,
@@ -9,29 +11,41 @@ from app.schemas.combat import (
     CombatActionResponse,
     EnemyStats,
     DamageInfo,
+    CombatResolveRequest,
+    CombatResolveResponse,
+    CombatTurn,
 )
-from app.schemas.progression import calculate_xp_to_next_level
+from app.repositories.inventory import add_items, remove_item
+from app.repositories.users import add_coins
+from app.services.catalog import Catalog
+from app.services.loot import EMPTY_LOOT_TABLE, loot_items
+from app.services.progression import grant_xp
+from app.services.combat_sessions import CombatState, combat_sessions, new_session_id, new_rng_seed
 
 
 router = APIRouter(prefix="/combat", tags=["combat"])
 
+# Balance knobs shared with the Monte Carlo simulator (app/services/balance_sim.py)
+CRIT_MULTIPLIER = 1.5
+ENEMY_LEVEL_SCALING = 0.15  # Enemy stat/reward multiplier added per level above 1
+
 
 def calculate_damage(attacker_attack: int, defender_defense: int, is_crit: bool = False) -> int:
     """Calculate damage dealt"""
     base_damage = max(1, attacker_attack - (defender_defense // 2))
     if is_crit:
-        base_damage = int(base_damage * 1.5)
+        base_damage = int(base_damage * CRIT_MULTIPLIER)
     return base_damage
 
 
-def check_crit(crit_chance: float) -> bool:
+def check_crit(crit_chance: float, rng: random.Random = random) -> bool:
     """Check if attack is critical"""
-    return random.random() < crit_chance
+    return rng.random() < crit_chance
 
 
-def scale_enemy_stats(enemy: Enemy, level: int) -> dict:
+def scale_enemy_stats(enemy: Enemy, level: int, scaling: float = ENEMY_LEVEL_SCALING) -> dict:
     """Scale enemy stats based on level"""
-    level_mult = 1 + (level - 1) * 0.15
+    level_mult = 1 + (level - 1) * scaling
     return {
         "hp": int(enemy.base_hp * level_mult),
         "attack": int(enemy.base_attack * level_mult),
@@ -41,14 +55,28 @@ def scale_enemy_stats(enemy: Enemy, level: int) -> dict:
     }
 
 
+async def roll_enemy_loot(db: AsyncSession, user: User, catalog: Catalog, session: CombatState, rng: random.Random) -> list:
+    """Roll the defeated enemy's loot table and add the drops to the inventory"""
+    drops = catalog.enemy_loot.get(session.enemy_id, EMPTY_LOOT_TABLE).roll(rng)
+    await add_items(db, user.id, {drop.item.id: drop.quantity for drop in drops})
+    return loot_items(drops)
+
+
+async def apply_victory_rewards(db: AsyncSession, user: User, xp_gained: int, gold_gained: int) -> int | None:
+    """Grant XP and gold for a won fight; returns the new level if the player levelled up"""
+    levels_gained = grant_xp(user, xp_gained)
+    await add_coins(db, user, gold_gained)
+    return user.player_level if levels_gained else None
+
+
 @router.post("/start", response_model=CombatStartResponse)
-def start_combat(data: CombatStartRequest, db: DbSession, current_user: CurrentUser):
+async def start_combat(data: CombatStartRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Initiate combat with an enemy"""
-    spawn = db.query(EnemySpawn).filter(EnemySpawn.id == data.enemy_spawn_id).first()
+    spawn = await db.get(EnemySpawn, data.enemy_spawn_id)
     if not spawn:
         raise HTTPException(status_code=404, detail="Enemy not found")
 
-    enemy = db.query(Enemy).filter(Enemy.id == spawn.enemy_id).first()
+    enemy = catalog.enemies.get(spawn.enemy_id)
     if not enemy:
         raise HTTPException(status_code=404, detail="Enemy type not found")
 
@@ -56,9 +84,27 @@ def start_combat(data: CombatStartRequest, db: DbSession, current_user: CurrentU
     enemy_level = random.randint(spawn.level_min, spawn.level_max)
     scaled = scale_enemy_stats(enemy, enemy_level)
 
+    session = CombatState(
+        session_id=new_session_id(),
+        user_id=current_user.id,
+        spawn_id=spawn.id,
+        enemy_id=enemy.id,
+        enemy_level=enemy_level,
+        enemy_hp=scaled["hp"],
+        enemy_max_hp=scaled["hp"],
+        enemy_attack=scaled["attack"],
+        enemy_defense=scaled["defense"],
+        enemy_crit_chance=enemy.crit_chance,
+        xp_reward=scaled["xp_reward"],
+        coin_reward=scaled["coin_reward"],
+        rng_seed=new_rng_seed(),
+    )
+    await combat_sessions.save(db, session)
+
     return CombatStartResponse(
         success=True,
         message=f"Combat started with {enemy.name}!",
+        session_id=session.session_id,
         enemy=EnemyStats(
             id=str(spawn.id),
             name=enemy.name,
@@ -77,12 +123,15 @@ def start_combat(data: CombatStartRequest, db: DbSession, current_user: CurrentU
 
 
 @router.post("/action", response_model=CombatActionResponse)
-def combat_action(data: CombatActionRequest, db: DbSession, current_user: CurrentUser):
-    """Execute a combat action"""
-    # This is a simplified combat system
-    # In a full implementation, you'd track combat state in the database
-
-    # For now, we'll handle basic attack/defend/flee
+async def combat_action(data: CombatActionRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
+    """Execute a combat action against the encounter tracked by the combat session"""
+    session = await combat_sessions.get(db, data.session_id)
+    if not session or session.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Combat session not found or expired")
+    if not await combat_sessions.claim(db, session):
+        raise HTTPException(status_code=409, detail="Combat session changed by another request, try again")
+
+    rng = session.rng()
     player_action_result = ""
     enemy_action_result = ""
     player_damage = None
@@ -96,15 +145,12 @@ def combat_action(data: CombatActionRequest, db: DbSession, current_user: Curren
     level_up = False
     new_level = None
 
-    # Simulate enemy stats (in real implementation, track in session/db)
-    enemy_hp = 50  # Would come from combat state
-    enemy_attack = 10
-    enemy_defense = 5
+    enemy_hp = session.enemy_hp
 
     if data.action == "attack":
         # Player attacks
-        is_crit = check_crit(current_user.crit_chance)
-        damage = calculate_damage(current_user.attack, enemy_defense, is_crit)
+        is_crit = check_crit(current_user.crit_chance, rng)
+        damage = calculate_damage(current_user.attack, session.enemy_defense, is_crit)
         enemy_hp -= damage
 
         player_damage = DamageInfo(
@@ -118,27 +164,13 @@ def combat_action(data: CombatActionRequest, db: DbSession, current_user: Curren
         if enemy_hp <= 0:
             combat_ended = True
             victory = True
-            xp_gained = 25  # Would come from enemy stats
-            gold_gained = 10
+            xp_gained = session.xp_reward
+            gold_gained = session.coin_reward
             player_action_result += " Enemy defeated!"
 
-            # Check for level up
-            new_xp = current_user.current_xp + xp_gained
-            xp_needed = calculate_xp_to_next_level(current_user.player_level)
-            if new_xp >= xp_needed:
-                level_up = True
-                current_user.player_level += 1
-                current_user.current_xp = new_xp - xp_needed
-                current_user.max_hp += 10
-                current_user.hp = current_user.max_hp
-                current_user.attack += 2
-                current_user.defense += 1
-                new_level = current_user.player_level
-            else:
-                current_user.current_xp = new_xp
-
-            current_user.coins += gold_gained
-            db.commit()
+            new_level = await apply_victory_rewards(db, current_user, xp_gained, gold_gained)
+            level_up = new_level is not None
+            loot = await roll_enemy_loot(db, current_user, catalog, session, rng)
 
     elif data.action == "defend":
         player_action_result = "You take a defensive stance."
@@ -147,7 +179,7 @@ def combat_action(data: CombatActionRequest, db: DbSession, current_user: Curren
     elif data.action == "flee":
         # 50% base flee chance, modified by speed difference
         flee_chance = 0.5
-        if random.random() < flee_chance:
+        if rng.random() < flee_chance:
             fled = True
             combat_ended = True
             player_action_result = "You escaped successfully!"
@@ -158,35 +190,26 @@ def combat_action(data: CombatActionRequest, db: DbSession, current_user: Curren
         if not data.item_id:
             raise HTTPException(status_code=400, detail="Item ID required")
 
-        # Find item in inventory
-        inv_item = db.query(PlayerInventory).join(Item).filter(
-            PlayerInventory.user_id == current_user.id,
-            Item.item_id == data.item_id
-        ).first()
-
-        if not inv_item:
+        item = catalog.items_by_key.get(data.item_id)
+        if not item:
             raise HTTPException(status_code=404, detail="Item not found")
 
-        item = inv_item.item
         if item.item_type != "consumable":
             raise HTTPException(status_code=400, detail="Item is not consumable")
 
+        # Remove one item
+        if await remove_item(db, current_user.id, item.id, 1) is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+
         if item.effect_type == "heal":
             heal_amount = min(item.effect_value, current_user.max_hp - current_user.hp)
             current_user.hp += heal_amount
             player_action_result = f"Used {item.name}, restored {heal_amount} HP!"
 
-        # Remove one item
-        if inv_item.quantity <= 1:
-            db.delete(inv_item)
-        else:
-            inv_item.quantity -= 1
-        db.commit()
-
     # Enemy attacks (if combat didn't end)
     if not combat_ended:
-        enemy_is_crit = check_crit(0.05)
-        enemy_dmg = calculate_damage(enemy_attack, current_user.defense, enemy_is_crit)
+        enemy_is_crit = check_crit(session.enemy_crit_chance, rng)
+        enemy_dmg = calculate_damage(session.enemy_attack, current_user.defense, enemy_is_crit)
 
         # Apply defend reduction
         if data.action == "defend":
@@ -208,7 +231,13 @@ def combat_action(data: CombatActionRequest, db: DbSession, current_user: Curren
             victory = False
             enemy_action_result += " You have been defeated!"
 
-        db.commit()
+    # Persist the encounter (or drop it once the fight is over) with the player changes
+    if combat_ended:
+        await combat_sessions.delete(db, session.session_id)
+    else:
+        session.enemy_hp = enemy_hp
+        session.turn += 1
+        await combat_sessions.save(db, session)
 
     return CombatActionResponse(
         success=True,
@@ -228,3 +257,111 @@ def combat_action(data: CombatActionRequest, db: DbSession, current_user: Curren
         level_up=level_up,
         new_level=new_level,
     )
+
+
+@router.post("/resolve", response_model=CombatResolveResponse)
+async def resolve_combat(data: CombatResolveRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
+    """Auto-battle: simulate the rest of the encounter server-side and apply the outcome in one transaction"""
+    session = await combat_sessions.get(db, data.session_id)
+    if not session or session.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Combat session not found or expired")
+    if not await combat_sessions.claim(db, session):
+        raise HTTPException(status_code=409, detail="Combat session changed by another request, try again")
+
+    # Resolve the healing consumable up front so the loop never touches the database
+    heal_item = None
+    potions = 0
+    if data.policy == "heal":
+        if not data.heal_item_id:
+            raise HTTPException(status_code=400, detail="heal_item_id required for the heal policy")
+        heal_item = catalog.items_by_key.get(data.heal_item_id)
+        if not heal_item:
+            raise HTTPException(status_code=404, detail="Item not found")
+        if heal_item.item_type != "consumable" or heal_item.effect_type != "heal":
+            raise HTTPException(status_code=400, detail="Item is not a healing consumable")
+        potions = (await db.execute(select(PlayerInventory.quantity).where(
+            PlayerInventory.user_id == current_user.id,
+            PlayerInventory.item_id == heal_item.id
+        ))).scalar_one_or_none() or 0
+
+    player_hp = current_user.hp
+    enemy_hp = session.enemy_hp
+    heal_threshold = current_user.max_hp * data.heal_below
+    items_used = 0
+    outcome = "unresolved"
+    turn_log = []
+
+    for _ in range(data.max_turns):
+        rng = session.rng()
+        session.turn += 1
+
+        if heal_item and potions > 0 and player_hp < heal_threshold:
+            healed = min(heal_item.effect_value, current_user.max_hp - player_hp)
+            player_hp += healed
+            potions -= 1
+            items_used += 1
+            turn = CombatTurn(turn=session.turn, action="heal", healed=healed, player_hp=player_hp, enemy_hp=enemy_hp)
+        else:
+            is_crit = check_crit(current_user.crit_chance, rng)
+            damage = calculate_damage(current_user.attack, session.enemy_defense, is_crit)
+            enemy_hp = max(0, enemy_hp - damage)
+            turn = CombatTurn(turn=session.turn, action="attack", player_damage=damage, player_crit=is_crit,
+                              player_hp=player_hp, enemy_hp=enemy_hp)
+            if enemy_hp == 0:
+                turn_log.append(turn)
+                outcome = "victory"
+                break
+
+        enemy_is_crit = check_crit(session.enemy_crit_chance, rng)
+        enemy_dmg = calculate_damage(session.enemy_attack, current_user.defense, enemy_is_crit)
+        player_hp = max(0, player_hp - enemy_dmg)
+        turn.enemy_damage = enemy_dmg
+        turn.enemy_crit = enemy_is_crit
+        turn.player_hp = player_hp
+        turn_log.append(turn)
+        if player_hp == 0:
+            outcome = "defeat"
+            break
+
+    # Apply everything in a single transaction
+    current_user.hp = player_hp
+    if items_used and await remove_item(db, current_user.id, heal_item.id, items_used) is None:
+        # Potions were spent elsewhere mid-fight; nothing has been committed, so the fight can be retried
+        raise HTTPException(status_code=409, detail="Inventory changed during combat, try again")
+
+    xp_gained = 0
+    gold_gained = 0
+    new_level = None
+    loot = []
+    if outcome == "victory":
+        xp_gained = session.xp_reward
+        gold_gained = session.coin_reward
+        new_level = await apply_victory_rewards(db, current_user, xp_gained, gold_gained)
+        loot = await roll_enemy_loot(db, current_user, catalog, session, rng)
+
+    if outcome == "unresolved":
+        session.enemy_hp = enemy_hp
+        await combat_sessions.save(db, session)
+    else:
+        await combat_sessions.delete(db, session.session_id)
+
+    messages = {
+        "victory": "Enemy defeated!",
+        "defeat": "You have been defeated!",
+        "unresolved": "The fight goes on...",
+    }
+    return CombatResolveResponse(
+        success=True,
+        message=messages[outcome],
+        outcome=outcome,
+        turns=len(turn_log),
+        turn_log=turn_log,
+        player_hp=current_user.hp,
+        enemy_hp=enemy_hp,
+        xp_gained=xp_gained,
+        gold_gained=gold_gained,
+        items_used=items_used,
+        loot=loot,
+        level_up=new_level is not None,
+        new_level=new_level,
+    )
@@ -2,6 +2,8 @@ from fastapi import APIRouter
 
 from app.core.deps import DbSession, CurrentUser
 from app.models import Progress, ChestProgress, PlayerInventory
+from app.services.position_buffer import position_buffer
+from app.services.progression import grant_xp, xp_table
 
 
 router = APIRouter(prefix="/dev", tags=["dev"])
@@ -31,6 +33,7 @@ def reset_user_progress(db: DbSession, current_user: CurrentUser):
     current_user.defense = 5
     current_user.speed = 5
     current_user.crit_chance = 0.05
+    position_buffer.discard(current_user.id)
     current_user.world_x = 25
     current_user.world_y = 25
     current_user.current_zone_id = None
@@ -42,8 +45,6 @@ def reset_user_progress(db: DbSession, current_user: CurrentUser):
     current_user.equipped_accessory_id = None
     current_user.selected_character_id = None
 
-    db.commit()
-
     return {"success": True, "message": "Progress reset"}
 
 
@@ -51,23 +52,32 @@ def reset_user_progress(db: DbSession, current_user: CurrentUser):
 def give_gold(amount: int, db: DbSession, current_user: CurrentUser):
     """Give gold to current user (dev only)"""
     current_user.coins += amount
-    db.commit()
     return {"success": True, "new_gold": current_user.coins}
 
 
 @router.post("/set-level")
 def set_level(level: int, db: DbSession, current_user: CurrentUser):
     """Set player level (dev only)"""
-    current_user.player_level = max(1, level)
+    current_user.player_level = min(max(1, level), xp_table.max_level)
     current_user.current_xp = 0
-    db.commit()
     return {"success": True, "new_level": current_user.player_level}
 
 
+@router.post("/grant-xp")
+def grant_xp_dev(amount: int, db: DbSession, current_user: CurrentUser):
+    """Grant XP, applying every level-up it covers (dev only)"""
+    levels_gained = grant_xp(current_user, max(0, amount))
+    return {
+        "success": True,
+        "new_level": current_user.player_level,
+        "current_xp": current_user.current_xp,
+        "levels_gained": levels_gained,
+    }
+
+
 @router.post("/heal")
 def heal_player(db: DbSession, current_user: CurrentUser):
     """Fully heal current user (dev only)"""
     current_user.hp = current_user.max_hp
     current_user.mp = current_user.max_mp
-    db.commit()
     return {"success": True, "hp": current_user.hp, "mp": current_user.mp}
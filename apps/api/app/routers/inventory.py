@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException
-from app.core.deps import DbSession, CurrentUser
+from sqlalchemy import select
+from app.core.deps import AsyncDbSession, AsyncCurrentUser, GameCatalog
 from app.models import Item, PlayerInventory, User
+from app.repositories.inventory import list_stacks, remove_item, stack_is_equipped
 from app.schemas.inventory import (
     InventoryResponse,
     ItemInfo,
@@ -42,18 +44,14 @@ def item_to_info(item: Item, quantity: int, is_equipped: bool) -> ItemInfo:
 
 
 @router.get("", response_model=InventoryResponse)
-def get_inventory(db: DbSession, current_user: CurrentUser):
+async def get_inventory(db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Get player's full inventory"""
-    # Get all inventory items
-    inv_items = db.query(PlayerInventory).filter(
-        PlayerInventory.user_id == current_user.id
-    ).all()
-
+    # Stacks come back as plain rows; item details are in the catalog
     items = []
-    for inv in inv_items:
-        item = db.query(Item).filter(Item.id == inv.item_id).first()
+    for item_id, quantity, is_equipped in await list_stacks(db, current_user.id):
+        item = catalog.items.get(item_id)
         if item:
-            items.append(item_to_info(item, inv.quantity, inv.is_equipped))
+            items.append(item_to_info(item, quantity, is_equipped))
 
     # Get equipped items
     equipped = EquippedItems(
@@ -66,32 +64,32 @@ def get_inventory(db: DbSession, current_user: CurrentUser):
     )
 
     if current_user.equipped_weapon_id:
-        weapon = db.query(Item).filter(Item.id == current_user.equipped_weapon_id).first()
+        weapon = catalog.items.get(current_user.equipped_weapon_id)
         if weapon:
             equipped.weapon = item_to_info(weapon, 1, True)
 
     if current_user.equipped_head_id:
-        head = db.query(Item).filter(Item.id == current_user.equipped_head_id).first()
+        head = catalog.items.get(current_user.equipped_head_id)
         if head:
             equipped.head = item_to_info(head, 1, True)
 
     if current_user.equipped_chest_id:
-        chest = db.query(Item).filter(Item.id == current_user.equipped_chest_id).first()
+        chest = catalog.items.get(current_user.equipped_chest_id)
         if chest:
             equipped.chest = item_to_info(chest, 1, True)
 
     if current_user.equipped_legs_id:
-        legs = db.query(Item).filter(Item.id == current_user.equipped_legs_id).first()
+        legs = catalog.items.get(current_user.equipped_legs_id)
         if legs:
             equipped.legs = item_to_info(legs, 1, True)
 
     if current_user.equipped_feet_id:
-        feet = db.query(Item).filter(Item.id == current_user.equipped_feet_id).first()
+        feet = catalog.items.get(current_user.equipped_feet_id)
         if feet:
             equipped.feet = item_to_info(feet, 1, True)
 
     if current_user.equipped_accessory_id:
-        accessory = db.query(Item).filter(Item.id == current_user.equipped_accessory_id).first()
+        accessory = catalog.items.get(current_user.equipped_accessory_id)
         if accessory:
             equipped.accessory = item_to_info(accessory, 1, True)
 
@@ -105,22 +103,20 @@ def get_inventory(db: DbSession, current_user: CurrentUser):
 
 
 @router.post("/use", response_model=UseItemResponse)
-def use_item(data: UseItemRequest, db: DbSession, current_user: CurrentUser):
+async def use_item(data: UseItemRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Use a consumable item"""
-    item = db.query(Item).filter(Item.item_id == data.item_id).first()
+    item = catalog.items_by_key.get(data.item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    inv = db.query(PlayerInventory).filter(
-        PlayerInventory.user_id == current_user.id,
-        PlayerInventory.item_id == item.id
-    ).first()
-    if not inv or inv.quantity < 1:
-        raise HTTPException(status_code=400, detail="Item not in inventory")
-
     if item.item_type != "consumable":
         raise HTTPException(status_code=400, detail="Item is not consumable")
 
+    # Consume item
+    remaining = await remove_item(db, current_user.id, item.id, 1)
+    if remaining is None:
+        raise HTTPException(status_code=400, detail="Item not in inventory")
+
     hp_restored = 0
     mp_restored = 0
     effect_applied = None
@@ -134,13 +130,6 @@ def use_item(data: UseItemRequest, db: DbSession, current_user: CurrentUser):
     elif item.effect_type in ["buff_attack", "buff_defense"]:
         effect_applied = item.effect_type
 
-    # Consume item
-    inv.quantity -= 1
-    if inv.quantity <= 0:
-        db.delete(inv)
-
-    db.commit()
-
     return UseItemResponse(
         success=True,
         message=f"Used {item.name}",
@@ -148,21 +137,21 @@ def use_item(data: UseItemRequest, db: DbSession, current_user: CurrentUser):
         mp_restored=mp_restored,
         effect_applied=effect_applied,
         item_consumed=True,
-        remaining_quantity=max(0, inv.quantity if inv else 0),
+        remaining_quantity=remaining,
     )
 
 
 @router.post("/equip", response_model=EquipItemResponse)
-def equip_item(data: EquipItemRequest, db: DbSession, current_user: CurrentUser):
+async def equip_item(data: EquipItemRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Equip a weapon or armor"""
-    item = db.query(Item).filter(Item.item_id == data.item_id).first()
+    item = catalog.items_by_key.get(data.item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    inv = db.query(PlayerInventory).filter(
+    inv = (await db.execute(select(PlayerInventory).where(
         PlayerInventory.user_id == current_user.id,
         PlayerInventory.item_id == item.id
-    ).first()
+    ))).scalar_one_or_none()
     if not inv:
         raise HTTPException(status_code=400, detail="Item not in inventory")
 
@@ -179,14 +168,13 @@ def equip_item(data: EquipItemRequest, db: DbSession, current_user: CurrentUser)
     slot_attr = f"equipped_{slot}_id"
     current_equipped_id = getattr(current_user, slot_attr, None)
     if current_equipped_id:
-        current_item = db.query(Item).filter(Item.id == current_equipped_id).first()
+        current_item = catalog.items.get(current_equipped_id)
         if current_item:
             previous_item = item_to_info(current_item, 1, False)
 
     # Equip new item
     setattr(current_user, slot_attr, item.id)
     inv.is_equipped = True
-    db.commit()
 
     return EquipItemResponse(
         success=True,
@@ -201,7 +189,7 @@ def equip_item(data: EquipItemRequest, db: DbSession, current_user: CurrentUser)
 
 
 @router.post("/unequip", response_model=UnequipResponse)
-def unequip_item(data: UnequipRequest, db: DbSession, current_user: CurrentUser):
+async def unequip_item(data: UnequipRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Unequip an item from a slot"""
     slot_attr = f"equipped_{data.slot}_id"
     current_equipped_id = getattr(current_user, slot_attr, None)
@@ -209,21 +197,19 @@ def unequip_item(data: UnequipRequest, db: DbSession, current_user: CurrentUser)
     if not current_equipped_id:
         raise HTTPException(status_code=400, detail="Nothing equipped in that slot")
 
-    item = db.query(Item).filter(Item.id == current_equipped_id).first()
+    item = catalog.items.get(current_equipped_id)
 
     # Unequip
     setattr(current_user, slot_attr, None)
 
     # Update inventory
-    inv = db.query(PlayerInventory).filter(
+    inv = (await db.execute(select(PlayerInventory).where(
         PlayerInventory.user_id == current_user.id,
         PlayerInventory.item_id == current_equipped_id
-    ).first()
+    ))).scalar_one_or_none()
     if inv:
         inv.is_equipped = False
 
-    db.commit()
-
     return UnequipResponse(
         success=True,
         message=f"Unequipped {item.name if item else 'item'}",
@@ -232,34 +218,21 @@ def unequip_item(data: UnequipRequest, db: DbSession, current_user: CurrentUser)
 
 
 @router.post("/drop", response_model=DropItemResponse)
-def drop_item(data: DropItemRequest, db: DbSession, current_user: CurrentUser):
+async def drop_item(data: DropItemRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Drop an item from inventory"""
-    item = db.query(Item).filter(Item.item_id == data.item_id).first()
+    item = catalog.items_by_key.get(data.item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    inv = db.query(PlayerInventory).filter(
-        PlayerInventory.user_id == current_user.id,
-        PlayerInventory.item_id == item.id
-    ).first()
-    if not inv or inv.quantity < data.quantity:
+    remaining = await remove_item(db, current_user.id, item.id, data.quantity, include_equipped=False)
+    if remaining is None:
+        if await stack_is_equipped(db, current_user.id, item.id, data.quantity):
+            raise HTTPException(status_code=400, detail="Cannot drop equipped items")
         raise HTTPException(status_code=400, detail="Not enough items")
 
-    # Check if equipped
-    if inv.is_equipped:
-        raise HTTPException(status_code=400, detail="Cannot drop equipped items")
-
-    dropped = min(data.quantity, inv.quantity)
-    inv.quantity -= dropped
-
-    if inv.quantity <= 0:
-        db.delete(inv)
-
-    db.commit()
-
     return DropItemResponse(
         success=True,
-        message=f"Dropped {dropped}x {item.name}",
-        dropped_quantity=dropped,
-        remaining_quantity=max(0, inv.quantity if inv else 0),
+        message=f"Dropped {data.quantity}x {item.name}",
+        dropped_quantity=data.quantity,
+        remaining_quantity=remaining,
     )
@@ -62,8 +62,7 @@ def create_level(level_data: LevelCreate, db: DbSession, admin: AdminUser):
     )
 
     db.add(level)
-    db.commit()
-    db.refresh(level)
+    db.flush()
 
     return LevelResponse.model_validate(level)
 
@@ -87,8 +86,7 @@ def update_level(slug: str, level_data: LevelUpdate, db: DbSession, admin: Admin
     if level_data.json_data is not None:
         level.json_data = level_data.json_data
 
-    db.commit()
-    db.refresh(level)
+    db.flush()
 
     return LevelResponse.model_validate(level)
 
@@ -104,4 +102,3 @@ def delete_level(slug: str, db: DbSession, admin: AdminUser):
         )
 
     db.delete(level)
-    db.commit()
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
-from app.core.deps import DbSession, CurrentUser
-from app.models import NPC, Item, PlayerInventory
+from app.core.deps import AsyncDbSession, AsyncCurrentUser, GameCatalog
+from app.repositories.inventory import add_item, remove_item, stack_is_equipped
+from app.repositories.users import add_coins, spend_coins
 from app.schemas.npc import (
     NPCInfo,
     NPCDialogueResponse,
@@ -21,9 +22,9 @@ router = APIRouter(prefix="/npcs", tags=["npcs"])
 
 
 @router.get("/{npc_id}", response_model=NPCInfo)
-def get_npc(npc_id: str, db: DbSession, current_user: CurrentUser):
+async def get_npc(npc_id: str, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Get NPC information"""
-    npc = db.query(NPC).filter(NPC.npc_id == npc_id).first()
+    npc = catalog.npcs_by_key.get(npc_id)
     if not npc:
         raise HTTPException(status_code=404, detail="NPC not found")
 
@@ -40,9 +41,9 @@ def get_npc(npc_id: str, db: DbSession, current_user: CurrentUser):
 
 
 @router.get("/{npc_id}/dialogue", response_model=NPCDialogueResponse)
-def get_dialogue(npc_id: str, db: DbSession, current_user: CurrentUser):
+async def get_dialogue(npc_id: str, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Get NPC dialogue starting node"""
-    npc = db.query(NPC).filter(NPC.npc_id == npc_id).first()
+    npc = catalog.npcs_by_key.get(npc_id)
     if not npc:
         raise HTTPException(status_code=404, detail="NPC not found")
 
@@ -87,14 +88,14 @@ def get_dialogue(npc_id: str, db: DbSession, current_user: CurrentUser):
 
 
 @router.post("/{npc_id}/dialogue/respond", response_model=DialogueSelectResponse)
-def respond_to_dialogue(
+async def respond_to_dialogue(
     npc_id: str,
     data: DialogueSelectRequest,
-    db: DbSession,
-    current_user: CurrentUser
+    current_user: AsyncCurrentUser,
+    catalog: GameCatalog,
 ):
     """Select a dialogue option"""
-    npc = db.query(NPC).filter(NPC.npc_id == npc_id).first()
+    npc = catalog.npcs_by_key.get(npc_id)
     if not npc:
         raise HTTPException(status_code=404, detail="NPC not found")
 
@@ -147,9 +148,9 @@ def respond_to_dialogue(
 
 
 @router.get("/{npc_id}/shop", response_model=ShopInventoryResponse)
-def get_shop(npc_id: str, db: DbSession, current_user: CurrentUser):
+async def get_shop(npc_id: str, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Get merchant's shop inventory"""
-    npc = db.query(NPC).filter(NPC.npc_id == npc_id).first()
+    npc = catalog.npcs_by_key.get(npc_id)
     if not npc:
         raise HTTPException(status_code=404, detail="NPC not found")
 
@@ -158,7 +159,7 @@ def get_shop(npc_id: str, db: DbSession, current_user: CurrentUser):
 
     shop_items = []
     for shop_item in npc.shop_items or []:
-        item = db.query(Item).filter(Item.item_id == shop_item.get("item_id")).first()
+        item = catalog.items_by_key.get(shop_item.get("item_id"))
         if item:
             shop_items.append(ShopItem(
                 item_id=item.item_id,
@@ -184,9 +185,9 @@ def get_shop(npc_id: str, db: DbSession, current_user: CurrentUser):
 
 
 @router.post("/{npc_id}/shop/buy", response_model=BuyItemResponse)
-def buy_item(npc_id: str, data: BuyItemRequest, db: DbSession, current_user: CurrentUser):
+async def buy_item(npc_id: str, data: BuyItemRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Purchase an item from a merchant"""
-    npc = db.query(NPC).filter(NPC.npc_id == npc_id).first()
+    npc = catalog.npcs_by_key.get(npc_id)
     if not npc or not npc.is_shopkeeper:
         raise HTTPException(status_code=404, detail="Merchant not found")
 
@@ -200,40 +201,22 @@ def buy_item(npc_id: str, data: BuyItemRequest, db: DbSession, current_user: Cur
     if not shop_item_data:
         raise HTTPException(status_code=404, detail="Item not for sale")
 
-    item = db.query(Item).filter(Item.item_id == data.item_id).first()
+    item = catalog.items_by_key.get(data.item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
     price = shop_item_data.get("price", item.buy_price)
     total_cost = price * data.quantity
 
-    if current_user.coins < total_cost:
-        raise HTTPException(status_code=400, detail="Not enough gold")
-
     # Check stock
     stock = shop_item_data.get("stock", -1)
     if stock != -1 and stock < data.quantity:
         raise HTTPException(status_code=400, detail="Not enough in stock")
 
-    # Add to inventory
-    inv = db.query(PlayerInventory).filter(
-        PlayerInventory.user_id == current_user.id,
-        PlayerInventory.item_id == item.id
-    ).first()
-
-    if inv:
-        inv.quantity += data.quantity
-    else:
-        inv = PlayerInventory(
-            user_id=current_user.id,
-            item_id=item.id,
-            quantity=data.quantity,
-        )
-        db.add(inv)
-
-    # Deduct gold
-    current_user.coins -= total_cost
-    db.commit()
+    # Deduct gold (guarded, so concurrent purchases can't overdraw) and add to inventory
+    if total_cost and await spend_coins(db, current_user, total_cost) is None:
+        raise HTTPException(status_code=400, detail="Not enough gold")
+    await add_item(db, current_user.id, item.id, data.quantity)
 
     return BuyItemResponse(
         success=True,
@@ -246,37 +229,26 @@ def buy_item(npc_id: str, data: BuyItemRequest, db: DbSession, current_user: Cur
 
 
 @router.post("/{npc_id}/shop/sell", response_model=SellItemResponse)
-def sell_item(npc_id: str, data: SellItemRequest, db: DbSession, current_user: CurrentUser):
+async def sell_item(npc_id: str, data: SellItemRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Sell an item to a merchant"""
-    npc = db.query(NPC).filter(NPC.npc_id == npc_id).first()
+    npc = catalog.npcs_by_key.get(npc_id)
     if not npc or not npc.is_shopkeeper:
         raise HTTPException(status_code=404, detail="Merchant not found")
 
-    item = db.query(Item).filter(Item.item_id == data.item_id).first()
+    item = catalog.items_by_key.get(data.item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    inv = db.query(PlayerInventory).filter(
-        PlayerInventory.user_id == current_user.id,
-        PlayerInventory.item_id == item.id
-    ).first()
-
-    if not inv or inv.quantity < data.quantity:
-        raise HTTPException(status_code=400, detail="Not enough items")
-
-    if inv.is_equipped:
-        raise HTTPException(status_code=400, detail="Cannot sell equipped items")
-
-    total_earned = item.sell_price * data.quantity
-
     # Remove from inventory
-    inv.quantity -= data.quantity
-    if inv.quantity <= 0:
-        db.delete(inv)
+    remaining = await remove_item(db, current_user.id, item.id, data.quantity, include_equipped=False)
+    if remaining is None:
+        if await stack_is_equipped(db, current_user.id, item.id, data.quantity):
+            raise HTTPException(status_code=400, detail="Cannot sell equipped items")
+        raise HTTPException(status_code=400, detail="Not enough items")
 
     # Add gold
-    current_user.coins += total_earned
-    db.commit()
+    total_earned = item.sell_price * data.quantity
+    await add_coins(db, current_user, total_earned)
 
     return SellItemResponse(
         success=True,
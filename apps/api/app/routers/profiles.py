@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from app.core.deps import AdminUser
+from app.core.profiler import profile_store
+from app.schemas.profile import ProfileInfo
+
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin"])
+
+
+@router.get("", response_model=list[ProfileInfo])
+def list_profiles(admin: AdminUser):
+    """List captured slow-request profiles, newest first (admin only)"""
+    return profile_store.list()
+
+
+@router.get("/{name}")
+def download_profile(name: str, admin: AdminUser):
+    """Download a profile in folded-stack format (admin only)"""
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
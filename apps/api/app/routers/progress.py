@@ -1,10 +1,10 @@
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import asc
 
 from app.core.deps import DbSession, CurrentUser
 from app.models.level import Level
 from app.models.progress import Progress
+from app.repositories import progress as progress_repo
 from app.schemas.progress import (
     ProgressResponse,
     SubmitCompletionRequest,
@@ -20,28 +20,23 @@ router = APIRouter(prefix="/progress", tags=["progress"])
 @router.get("", response_model=list[UserProgressSummary])
 def get_user_progress(db: DbSession, current_user: CurrentUser):
     """Get progress summary for all levels for the current user"""
-    # Get all levels
-    levels = db.query(Level).order_by(asc(Level.order_index)).all()
-
-    # Get all progress for this user
-    progress_records = db.query(Progress).filter(Progress.user_id == current_user.id).all()
-    progress_map = {p.level_id: p for p in progress_records}
+    # Levels in order, each joined with this user's progress (one statement, plain rows)
+    rows = progress_repo.list_level_summaries(db, current_user.id)
 
     # Determine which levels are unlocked
     # First level is always unlocked, subsequent levels unlock when previous is completed
     result = []
     previous_completed = True  # First level is always unlocked
 
-    for level in levels:
-        progress = progress_map.get(level.id)
-        is_completed = progress is not None and progress.completed_at is not None
+    for row in rows:
+        is_completed = row.completed_at is not None
 
         result.append(UserProgressSummary(
-            level_id=level.id,
-            level_slug=level.slug,
-            level_title=level.title,
-            order_index=level.order_index,
-            attempts=progress.attempts if progress else 0,
+            level_id=row.id,
+            level_slug=row.slug,
+            level_title=row.title,
+            order_index=row.order_index,
+            attempts=row.attempts or 0,
             is_completed=is_completed,
             is_unlocked=previous_completed,
         ))
@@ -55,10 +50,7 @@ def get_user_progress(db: DbSession, current_user: CurrentUser):
 @router.get("/{level_id}", response_model=ProgressResponse | None)
 def get_level_progress(level_id: int, db: DbSession, current_user: CurrentUser):
     """Get progress for a specific level"""
-    progress = db.query(Progress).filter(
-        Progress.user_id == current_user.id,
-        Progress.level_id == level_id
-    ).first()
+    progress = progress_repo.get_level_progress(db, current_user.id, level_id)
 
     if not progress:
         return None
@@ -77,24 +69,8 @@ def increment_attempts(data: IncrementAttemptsRequest, db: DbSession, current_us
             detail="Level not found"
         )
 
-    # Get or create progress record
-    progress = db.query(Progress).filter(
-        Progress.user_id == current_user.id,
-        Progress.level_id == data.level_id
-    ).first()
-
-    if not progress:
-        progress = Progress(
-            user_id=current_user.id,
-            level_id=data.level_id,
-            attempts=1,
-        )
-        db.add(progress)
-    else:
-        progress.attempts += 1
-
-    db.commit()
-    db.refresh(progress)
+    # Create the record or bump its counter in one statement
+    progress = progress_repo.increment_attempts(db, current_user.id, data.level_id)
 
     return ProgressResponse.model_validate(progress)
 
@@ -133,8 +109,7 @@ def submit_completion(data: SubmitCompletionRequest, db: DbSession, current_user
         elif data.run_data.get("action_count", float("inf")) < (progress.best_run_json or {}).get("action_count", float("inf")):
             progress.best_run_json = data.run_data
 
-    db.commit()
-    db.refresh(progress)
+    db.flush()
 
     return SubmitCompletionResponse(
         success=True,
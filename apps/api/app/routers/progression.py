@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 
 from app.core.deps import CurrentUser
-from app.schemas.progression import PlayerProgression, calculate_xp_to_next_level
+from app.schemas.progression import PlayerProgression
+from app.services.progression import xp_table
 
 
 router = APIRouter(prefix="/progression", tags=["progression"])
@@ -13,7 +14,7 @@ def get_my_progression(current_user: CurrentUser):
     return PlayerProgression(
         player_level=current_user.player_level,
         current_xp=current_user.current_xp,
-        xp_to_next_level=calculate_xp_to_next_level(current_user.player_level),
+        xp_to_next_level=xp_table.xp_to_next(current_user.player_level),
         coins=current_user.coins,
         selected_character_id=current_user.selected_character_id,
     )
@@ -0,0 +1,179 @@
+"""
+Realtime world channel.
+
+/ws/world authenticates once from the session cookie and then carries movement
+both ways. Clients send {"type": "move", "x": .., "y": ..}; the server answers
+with the accepted position and the nearby entities that entered or left range,
+using the same spatial index query as /world/state.
+
+The first move is applied immediately; moves arriving in the following
+WS_MOVE_COALESCE_MS are coalesced into the latest one. Positions go through the
+write-behind buffer, so a step costs no database round trip. The channel is
+bound to the zone the player was in when it connected; clients reconnect after
+/world/transition.
+"""
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, WebSocket, status
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.deps import get_websocket_user
+from app.core.identity_cache import mark_user_dirty
+from app.models import User
+from app.routers.world import query_nearby
+from app.services.catalog import Catalog, catalog_service
+from app.services.position_buffer import position_buffer
+
+
+router = APIRouter(prefix="/ws", tags=["realtime"])
+
+
+class MoveInbox:
+    """Latest unprocessed message from one connection"""
+    __slots__ = ("move", "error", "closed", "ready")
+
+    def __init__(self):
+        self.move: tuple[int, int] | None = None
+        self.error: str | None = None
+        self.closed = False
+        self.ready = asyncio.Event()
+
+    def put(self, text: str) -> None:
+        try:
+            message = json.loads(text)
+            if message.get("type") != "move":
+                raise ValueError
+            x, y = message["x"], message["y"]
+            if type(x) is not int or type(y) is not int:
+                raise ValueError
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.error = "Expected {\"type\": \"move\", \"x\": int, \"y\": int}"
+        else:
+            self.move = (x, y)
+        self.ready.set()
+
+    def take(self) -> tuple[tuple[int, int] | None, str | None]:
+        move, error = self.move, self.error
+        self.move = self.error = None
+        self.ready.clear()
+        return move, error
+
+
+def entity_key(entry) -> str:
+    return f"{entry.entity_type}:{entry.id}"
+
+
+def entity_payload(entry, dist: int) -> dict:
+    return {
+        "key": entity_key(entry),
+        "id": entry.id,
+        "name": entry.name,
+        "entity_type": entry.entity_type,
+        "position": {"x": entry.x, "y": entry.y},
+        "distance": dist,
+    }
+
+
+def _dumps(payload: dict) -> str:
+    return json.dumps(payload, separators=(",", ":"))
+
+
+async def _catalog(db: AsyncSession) -> Catalog:
+    # Only touches the database when the snapshot was invalidated; don't keep
+    # a connection checked out for the lifetime of the socket afterwards
+    catalog = await catalog_service.get(db)
+    if db.in_transaction():
+        await db.close()
+    return catalog
+
+
+async def _receive(websocket: WebSocket, inbox: MoveInbox) -> None:
+    try:
+        async for text in websocket.iter_text():
+            inbox.put(text)
+    finally:
+        inbox.closed = True
+        inbox.ready.set()
+
+
+async def _store_position(db: AsyncSession, user_id: int, zone_id: int, x: int, y: int) -> None:
+    if position_buffer.running:
+        position_buffer.record(user_id, zone_id, x, y)
+        return
+    await db.execute(update(User).where(User.id == user_id).values(world_x=x, world_y=y))
+    mark_user_dirty(db, user_id)
+    await db.commit()
+
+
+@router.websocket("/world")
+async def world_channel(websocket: WebSocket, db: AsyncSession = Depends(get_async_db)):
+    """Movement in, nearby-entity diffs out"""
+    user = await get_websocket_user(websocket, db)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Not authenticated")
+        return
+    user_id, zone_id = user.id, user.current_zone_id
+    x, y = user.world_x, user.world_y
+    buffered = position_buffer.get(user_id, zone_id)
+    if buffered is not None:
+        x, y = buffered.x, buffered.y
+
+    catalog = await _catalog(db)
+    if catalog.zones.get(zone_id) is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="No current zone; load /api/world/state first")
+        return
+
+    await websocket.accept()
+    nearby = query_nearby(catalog, zone_id, x, y)
+    seen = {entity_key(entry) for entry, _ in nearby}
+    await websocket.send_text(_dumps({
+        "type": "state",
+        "zone_id": zone_id,
+        "position": {"x": x, "y": y},
+        "nearby": [entity_payload(entry, dist) for entry, dist in nearby],
+    }))
+
+    inbox = MoveInbox()
+    receiver = asyncio.create_task(_receive(websocket, inbox))
+    window = settings.WS_MOVE_COALESCE_MS / 1000
+    try:
+        while True:
+            await inbox.ready.wait()
+            if inbox.closed:
+                break
+            move, error = inbox.take()
+            if error is not None and move is None:
+                await websocket.send_text(_dumps({"type": "error", "detail": error}))
+                continue
+
+            catalog = await _catalog(db)
+            zone = catalog.zones.get(zone_id)
+            if zone is None:
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Current zone not found")
+                break
+            x, y = move
+            if x < 0 or x >= zone.width or y < 0 or y >= zone.height:
+                await websocket.send_text(_dumps({"type": "error", "detail": "Position out of bounds"}))
+                continue
+            await _store_position(db, user_id, zone_id, x, y)
+
+            nearby = query_nearby(catalog, zone_id, x, y)
+            current = {entity_key(entry) for entry, _ in nearby}
+            await websocket.send_text(_dumps({
+                "type": "moved",
+                "position": {"x": x, "y": y},
+                "added": [entity_payload(entry, dist) for entry, dist in nearby if entity_key(entry) not in seen],
+                "removed": sorted(seen - current),
+            }))
+            seen = current
+
+            # Moves that arrive during this window are coalesced into the next update
+            if window:
+                await asyncio.sleep(window)
+    finally:
+        receiver.cancel()
+        await asyncio.gather(receiver, return_exceptions=True)
@@ -1,6 +1,5 @@
-from fastapi import APIRouter, HTTPException, status
-from app.core.deps import DbSession, CurrentUser
-from app.models import WorldZone, User, EnemySpawn, NPC, WorldChest, Enemy
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from app.core.deps import AsyncDbSession, AsyncCurrentUser, GameCatalog
 from app.schemas.world import (
     ZoneResponse,
     PlayerWorldState,
@@ -10,121 +9,110 @@ from app.schemas.world import (
     NearbyEntity,
     Position,
 )
-from app.schemas.progression import calculate_xp_to_next_level
+from app.repositories.users import deduct_coins
+from app.services.catalog import Catalog
+from app.services.position_buffer import position_buffer
+from app.services.progression import xp_table
+from app.services.spatial import SpatialEntry
 
 
 router = APIRouter(prefix="/world", tags=["world"])
 
+# Radius (Manhattan tiles) for entities included in /world/state
+NEARBY_RANGE = 10
+
+# Hashed zone URLs never change content, so clients may cache them forever
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
 
 def calculate_distance(x1: int, y1: int, x2: int, y2: int) -> int:
     """Calculate Manhattan distance between two points"""
     return abs(x1 - x2) + abs(y1 - y2)
 
 
+def query_nearby(catalog: Catalog, zone_id: int, x: int, y: int) -> list[tuple[SpatialEntry, int]]:
+    """(entry, distance) for every enemy, NPC and chest within NEARBY_RANGE of a position"""
+    grid = catalog.zone_index.get(zone_id)
+    if grid is None:
+        return []
+    return grid.query(x, y, NEARBY_RANGE)
+
+
 @router.get("/state", response_model=WorldStateResponse)
-def get_world_state(db: DbSession, current_user: CurrentUser):
+async def get_world_state(db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Get the current world state for the player"""
     # Get or assign player's zone
     if current_user.current_zone_id is None:
         # Assign to starting zone
-        starting_zone = db.query(WorldZone).filter(WorldZone.is_starting_zone == True).first()
-        if not starting_zone:
-            starting_zone = db.query(WorldZone).first()
+        starting_zone = catalog.starting_zone
         if not starting_zone:
             raise HTTPException(status_code=404, detail="No zones available")
 
         current_user.current_zone_id = starting_zone.id
         current_user.world_x = starting_zone.spawn_x
         current_user.world_y = starting_zone.spawn_y
-        db.commit()
 
-    zone = db.query(WorldZone).filter(WorldZone.id == current_user.current_zone_id).first()
+    zone = catalog.zones.get(current_user.current_zone_id)
     if not zone:
         raise HTTPException(status_code=404, detail="Current zone not found")
 
+    # Moves not yet flushed take precedence over the stored position
+    x, y = current_user.world_x, current_user.world_y
+    buffered = position_buffer.get(current_user.id, zone.id)
+    if buffered is not None:
+        x, y = buffered.x, buffered.y
+
     # Build player state
     player_state = PlayerWorldState(
         zone_id=zone.id,
         zone_slug=zone.slug,
         zone_name=zone.name,
-        position=Position(x=current_user.world_x, y=current_user.world_y),
+        position=Position(x=x, y=y),
         hp=current_user.hp,
         max_hp=current_user.max_hp,
         mp=current_user.mp,
         max_mp=current_user.max_mp,
         level=current_user.player_level,
         xp=current_user.current_xp,
-        xp_to_next=calculate_xp_to_next_level(current_user.player_level),
+        xp_to_next=xp_table.xp_to_next(current_user.player_level),
         gold=current_user.coins,
         attack=current_user.attack,
         defense=current_user.defense,
     )
 
-    # Get nearby entities (within 10 tiles)
-    nearby_range = 10
-    px, py = current_user.world_x, current_user.world_y
-
-    # Nearby enemies
-    enemy_spawns = db.query(EnemySpawn).filter(EnemySpawn.zone_id == zone.id).all()
-    nearby_enemies = []
-    for spawn in enemy_spawns:
-        dist = calculate_distance(px, py, spawn.spawn_x, spawn.spawn_y)
-        if dist <= nearby_range:
-            enemy = db.query(Enemy).filter(Enemy.id == spawn.enemy_id).first()
-            if enemy:
-                nearby_enemies.append(NearbyEntity(
-                    id=str(spawn.id),
-                    name=enemy.name,
-                    entity_type="enemy",
-                    position=Position(x=spawn.spawn_x, y=spawn.spawn_y),
-                    distance=dist,
-                ))
-
-    # Nearby NPCs
-    npcs = db.query(NPC).filter(NPC.zone_id == zone.id).all()
-    nearby_npcs = []
-    for npc in npcs:
-        dist = calculate_distance(px, py, npc.position_x, npc.position_y)
-        if dist <= nearby_range:
-            nearby_npcs.append(NearbyEntity(
-                id=npc.npc_id,
-                name=npc.display_name,
-                entity_type="npc",
-                position=Position(x=npc.position_x, y=npc.position_y),
-                distance=dist,
-            ))
-
-    # Nearby chests
-    chests = db.query(WorldChest).filter(WorldChest.zone_id == zone.id).all()
-    nearby_chests = []
-    for chest in chests:
-        dist = calculate_distance(px, py, chest.position_x, chest.position_y)
-        if dist <= nearby_range:
-            nearby_chests.append(NearbyEntity(
-                id=chest.chest_id,
-                name=f"{chest.chest_type.title()} Chest",
-                entity_type="chest",
-                position=Position(x=chest.position_x, y=chest.position_y),
-                distance=dist,
-            ))
+    # Get nearby entities (within NEARBY_RANGE tiles) from the zone's spatial index
+    nearby = {"enemy": [], "npc": [], "chest": []}
+    for entry, dist in query_nearby(catalog, zone.id, x, y):
+        nearby[entry.entity_type].append(NearbyEntity(
+            id=entry.id,
+            name=entry.name,
+            entity_type=entry.entity_type,
+            position=Position(x=entry.x, y=entry.y),
+            distance=dist,
+        ))
 
     return WorldStateResponse(
         player=player_state,
-        zone=ZoneResponse.model_validate(zone),
-        nearby_enemies=nearby_enemies,
-        nearby_npcs=nearby_npcs,
-        nearby_chests=nearby_chests,
+        zone_hash=catalog.zone_payloads[zone.id].hash,
+        nearby_enemies=nearby["enemy"],
+        nearby_npcs=nearby["npc"],
+        nearby_chests=nearby["chest"],
         nearby_items=[],  # TODO: Implement item drops
     )
 
 
 @router.get("/zones/{zone_slug}", response_model=ZoneResponse)
-def get_zone(zone_slug: str, db: DbSession, current_user: CurrentUser):
-    """Get zone data by slug"""
-    zone = db.query(WorldZone).filter(WorldZone.slug == zone_slug).first()
+async def get_zone(zone_slug: str, request: Request, current_user: AsyncCurrentUser, catalog: GameCatalog):
+    """Get zone data by slug, or by content-addressed "slug@hash" (served as immutable)"""
+    slug, _, requested_hash = zone_slug.partition("@")
+    zone = catalog.zones_by_slug.get(slug)
     if not zone:
         raise HTTPException(status_code=404, detail="Zone not found")
 
+    payload = catalog.zone_payloads[zone.id]
+    if requested_hash and requested_hash != payload.hash:
+        raise HTTPException(status_code=404, detail="Zone version not found")
+
     # Check level requirement
     if current_user.player_level < zone.level_requirement:
         raise HTTPException(
@@ -132,13 +120,22 @@ def get_zone(zone_slug: str, db: DbSession, current_user: CurrentUser):
             detail=f"Level {zone.level_requirement} required to access this zone"
         )
 
-    return ZoneResponse.model_validate(zone)
+    etag = f'"{payload.hash}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if requested_hash else "private, no-cache",
+    }
+    if_none_match = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+    if etag in if_none_match or "*" in if_none_match:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=payload.body, media_type="application/json", headers=headers)
 
 
 @router.post("/move")
-def update_position(data: UpdatePositionRequest, db: DbSession, current_user: CurrentUser):
+async def update_position(data: UpdatePositionRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Update player position after movement"""
-    zone = db.query(WorldZone).filter(WorldZone.id == current_user.current_zone_id).first()
+    zone = catalog.zones.get(current_user.current_zone_id)
     if not zone:
         raise HTTPException(status_code=404, detail="Current zone not found")
 
@@ -146,17 +143,19 @@ def update_position(data: UpdatePositionRequest, db: DbSession, current_user: Cu
     if data.x < 0 or data.x >= zone.width or data.y < 0 or data.y >= zone.height:
         raise HTTPException(status_code=400, detail="Position out of bounds")
 
-    current_user.world_x = data.x
-    current_user.world_y = data.y
-    db.commit()
+    if position_buffer.running:
+        position_buffer.record(current_user.id, zone.id, data.x, data.y)
+    else:
+        current_user.world_x = data.x
+        current_user.world_y = data.y
 
     return {"success": True, "message": "Position updated", "x": data.x, "y": data.y}
 
 
 @router.post("/transition")
-def transition_zone(data: ZoneTransitionRequest, db: DbSession, current_user: CurrentUser):
+async def transition_zone(data: ZoneTransitionRequest, db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Transition player to a different zone"""
-    target_zone = db.query(WorldZone).filter(WorldZone.slug == data.target_zone_slug).first()
+    target_zone = catalog.zones_by_slug.get(data.target_zone_slug)
     if not target_zone:
         raise HTTPException(status_code=404, detail="Target zone not found")
 
@@ -168,10 +167,10 @@ def transition_zone(data: ZoneTransitionRequest, db: DbSession, current_user: Cu
         )
 
     # Update player's zone and position
+    position_buffer.discard(current_user.id)
     current_user.current_zone_id = target_zone.id
     current_user.world_x = target_zone.spawn_x
     current_user.world_y = target_zone.spawn_y
-    db.commit()
 
     return {
         "success": True,
@@ -182,17 +181,16 @@ def transition_zone(data: ZoneTransitionRequest, db: DbSession, current_user: Cu
 
 
 @router.post("/respawn")
-def respawn_player(db: DbSession, current_user: CurrentUser):
+async def respawn_player(db: AsyncDbSession, current_user: AsyncCurrentUser, catalog: GameCatalog):
     """Respawn player at the zone's spawn point with full HP"""
-    zone = db.query(WorldZone).filter(WorldZone.id == current_user.current_zone_id).first()
+    zone = catalog.zones.get(current_user.current_zone_id)
     if not zone:
         # Respawn at starting zone
-        zone = db.query(WorldZone).filter(WorldZone.is_starting_zone == True).first()
-        if not zone:
-            zone = db.query(WorldZone).first()
+        zone = catalog.starting_zone
         current_user.current_zone_id = zone.id
 
     # Restore HP and position
+    position_buffer.discard(current_user.id)
     current_user.hp = current_user.max_hp
     current_user.mp = current_user.max_mp
     current_user.world_x = zone.spawn_x
@@ -200,9 +198,7 @@ def respawn_player(db: DbSession, current_user: CurrentUser):
 
     # Lose some gold on death (10%)
     gold_lost = int(current_user.coins * 0.1)
-    current_user.coins = max(0, current_user.coins - gold_lost)
-
-    db.commit()
+    await deduct_coins(db, current_user, gold_lost)
 
     return {
         "success": True,
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Literal
+from app.schemas.chest import LootItem
 
 
 class EnemyStats(BaseModel):
@@ -22,12 +23,14 @@ class CombatStartRequest(BaseModel):
 class CombatStartResponse(BaseModel):
     success: bool
     message: str
+    session_id: str
     enemy: Optional[EnemyStats]
     player_hp: int
     player_max_hp: int
 
 
 class CombatActionRequest(BaseModel):
+    session_id: str
     action: Literal["attack", "defend", "flee", "useItem"]
     item_id: Optional[str] = None
 
@@ -53,7 +56,43 @@ class CombatActionResponse(BaseModel):
     fled: bool
     xp_gained: int
     gold_gained: int
-    loot: list[dict]
+    loot: list[LootItem]
+    level_up: bool
+    new_level: Optional[int]
+
+
+class CombatResolveRequest(BaseModel):
+    session_id: str
+    policy: Literal["attack", "heal"] = "attack"
+    heal_below: float = Field(0.3, ge=0, le=1)  # Heal when HP fraction drops below this
+    heal_item_id: Optional[str] = None
+    max_turns: int = Field(100, ge=1, le=500)
+
+
+class CombatTurn(BaseModel):
+    turn: int
+    action: Literal["attack", "heal"]
+    player_damage: int = 0
+    player_crit: bool = False
+    healed: int = 0
+    enemy_damage: int = 0
+    enemy_crit: bool = False
+    player_hp: int
+    enemy_hp: int
+
+
+class CombatResolveResponse(BaseModel):
+    success: bool
+    message: str
+    outcome: Literal["victory", "defeat", "unresolved"]
+    turns: int
+    turn_log: list[CombatTurn]
+    player_hp: int
+    enemy_hp: int
+    xp_gained: int
+    gold_gained: int
+    items_used: int
+    loot: list[LootItem]
     level_up: bool
     new_level: Optional[int]
 
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Literal
 
 
@@ -79,7 +79,7 @@ class UnequipResponse(BaseModel):
 
 class DropItemRequest(BaseModel):
     item_id: str
-    quantity: int = 1
+    quantity: int = Field(1, ge=1)
 
 
 class DropItemResponse(BaseModel):
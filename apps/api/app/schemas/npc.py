@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 
 
@@ -67,7 +67,7 @@ class ShopInventoryResponse(BaseModel):
 
 class BuyItemRequest(BaseModel):
     item_id: str
-    quantity: int = 1
+    quantity: int = Field(1, ge=1)
 
 
 class BuyItemResponse(BaseModel):
@@ -81,7 +81,7 @@ class BuyItemResponse(BaseModel):
 
 class SellItemRequest(BaseModel):
     item_id: str
-    quantity: int = 1
+    quantity: int = Field(1, ge=1)
 
 
 class SellItemResponse(BaseModel):
@@ -70,9 +70,9 @@ class NearbyEntity(BaseModel):
 
 
 class WorldStateResponse(BaseModel):
-    """Full world state for rendering"""
+    """Dynamic world state for rendering; static zone data is fetched from /world/zones/{slug}@{zone_hash}"""
     player: PlayerWorldState
-    zone: ZoneResponse
+    zone_hash: str
     nearby_enemies: list[NearbyEntity]
     nearby_npcs: list[NearbyEntity]
     nearby_chests: list[NearbyEntity]
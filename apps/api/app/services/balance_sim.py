@@ -0,0 +1,312 @@
+"""
+Monte Carlo combat balance simulator.
+
+Plays millions of attack-only fights in batched NumPy arrays using the same
+rules as /combat/action: per-hit damage comes from calculate_damage(), enemies
+are rolled with scale_enemy_stats() from a random spawn's level range, and crits
+are `random() < crit_chance`. Every seeded enemy type is run against a grid of
+player levels and gear loadouts built from the equippable items.
+
+Run from apps/api against a seeded database:
+    python -m app.services.balance_sim --levels 1 2 3 4 5 --fights 20000 --seed 42
+    python -m app.services.balance_sim --enemies green_slime --loadouts none wooden_sword --csv out.csv
+"""
+import argparse
+import csv
+import itertools
+import sys
+from collections import namedtuple
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.models import User
+from app.routers.combat import ENEMY_LEVEL_SCALING, calculate_damage, scale_enemy_stats
+from app.services.catalog import Catalog
+from app.services.progression import LEVEL_UP_ATTACK, LEVEL_UP_DEFENSE, LEVEL_UP_HP, xp_table
+
+
+OUTCOME_UNRESOLVED = 0
+OUTCOME_VICTORY = 1
+OUTCOME_DEFEAT = 2
+
+DEFAULT_SECONDS_PER_TURN = 2.0
+DEFAULT_FIGHT_OVERHEAD = 5.0  # Walking to the next spawn, opening the fight, etc.
+
+Loadout = namedtuple("Loadout", ["name", "attack", "defense", "hp"])
+
+BalanceRow = namedtuple("BalanceRow", [
+    "enemy_type", "loadout", "player_level", "fights", "win_rate",
+    "avg_turns", "avg_turns_to_kill", "xp_per_minute", "minutes_to_level",
+])
+
+
+def _user_default(column: str):
+    return User.__table__.c[column].default.arg
+
+
+@dataclass(frozen=True)
+class PlayerStats:
+    hp: int
+    attack: int
+    defense: int
+    crit_chance: float
+
+
+def player_stats(level: int, loadout: Loadout | None = None) -> PlayerStats:
+    """Stats of a fresh account levelled to `level` (level-ups as in grant_xp) wearing `loadout`"""
+    gained = level - 1
+    bonus = loadout or Loadout("none", 0, 0, 0)
+    return PlayerStats(
+        hp=_user_default("max_hp") + gained * LEVEL_UP_HP + bonus.hp,
+        attack=_user_default("attack") + gained * LEVEL_UP_ATTACK + bonus.attack,
+        defense=_user_default("defense") + gained * LEVEL_UP_DEFENSE + bonus.defense,
+        crit_chance=_user_default("crit_chance"),
+    )
+
+
+def build_loadouts(catalog: Catalog) -> list[Loadout]:
+    """Every combination of (nothing or one item) per equip slot"""
+    by_slot = {}
+    for item in catalog.items.values():
+        if item.item_type in ("weapon", "armor") and item.equip_slot:
+            by_slot.setdefault(item.equip_slot, []).append(item)
+
+    loadouts = []
+    for combo in itertools.product(*[[None, *items] for _, items in sorted(by_slot.items())]):
+        worn = [item for item in combo if item is not None]
+        loadouts.append(Loadout(
+            name="+".join(item.item_id for item in worn) or "none",
+            attack=sum(item.attack_bonus for item in worn),
+            defense=sum(item.defense_bonus for item in worn),
+            hp=sum(item.hp_bonus for item in worn),
+        ))
+    return loadouts
+
+
+def simulate_fights(
+    player_hp: np.ndarray,
+    player_hit: np.ndarray,
+    player_crit_hit: np.ndarray,
+    player_crit: np.ndarray,
+    enemy_hp: np.ndarray,
+    enemy_hit: np.ndarray,
+    enemy_crit_hit: np.ndarray,
+    enemy_crit: np.ndarray,
+    rng: np.random.Generator,
+    max_turns: int = 100,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Play one attack-only fight per array element.
+
+    `*_hit` / `*_crit_hit` are the precomputed normal and critical damage of
+    each side. Returns (outcome, turns) arrays; fights still going after
+    max_turns are OUTCOME_UNRESOLVED.
+    """
+    count = len(player_hp)
+    player_hp = player_hp.astype(np.int64)
+    enemy_hp = enemy_hp.astype(np.int64)
+    outcome = np.full(count, OUTCOME_UNRESOLVED, dtype=np.int8)
+    turns = np.full(count, max_turns, dtype=np.int32)
+    active = np.arange(count)
+
+    for turn in range(1, max_turns + 1):
+        if active.size == 0:
+            break
+
+        # Player swings first
+        crit = rng.random(active.size) < player_crit[active]
+        enemy_hp[active] -= np.where(crit, player_crit_hit[active], player_hit[active])
+        killed = enemy_hp[active] <= 0
+        outcome[active[killed]] = OUTCOME_VICTORY
+        turns[active[killed]] = turn
+        active = active[~killed]
+
+        # Surviving enemies strike back
+        crit = rng.random(active.size) < enemy_crit[active]
+        player_hp[active] -= np.where(crit, enemy_crit_hit[active], enemy_hit[active])
+        died = player_hp[active] <= 0
+        outcome[active[died]] = OUTCOME_DEFEAT
+        turns[active[died]] = turn
+        active = active[~died]
+
+    return outcome, turns
+
+
+def simulate_matchup(
+    enemy,
+    levels: list[tuple[int, int]],
+    player: PlayerStats,
+    fights: int,
+    rng: np.random.Generator,
+    max_turns: int = 100,
+    scaling: float = ENEMY_LEVEL_SCALING,
+) -> dict[str, np.ndarray]:
+    """Simulate `fights` encounters of one player build against one enemy type"""
+    # Like /combat/start: pick a spawn, then a level uniformly within its range
+    spawn_pick = rng.integers(len(levels), size=fights)
+    mins = np.array([lo for lo, _ in levels])[spawn_pick]
+    maxs = np.array([hi for _, hi in levels])[spawn_pick]
+    enemy_level = rng.integers(mins, maxs + 1)
+
+    # Per-level lookup tables computed with the game's own scalar functions
+    top = int(enemy_level.max())
+    table = {name: np.zeros(top + 1, dtype=np.int64) for name in
+             ("hp", "xp", "hit", "crit_hit", "taken", "crit_taken")}
+    for level in range(int(enemy_level.min()), top + 1):
+        scaled = scale_enemy_stats(enemy, level, scaling)
+        table["hp"][level] = scaled["hp"]
+        table["xp"][level] = scaled["xp_reward"]
+        table["hit"][level] = calculate_damage(player.attack, scaled["defense"])
+        table["crit_hit"][level] = calculate_damage(player.attack, scaled["defense"], True)
+        table["taken"][level] = calculate_damage(scaled["attack"], player.defense)
+        table["crit_taken"][level] = calculate_damage(scaled["attack"], player.defense, True)
+
+    outcome, turns = simulate_fights(
+        player_hp=np.full(fights, player.hp),
+        player_hit=table["hit"][enemy_level],
+        player_crit_hit=table["crit_hit"][enemy_level],
+        player_crit=np.full(fights, player.crit_chance),
+        enemy_hp=table["hp"][enemy_level],
+        enemy_hit=table["taken"][enemy_level],
+        enemy_crit_hit=table["crit_taken"][enemy_level],
+        enemy_crit=np.full(fights, enemy.crit_chance),
+        rng=rng,
+        max_turns=max_turns,
+    )
+    return {"outcome": outcome, "turns": turns, "xp": table["xp"][enemy_level]}
+
+
+def summarize(
+    enemy_type: str,
+    loadout: str,
+    player_level: int,
+    result: dict[str, np.ndarray],
+    seconds_per_turn: float = DEFAULT_SECONDS_PER_TURN,
+    fight_overhead: float = DEFAULT_FIGHT_OVERHEAD,
+) -> BalanceRow:
+    won = result["outcome"] == OUTCOME_VICTORY
+    turns = result["turns"]
+    fights = len(turns)
+
+    minutes = (turns.sum() * seconds_per_turn + fights * fight_overhead) / 60
+    xp_per_minute = float(result["xp"][won].sum() / minutes) if minutes else 0.0
+    xp_needed = xp_table.xp_to_next(player_level)
+
+    return BalanceRow(
+        enemy_type=enemy_type,
+        loadout=loadout,
+        player_level=player_level,
+        fights=fights,
+        win_rate=float(won.mean()),
+        avg_turns=float(turns.mean()),
+        avg_turns_to_kill=float(turns[won].mean()) if won.any() else float("nan"),
+        xp_per_minute=xp_per_minute,
+        minutes_to_level=xp_needed / xp_per_minute if xp_per_minute else float("inf"),
+    )
+
+
+def run_grid(
+    catalog: Catalog,
+    spawns: list,
+    player_levels: list[int],
+    fights: int = 10000,
+    seed: int = 0,
+    enemy_types: list[str] | None = None,
+    loadout_names: list[str] | None = None,
+    max_turns: int = 100,
+    scaling: float = ENEMY_LEVEL_SCALING,
+    seconds_per_turn: float = DEFAULT_SECONDS_PER_TURN,
+    fight_overhead: float = DEFAULT_FIGHT_OVERHEAD,
+) -> list[BalanceRow]:
+    """Simulate every (enemy type, loadout, player level) cell; identical seeds give identical tables"""
+    rng = np.random.default_rng(seed)
+
+    enemies = [e for e in catalog.enemies.values() if not enemy_types or e.enemy_type in enemy_types]
+    loadouts = [l for l in build_loadouts(catalog) if not loadout_names or l.name in loadout_names]
+
+    rows = []
+    for enemy in enemies:
+        levels = [(s.level_min, s.level_max) for s in spawns if s.enemy_id == enemy.id] or [(1, 1)]
+        for loadout in loadouts:
+            for player_level in player_levels:
+                player = player_stats(player_level, loadout)
+                result = simulate_matchup(enemy, levels, player, fights, rng, max_turns, scaling)
+                rows.append(summarize(
+                    enemy.enemy_type, loadout.name, player_level, result, seconds_per_turn, fight_overhead,
+                ))
+    return rows
+
+
+def format_tables(rows: list[BalanceRow], player_levels: list[int]) -> str:
+    """Win-rate, turns-to-kill and XP/minute pivots: one line per (enemy, loadout), one column per level"""
+    cells = {(r.enemy_type, r.loadout, r.player_level): r for r in rows}
+    keys = list(dict.fromkeys((r.enemy_type, r.loadout) for r in rows))
+    label_width = max([len(f"{e} / {l}") for e, l in keys] + [10])
+
+    out = []
+    for title, field, fmt in (
+        ("Win rate", "win_rate", "{:7.1%}"),
+        ("Turns to kill", "avg_turns_to_kill", "{:7.1f}"),
+        ("XP per minute", "xp_per_minute", "{:7.1f}"),
+    ):
+        out.append(f"== {title} ==")
+        out.append(" " * label_width + "".join(f"{'L' + str(level):>8}" for level in player_levels))
+        for enemy_type, loadout in keys:
+            values = [getattr(cells[(enemy_type, loadout, level)], field) for level in player_levels]
+            out.append(f"{enemy_type + ' / ' + loadout:<{label_width}}" + "".join(" " + fmt.format(v) for v in values))
+        out.append("")
+    return "\n".join(out)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, nargs="+", default=list(range(1, 11)), help="Player levels to simulate")
+    parser.add_argument("--fights", type=int, default=10000, help="Fights per (enemy, loadout, level) cell")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--enemies", nargs="+", help="Only these enemy_type values")
+    parser.add_argument("--loadouts", nargs="+", help="Only these loadouts (e.g. none, wooden_sword+leather_armor)")
+    parser.add_argument("--max-turns", type=int, default=100)
+    parser.add_argument("--scaling", type=float, default=ENEMY_LEVEL_SCALING, help="Enemy multiplier per level")
+    parser.add_argument("--seconds-per-turn", type=float, default=DEFAULT_SECONDS_PER_TURN)
+    parser.add_argument("--fight-overhead", type=float, default=DEFAULT_FIGHT_OVERHEAD, help="Seconds between fights")
+    parser.add_argument("--csv", help="Also write every cell to this CSV file")
+    args = parser.parse_args(argv)
+
+    from app.core.database import SessionLocal
+    from app.models import EnemySpawn
+    from app.services.catalog import build_catalog
+
+    db = SessionLocal()
+    try:
+        catalog = build_catalog(db)
+        spawns = db.query(EnemySpawn).all()
+    finally:
+        db.close()
+
+    if not catalog.enemies:
+        sys.exit("No enemies found - seed the world first (python -m app.seed_world)")
+
+    rows = run_grid(
+        catalog, spawns, args.levels,
+        fights=args.fights,
+        seed=args.seed,
+        enemy_types=args.enemies,
+        loadout_names=args.loadouts,
+        max_turns=args.max_turns,
+        scaling=args.scaling,
+        seconds_per_turn=args.seconds_per_turn,
+        fight_overhead=args.fight_overhead,
+    )
+    print(format_tables(rows, args.levels))
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(BalanceRow._fields)
+            writer.writerows(rows)
+        print(f"Wrote {len(rows)} rows to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
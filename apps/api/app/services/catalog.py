@@ -0,0 +1,223 @@
+"""
+In-process cache of static game content.
+
+Items, enemies, NPCs, zones, characters, enemy spawns and chests only change
+when an admin reseeds, so they are loaded once into immutable lookup maps (and
+per-zone spatial grids) instead of being re-queried on every gameplay request.
+"""
+import hashlib
+import logging
+import threading
+import time
+import zlib
+from collections import namedtuple
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Item, Enemy, NPC, WorldZone, Character, EnemySpawn, WorldChest
+from app.schemas.world import ZoneResponse
+from app.services.loot import EMPTY_LOOT_TABLE, LootTable, LootTableError, compile_loot_table
+from app.services.spatial import SpatialEntry, SpatialGrid
+
+
+logger = logging.getLogger(__name__)
+
+CATALOG_MODELS = (Item, Enemy, NPC, WorldZone, Character, EnemySpawn, WorldChest)
+
+
+def _entry_type(model) -> type:
+    """Immutable row type with one field per mapped column"""
+    return namedtuple(f"{model.__name__}Entry", [c.key for c in model.__table__.columns])
+
+
+ItemEntry = _entry_type(Item)
+EnemyEntry = _entry_type(Enemy)
+NPCEntry = _entry_type(NPC)
+ZoneEntry = _entry_type(WorldZone)
+CharacterEntry = _entry_type(Character)
+SpawnEntry = _entry_type(EnemySpawn)
+ChestEntry = _entry_type(WorldChest)
+
+# Pre-serialised ZoneResponse body and its content hash (used as the strong ETag)
+ZonePayload = namedtuple("ZonePayload", ["hash", "body"])
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """Immutable snapshot of static game content"""
+    version: int
+    items: Mapping[int, Any]
+    items_by_key: Mapping[str, Any]
+    enemies: Mapping[int, Any]
+    enemies_by_type: Mapping[str, Any]
+    npcs: Mapping[int, Any]
+    npcs_by_key: Mapping[str, Any]
+    zones: Mapping[int, Any]
+    zones_by_slug: Mapping[str, Any]
+    starting_zone: Any | None
+    characters: tuple  # Ordered by sort_order
+    characters_by_id: Mapping[int, Any]
+    zone_index: Mapping[int, SpatialGrid]  # Static entities (spawns, NPCs, chests) per zone
+    zone_payloads: Mapping[int, ZonePayload]
+    enemy_loot: Mapping[int, LootTable]  # By Enemy.id
+    chest_loot: Mapping[int, LootTable]  # By WorldChest.id
+
+
+def _load_rows(db: Session, model, entry_type) -> list:
+    table = model.__table__
+    return [entry_type(*row) for row in db.execute(select(table).order_by(table.c.id))]
+
+
+def build_catalog(db: Session) -> Catalog:
+    """Load all static content tables into a new Catalog"""
+    items = _load_rows(db, Item, ItemEntry)
+    enemies = _load_rows(db, Enemy, EnemyEntry)
+    npcs = _load_rows(db, NPC, NPCEntry)
+    zones = _load_rows(db, WorldZone, ZoneEntry)
+    characters = _load_rows(db, Character, CharacterEntry)
+    spawns = _load_rows(db, EnemySpawn, SpawnEntry)
+    chests = _load_rows(db, WorldChest, ChestEntry)
+
+    # Content hash doubles as the version so every worker reports the same number for the same data
+    version = zlib.crc32(repr((items, enemies, npcs, zones, characters, spawns, chests)).encode("utf-8"))
+
+    starting_zone = next((z for z in zones if z.is_starting_zone), zones[0] if zones else None)
+    items_by_key = {i.item_id: i for i in items}
+
+    return Catalog(
+        version=version,
+        items=MappingProxyType({i.id: i for i in items}),
+        items_by_key=MappingProxyType(items_by_key),
+        enemies=MappingProxyType({e.id: e for e in enemies}),
+        enemies_by_type=MappingProxyType({e.enemy_type: e for e in enemies}),
+        npcs=MappingProxyType({n.id: n for n in npcs}),
+        npcs_by_key=MappingProxyType({n.npc_id: n for n in npcs}),
+        zones=MappingProxyType({z.id: z for z in zones}),
+        zones_by_slug=MappingProxyType({z.slug: z for z in zones}),
+        starting_zone=starting_zone,
+        characters=tuple(sorted(characters, key=lambda c: c.sort_order)),
+        characters_by_id=MappingProxyType({c.id: c for c in characters}),
+        zone_index=MappingProxyType(_build_zone_index(enemies, spawns, npcs, chests)),
+        zone_payloads=MappingProxyType({z.id: _build_zone_payload(z) for z in zones}),
+        enemy_loot=MappingProxyType({e.id: _compile_loot(e, e.enemy_type, items_by_key) for e in enemies}),
+        chest_loot=MappingProxyType({c.id: _compile_loot(c, c.chest_id, items_by_key) for c in chests}),
+    )
+
+
+def _compile_loot(entity, key: str, items_by_key: Mapping[str, Any]) -> LootTable:
+    """Bad loot entries are logged and skipped instead of failing the table or the catalog"""
+    kind = type(entity).__name__
+
+    def skip(error: LootTableError) -> None:
+        logger.error("Invalid loot entry on %s %r, skipped: %s", kind, key, error)
+
+    try:
+        return compile_loot_table(entity.loot_table, items_by_key, on_invalid=skip)
+    except LootTableError:
+        logger.exception("Invalid loot table on %s %r; it will drop nothing", kind, key)
+        return EMPTY_LOOT_TABLE
+
+
+def _build_zone_payload(zone) -> ZonePayload:
+    body = ZoneResponse.model_validate(zone).model_dump_json().encode("utf-8")
+    return ZonePayload(hashlib.sha256(body).hexdigest()[:16], body)
+
+
+def _build_zone_index(enemies, spawns, npcs, chests) -> dict[int, SpatialGrid]:
+    """Build one SpatialGrid per zone with enemy names resolved up front"""
+    enemy_names = {e.id: e.name for e in enemies}
+    by_zone = {}
+    seq = 0
+
+    def add(zone_id, entity_type, entity_id, name, x, y):
+        nonlocal seq
+        by_zone.setdefault(zone_id, []).append(SpatialEntry(seq, entity_type, entity_id, name, x, y))
+        seq += 1
+
+    for spawn in spawns:
+        if spawn.enemy_id in enemy_names:
+            add(spawn.zone_id, "enemy", str(spawn.id), enemy_names[spawn.enemy_id], spawn.spawn_x, spawn.spawn_y)
+    for npc in npcs:
+        add(npc.zone_id, "npc", npc.npc_id, npc.display_name, npc.position_x, npc.position_y)
+    for chest in chests:
+        add(chest.zone_id, "chest", chest.chest_id, f"{chest.chest_type.title()} Chest", chest.position_x, chest.position_y)
+
+    return {zone_id: SpatialGrid(entries) for zone_id, entries in by_zone.items()}
+
+
+class CatalogService:
+    """Holds the current Catalog and rebuilds it lazily after invalidation"""
+
+    def __init__(self, ttl_seconds: int = 0):
+        self.ttl_seconds = ttl_seconds
+        self._catalog: Catalog | None = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _current(self) -> Catalog | None:
+        catalog = self._catalog
+        if catalog is not None and self.ttl_seconds and time.monotonic() - self._loaded_at > self.ttl_seconds:
+            return None
+        return catalog
+
+    def _store(self, catalog: Catalog, generation: int) -> Catalog:
+        with self._lock:
+            # Don't publish a snapshot that was loaded before an invalidation
+            if generation == self._generation:
+                self._catalog = catalog
+                self._loaded_at = time.monotonic()
+        return catalog
+
+    def get_sync(self, db: Session) -> Catalog:
+        catalog = self._current()
+        if catalog is None:
+            generation = self._generation
+            catalog = self._store(build_catalog(db), generation)
+        return catalog
+
+    async def get(self, db: AsyncSession) -> Catalog:
+        catalog = self._current()
+        if catalog is None:
+            generation = self._generation
+            catalog = self._store(await db.run_sync(build_catalog), generation)
+        return catalog
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._catalog = None
+
+    @property
+    def version(self) -> int | None:
+        catalog = self._catalog
+        return catalog.version if catalog else None
+
+
+catalog_service = CatalogService(ttl_seconds=settings.CATALOG_TTL_SECONDS)
+
+
+# Invalidate automatically whenever a session commits a change to catalog content
+@event.listens_for(Session, "after_flush")
+def _mark_catalog_dirty(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, CATALOG_MODELS):
+            session.info["catalog_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("catalog_dirty", False):
+        catalog_service.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_dirty_on_rollback(session):
+    session.info.pop("catalog_dirty", None)
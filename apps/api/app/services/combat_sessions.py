@@ -0,0 +1,238 @@
+"""
+Server-side combat session store.
+
+/combat/start rolls the scaled enemy once and stores it under a session id;
+/combat/action then reads and updates that encounter. Two backends:
+
+- MemoryCombatSessionStore: per-process dict with TTL and LRU eviction (default)
+- DatabaseCombatSessionStore: combat_sessions table, for multi-worker deployments
+
+Both do a single keyed read and a single keyed write per action. A request
+that will change an encounter claims it first, against the turn it read: a
+concurrent request working on the same turn fails its claim (409), so a fight
+is never settled or rewarded twice. The database backend claims and writes in
+the request's transaction; the memory backend holds the claim and applies its
+writes only once that transaction has committed.
+"""
+import random
+import secrets
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields, replace
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, event, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.combat_session import CombatSession
+
+
+@dataclass
+class CombatState:
+    """One in-progress encounter"""
+    session_id: str
+    user_id: int
+    spawn_id: int
+    enemy_id: int
+    enemy_level: int
+    enemy_hp: int
+    enemy_max_hp: int
+    enemy_attack: int
+    enemy_defense: int
+    enemy_crit_chance: float
+    xp_reward: int
+    coin_reward: int
+    rng_seed: int
+    turn: int = 0
+
+    def rng(self) -> random.Random:
+        """RNG for the current turn, derived from (seed, turn) so the state stays two integers"""
+        return random.Random(f"{self.rng_seed}:{self.turn}")
+
+
+def new_session_id() -> str:
+    return secrets.token_hex(16)
+
+
+def new_rng_seed() -> int:
+    return secrets.randbits(63)
+
+
+class CombatSessionStore(ABC):
+    """
+    Backend interface; db is the request's AsyncSession (unused by the memory
+    backend). get() returns a detached copy: changing it has no effect until save().
+    """
+
+    @abstractmethod
+    async def get(self, db: AsyncSession, session_id: str) -> CombatState | None:
+        ...
+
+    @abstractmethod
+    async def claim(self, db: AsyncSession, state: CombatState) -> bool:
+        """Reserve the encounter for this request if it is still at state.turn; False if another request got there first"""
+
+    @abstractmethod
+    async def save(self, db: AsyncSession, state: CombatState) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, db: AsyncSession, session_id: str) -> None:
+        ...
+
+
+class MemoryCombatSessionStore(CombatSessionStore):
+    """In-process store with TTL expiry and LRU eviction"""
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: int = 900):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: OrderedDict[str, tuple[float, CombatState]] = OrderedDict()
+        self._claimed: set[str] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def get(self, db: AsyncSession, session_id: str) -> CombatState | None:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            expires_at, state = entry
+            if expires_at < time.monotonic():
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return replace(state)
+
+    async def claim(self, db: AsyncSession, state: CombatState) -> bool:
+        with self._lock:
+            entry = self._sessions.get(state.session_id)
+            if entry is None or entry[1].turn != state.turn or state.session_id in self._claimed:
+                return False
+            self._claimed.add(state.session_id)
+        if db is not None and not db.in_transaction():
+            await db.begin()  # So the commit or rollback that ends it releases the claim
+        _on_transaction_end(db, lambda: self._release(state.session_id))
+        return True
+
+    def _release(self, session_id: str) -> None:
+        with self._lock:
+            self._claimed.discard(session_id)
+
+    async def save(self, db: AsyncSession, state: CombatState) -> None:
+        _after_commit(db, lambda: self._store(replace(state)))
+
+    def _store(self, state: CombatState) -> None:
+        with self._lock:
+            self._sessions[state.session_id] = (time.monotonic() + self.ttl_seconds, state)
+            self._sessions.move_to_end(state.session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    async def delete(self, db: AsyncSession, session_id: str) -> None:
+        _after_commit(db, lambda: self._discard(session_id))
+
+    def _discard(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class DatabaseCombatSessionStore(CombatSessionStore):
+    """Store backed by the combat_sessions table; changes are committed with the request's transaction"""
+
+    _columns = [f.name for f in fields(CombatState)]
+
+    def __init__(self, ttl_seconds: int = 900):
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, db: AsyncSession, session_id: str) -> CombatState | None:
+        record = await db.get(CombatSession, session_id)
+        if record is None or record.expires_at < datetime.utcnow():
+            return None
+        return CombatState(**{name: getattr(record, name) for name in self._columns})
+
+    async def claim(self, db: AsyncSession, state: CombatState) -> bool:
+        # Row-locks the session until commit; a concurrent claim then finds the turn moved on (or the row gone)
+        result = await db.execute(
+            update(CombatSession)
+            .where(CombatSession.session_id == state.session_id, CombatSession.turn == state.turn)
+            .values(expires_at=datetime.utcnow() + timedelta(seconds=self.ttl_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    async def save(self, db: AsyncSession, state: CombatState) -> None:
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        # Served from the identity map when get() already loaded it in this request
+        record = await db.get(CombatSession, state.session_id)
+        if record is None:
+            # New encounter: clear out this user's expired sessions while we're here
+            await db.execute(delete(CombatSession).where(
+                CombatSession.user_id == state.user_id,
+                CombatSession.expires_at < datetime.utcnow(),
+            ))
+            record = CombatSession(session_id=state.session_id)
+            db.add(record)
+        for name in self._columns:
+            setattr(record, name, getattr(state, name))
+        record.expires_at = expires_at
+
+    async def delete(self, db: AsyncSession, session_id: str) -> None:
+        record = await db.get(CombatSession, session_id)
+        if record is not None:
+            await db.delete(record)
+
+
+_AFTER_COMMIT = "combat_session_after_commit"
+_ON_END = "combat_session_on_end"
+
+
+def _after_commit(db: AsyncSession | None, callback) -> None:
+    """Run `callback` once db's transaction commits (right away without a session)"""
+    if db is None:
+        callback()
+    else:
+        db.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+def _on_transaction_end(db: AsyncSession | None, callback) -> None:
+    """Run `callback` after db's transaction commits or rolls back (right away without a session)"""
+    if db is None:
+        callback()
+    else:
+        db.info.setdefault(_ON_END, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session):
+    for callback in session.info.pop(_AFTER_COMMIT, ()):
+        callback()
+    for callback in session.info.pop(_ON_END, ()):
+        callback()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session, previous_transaction):
+    session.info.pop(_AFTER_COMMIT, None)
+    for callback in session.info.pop(_ON_END, ()):
+        callback()
+
+
+def create_combat_session_store(backend: str) -> CombatSessionStore:
+    if backend == "memory":
+        return MemoryCombatSessionStore(
+            max_sessions=settings.COMBAT_SESSION_MAX,
+            ttl_seconds=settings.COMBAT_SESSION_TTL_SECONDS,
+        )
+    if backend == "database":
+        return DatabaseCombatSessionStore(ttl_seconds=settings.COMBAT_SESSION_TTL_SECONDS)
+    raise ValueError(f"Unknown combat session backend: {backend}")
+
+
+combat_sessions = create_combat_session_store(settings.COMBAT_SESSION_BACKEND)
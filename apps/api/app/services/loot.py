@@ -0,0 +1,189 @@
+"""
+Loot tables compiled into samplers.
+
+A loot table is the JSON list stored on Enemy.loot_table / WorldChest.loot_table.
+Each entry names an item and how it drops:
+
+    {"item_id": "health_potion", "quantity": 2}                  guaranteed
+    {"item_id": "health_potion", "chance": 0.2}                  independent roll
+    {"item_id": "iron_sword", "weight": 1}                       weighted pool
+    {"item_id": null, "weight": 9}                               weighted "nothing"
+
+All weighted entries of a table form one pool, of which exactly one entry is
+picked per roll using Vose's alias method. Tables are validated and their item
+keys resolved to Item rows once, when the catalog is built, so sampling never
+touches the database.
+"""
+import random
+from collections import namedtuple
+from typing import Any, Callable, Mapping
+
+from app.schemas.chest import LootItem
+
+
+# Resolved drop: the catalog ItemEntry and how many of it
+Drop = namedtuple("Drop", ["item", "quantity"])
+
+
+class LootTableError(ValueError):
+    """A loot table entry is malformed or references an unknown item"""
+
+
+class AliasSampler:
+    """O(1) weighted choice over a fixed set of outcomes (Vose's alias method)"""
+
+    def __init__(self, weights: list[float]):
+        count = len(weights)
+        total = float(sum(weights))
+        if count == 0 or total <= 0:
+            raise LootTableError("Weighted pool needs at least one positive weight")
+
+        scaled = [w * count / total for w in weights]
+        prob = [0.0] * count
+        alias = [0] * count
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        for i in small + large:
+            prob[i] = 1.0
+
+        self._prob = tuple(prob)
+        self._alias = tuple(alias)
+
+    def __len__(self) -> int:
+        return len(self._prob)
+
+    def sample(self, rng: random.Random = random) -> int:
+        i = int(rng.random() * len(self._prob))
+        return i if rng.random() < self._prob[i] else self._alias[i]
+
+
+class LootTable:
+    """Compiled loot table; build with compile_loot_table()"""
+
+    def __init__(self, guaranteed: tuple, independent: tuple, weighted: tuple, sampler: AliasSampler | None):
+        self.guaranteed = guaranteed    # Drops
+        self.independent = independent  # (chance, Drop)
+        self.weighted = weighted        # Drop or None, parallel to the sampler's outcomes
+        self._sampler = sampler
+
+    def __bool__(self) -> bool:
+        return bool(self.guaranteed or self.independent or self.weighted)
+
+    def roll(self, rng: random.Random = random) -> list[Drop]:
+        """Sample one set of drops, merged per item"""
+        drops = list(self.guaranteed)
+        for chance, drop in self.independent:
+            if rng.random() < chance:
+                drops.append(drop)
+        if self._sampler is not None:
+            picked = self.weighted[self._sampler.sample(rng)]
+            if picked is not None:
+                drops.append(picked)
+        return merge_drops(drops)
+
+
+EMPTY_LOOT_TABLE = LootTable((), (), (), None)
+
+
+def merge_drops(drops: list[Drop]) -> list[Drop]:
+    """Combine drops of the same item, keeping first-seen order"""
+    merged = {}
+    for drop in drops:
+        if drop.item.id in merged:
+            merged[drop.item.id] = Drop(drop.item, merged[drop.item.id].quantity + drop.quantity)
+        else:
+            merged[drop.item.id] = drop
+    return list(merged.values())
+
+
+def loot_items(drops: list[Drop]) -> list[LootItem]:
+    return [
+        LootItem(item_id=d.item.item_id, name=d.item.name, quantity=d.quantity, rarity=d.item.rarity)
+        for d in drops
+    ]
+
+
+def _number(entry: dict, key: str, default: float) -> float:
+    value = entry.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise LootTableError(f"{key} must be a number in {entry!r}")
+    return value
+
+
+def _add_entry(entry, items_by_key, guaranteed, independent, weighted, weights) -> None:
+    """Validate one entry and append it to its group; nothing is appended if it is invalid"""
+    if not isinstance(entry, dict):
+        raise LootTableError(f"Loot entry must be an object: {entry!r}")
+
+    key = entry.get("item_id")
+    drop = None
+    if key is not None:
+        item = items_by_key.get(key)
+        if item is None:
+            raise LootTableError(f"Unknown item_id {key!r} in loot table")
+        quantity = _number(entry, "quantity", 1)
+        if not isinstance(quantity, int) or quantity < 1:
+            raise LootTableError(f"quantity must be a positive integer in {entry!r}")
+        drop = Drop(item, quantity)
+
+    if "weight" in entry:
+        weight = _number(entry, "weight", 0)
+        if weight < 0:
+            raise LootTableError(f"weight must not be negative in {entry!r}")
+        weighted.append(drop)
+        weights.append(weight)
+        return
+
+    if drop is None:
+        raise LootTableError(f"Only weighted entries may omit item_id: {entry!r}")
+    chance = _number(entry, "chance", 1.0)
+    if not 0 <= chance <= 1:
+        raise LootTableError(f"chance must be between 0 and 1 in {entry!r}")
+    if chance >= 1:
+        guaranteed.append(drop)
+    elif chance > 0:
+        independent.append((chance, drop))
+
+
+def compile_loot_table(
+    entries: list[dict] | None,
+    items_by_key: Mapping[str, Any],
+    on_invalid: Callable[[LootTableError], None] | None = None,
+) -> LootTable:
+    """
+    Validate a JSON loot table and resolve its item keys. With `on_invalid`,
+    each bad entry is reported to it and skipped instead of failing the table.
+    """
+    if not entries:
+        return EMPTY_LOOT_TABLE
+    if not isinstance(entries, list):
+        raise LootTableError("Loot table must be a list of entries")
+
+    guaranteed = []
+    independent = []
+    weighted = []
+    weights = []
+    for entry in entries:
+        try:
+            _add_entry(entry, items_by_key, guaranteed, independent, weighted, weights)
+        except LootTableError as exc:
+            if on_invalid is None:
+                raise
+            on_invalid(exc)
+
+    sampler = None
+    if weighted:
+        try:
+            sampler = AliasSampler(weights)
+        except LootTableError as exc:
+            if on_invalid is None:
+                raise
+            on_invalid(exc)
+            weighted = []
+    return LootTable(tuple(guaranteed), tuple(independent), tuple(weighted), sampler)
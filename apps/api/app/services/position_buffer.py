@@ -0,0 +1,145 @@
+"""
+Write-behind buffer for player positions.
+
+/world/move only records the latest (zone, x, y) per user in memory; a
+background task writes all buffered positions to users.world_x/world_y in one
+executemany UPDATE every POSITION_FLUSH_INTERVAL_SECONDS, or sooner once
+POSITION_FLUSH_MAX_PENDING users are waiting, and once more on shutdown.
+
+Each UPDATE is guarded by the zone the move was made in, so a buffered step can
+never drag a player back after a zone transition or respawn. Readers in this
+process (/world/state) overlay the buffered position on the stored one; a batch
+being written stays visible until its commit and cache invalidation are done.
+"""
+import asyncio
+import logging
+from collections import namedtuple
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.identity_cache import identity_cache
+from app.models import User
+
+
+logger = logging.getLogger(__name__)
+
+BufferedPosition = namedtuple("BufferedPosition", ["zone_id", "x", "y"])
+
+users = User.__table__
+
+_FLUSH_STATEMENT = (
+    update(users)
+    .where(users.c.id == bindparam("b_user_id"), users.c.current_zone_id == bindparam("b_zone_id"))
+    .values(world_x=bindparam("b_x"), world_y=bindparam("b_y"))
+)
+
+
+class PositionBuffer:
+    def __init__(self, engine: AsyncEngine | None = None, interval: float = 1.0, max_pending: int = 500):
+        self.engine = engine
+        self.interval = interval
+        self.max_pending = max_pending
+        self.flushed = 0
+        self._pending: dict[int, BufferedPosition] = {}
+        self._inflight: dict[int, BufferedPosition] = {}  # Batch being flushed
+        self._task: asyncio.Task | None = None
+        self._flush_task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    @property
+    def running(self) -> bool:
+        """Whether moves are buffered; without the background task they are written directly"""
+        return self._task is not None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, user_id: int, zone_id: int, x: int, y: int) -> None:
+        """Buffer a move; kicks off an early flush once the size threshold is reached"""
+        self._pending[user_id] = BufferedPosition(zone_id, x, y)
+        if len(self._pending) >= self.max_pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    def get(self, user_id: int, zone_id: int) -> BufferedPosition | None:
+        """Buffered position for a user, if it was made in `zone_id`"""
+        position = self._pending.get(user_id) or self._inflight.get(user_id)
+        if position is not None and position.zone_id == zone_id:
+            return position
+        return None
+
+    def discard(self, user_id: int) -> None:
+        """Drop a buffered move (call before writing the position directly)"""
+        self._pending.pop(user_id, None)
+        self._inflight.pop(user_id, None)
+
+    async def flush(self) -> int:
+        """Write every buffered position in one executemany; returns the number of rows sent"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch = self._inflight = self._pending
+            self._pending = {}
+            params = [
+                {"b_user_id": user_id, "b_zone_id": pos.zone_id, "b_x": pos.x, "b_y": pos.y}
+                for user_id, pos in batch.items()
+            ]
+            try:
+                async with self.engine.begin() as conn:
+                    await conn.execute(_FLUSH_STATEMENT, params)
+            except Exception:
+                # Put back whatever hasn't been superseded (or discarded) and retry next tick
+                for user_id, pos in self._inflight.items():
+                    self._pending.setdefault(user_id, pos)
+                self._inflight = {}
+                raise
+
+            for user_id in batch:
+                identity_cache.invalidate_user(user_id)
+            self._inflight = {}
+            self.flushed += len(params)
+            return len(params)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Position flush failed; will retry")
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and write out everything still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
+
+
+def _default_engine() -> AsyncEngine:
+    from app.core.database import async_engine
+    return async_engine
+
+
+position_buffer = PositionBuffer(
+    engine=_default_engine(),
+    interval=settings.POSITION_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.POSITION_FLUSH_MAX_PENDING,
+)
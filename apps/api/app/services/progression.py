@@ -0,0 +1,81 @@
+"""
+Player progression: XP table and level-ups.
+
+The XP curve (schemas.progression.calculate_xp_to_next_level) is evaluated
+once per level into a table at import time, so hot paths get O(1) XP-to-next
+lookups and O(log n) level-from-total-XP via bisection. grant_xp() applies any
+number of level-ups, and their stat gains, in one step.
+"""
+from bisect import bisect_right
+from collections import namedtuple
+
+from app.core.config import settings
+from app.models import User
+from app.schemas.progression import calculate_xp_to_next_level
+
+
+# Stat gains per level-up
+LEVEL_UP_HP = 10
+LEVEL_UP_ATTACK = 2
+LEVEL_UP_DEFENSE = 1
+
+XPGrant = namedtuple("XPGrant", ["level", "current_xp", "levels_gained"])
+
+
+class XPTable:
+    """XP-to-next and cumulative XP for levels 1..max_level"""
+
+    def __init__(self, max_level: int):
+        if max_level < 1:
+            raise ValueError("max_level must be at least 1")
+        self.max_level = max_level
+        # Index by level; slot 0 is unused so lookups need no offset
+        self._to_next = (0, *(calculate_xp_to_next_level(level) for level in range(1, max_level + 1)))
+        cumulative = [0, 0]
+        for level in range(1, max_level):
+            cumulative.append(cumulative[-1] + self._to_next[level])
+        self._cumulative = tuple(cumulative)  # _cumulative[level] = total XP needed to reach level
+
+    def xp_to_next(self, level: int) -> int:
+        """XP needed to go from `level` to `level + 1`"""
+        if 1 <= level <= self.max_level:
+            return self._to_next[level]
+        return calculate_xp_to_next_level(level)
+
+    def total_xp(self, level: int, current_xp: int = 0) -> int:
+        """Lifetime XP of a player at `level` with `current_xp` into it"""
+        return self._cumulative[min(max(level, 1), self.max_level)] + current_xp
+
+    def level_for_total_xp(self, total_xp: int) -> int:
+        """Highest level whose cumulative requirement is covered by `total_xp`"""
+        return max(1, bisect_right(self._cumulative, total_xp, lo=1) - 1)
+
+    def apply(self, level: int, current_xp: int, amount: int) -> XPGrant:
+        """Add `amount` XP to (level, current_xp) without touching any model"""
+        if level >= self.max_level:
+            # Capped: the bar stays full and no further levels are gained
+            return XPGrant(level, min(current_xp + amount, self.xp_to_next(level)), 0)
+
+        total = self.total_xp(level, current_xp) + amount
+        new_level = self.level_for_total_xp(total)
+        remaining = total - self._cumulative[new_level]
+        if new_level == self.max_level:
+            remaining = min(remaining, self.xp_to_next(new_level))
+        return XPGrant(new_level, remaining, new_level - level)
+
+
+xp_table = XPTable(settings.MAX_PLAYER_LEVEL)
+
+
+def grant_xp(user: User, amount: int) -> int:
+    """Add XP to a user, applying every level-up it covers; returns the number of levels gained"""
+    result = xp_table.apply(user.player_level, user.current_xp, amount)
+    user.player_level = result.level
+    user.current_xp = result.current_xp
+
+    if result.levels_gained:
+        user.max_hp += LEVEL_UP_HP * result.levels_gained
+        user.hp = user.max_hp
+        user.attack += LEVEL_UP_ATTACK * result.levels_gained
+        user.defense += LEVEL_UP_DEFENSE * result.levels_gained
+    return result.levels_gained
@@ -0,0 +1,51 @@
+"""
+Uniform-grid spatial index for static world entities.
+
+Entities are bucketed into square cells so a radius query only visits the
+cells overlapping the query's bounding box instead of scanning the zone.
+"""
+from collections import defaultdict, namedtuple
+from typing import Iterable
+
+
+DEFAULT_CELL_SIZE = 10
+
+# Denormalised display data, so a query never has to go back to the database
+SpatialEntry = namedtuple("SpatialEntry", ["seq", "entity_type", "id", "name", "x", "y"])
+
+
+class SpatialGrid:
+    """Bucketed index over a fixed set of entities in one zone"""
+
+    def __init__(self, entries: Iterable[SpatialEntry], cell_size: int = DEFAULT_CELL_SIZE):
+        if cell_size < 1:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        buckets = defaultdict(list)
+        count = 0
+        for entry in entries:
+            buckets[(entry.x // cell_size, entry.y // cell_size)].append(entry)
+            count += 1
+        # Freeze buckets once built; the grid is never mutated after construction
+        self._buckets = {cell: tuple(bucket) for cell, bucket in buckets.items()}
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def query(self, x: int, y: int, radius: int) -> list[tuple[SpatialEntry, int]]:
+        """Return (entry, manhattan distance) for every entry within radius, in insertion order"""
+        size = self.cell_size
+        buckets = self._buckets
+        found = []
+        for cx in range((x - radius) // size, (x + radius) // size + 1):
+            for cy in range((y - radius) // size, (y + radius) // size + 1):
+                bucket = buckets.get((cx, cy))
+                if not bucket:
+                    continue
+                for entry in bucket:
+                    dist = abs(entry.x - x) + abs(entry.y - y)
+                    if dist <= radius:
+                        found.append((entry, dist))
+        found.sort(key=lambda pair: pair[0].seq)
+        return found
@@ -0,0 +1 @@
+"""Benchmarks and load-generation tools for the API (not shipped with the app)"""
@@ -0,0 +1,71 @@
+"""
+Benchmark: SpatialGrid radius queries vs the linear zone scan /world/state used to do.
+
+Run from apps/api:
+    python -m bench.bench_spatial --entities 10000 50000 100000
+"""
+import argparse
+import random
+import time
+
+from app.routers.world import NEARBY_RANGE, calculate_distance
+from app.services.spatial import SpatialEntry, SpatialGrid
+
+
+def make_entries(count: int, size: int, rng: random.Random) -> list[SpatialEntry]:
+    types = ("enemy", "npc", "chest")
+    return [
+        SpatialEntry(i, types[i % 3], str(i), f"Entity {i}", rng.randrange(size), rng.randrange(size))
+        for i in range(count)
+    ]
+
+
+def linear_scan(entries: list[SpatialEntry], x: int, y: int, radius: int) -> list:
+    """The previous /world/state approach: distance check against every entity in the zone"""
+    found = []
+    for entry in entries:
+        dist = calculate_distance(x, y, entry.x, entry.y)
+        if dist <= radius:
+            found.append((entry, dist))
+    return found
+
+
+def time_queries(fn, points, radius: int) -> float:
+    start = time.perf_counter()
+    for x, y in points:
+        fn(x, y, radius)
+    return (time.perf_counter() - start) / len(points)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entities", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    parser.add_argument("--zone-size", type=int, default=1000, help="Zone width/height in tiles")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--radius", type=int, default=NEARBY_RANGE)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    points = [(rng.randrange(args.zone_size), rng.randrange(args.zone_size)) for _ in range(args.queries)]
+
+    print(f"{'entities':>10} {'build ms':>10} {'scan us':>12} {'grid us':>12} {'speedup':>9}")
+    for count in args.entities:
+        entries = make_entries(count, args.zone_size, rng)
+
+        start = time.perf_counter()
+        grid = SpatialGrid(entries)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        # Sanity check: both strategies must agree
+        for x, y in points[:20]:
+            assert sorted(e.seq for e, _ in linear_scan(entries, x, y, args.radius)) == \
+                [e.seq for e, _ in grid.query(x, y, args.radius)]
+
+        scan = time_queries(lambda x, y, r: linear_scan(entries, x, y, r), points, args.radius)
+        indexed = time_queries(grid.query, points, args.radius)
+        print(f"{count:>10} {build_ms:>10.1f} {scan * 1e6:>12.1f} {indexed * 1e6:>12.1f} {scan / indexed:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark: mixed read/write load on SQLite, driver defaults vs the WAL profile.
+
+Worker threads share one engine (like the sync routes on the threadpool) and
+run a mix of point reads and small write transactions against a temp database.
+"default" is the engine as configured before SQLITE_WAL (rollback journal,
+pysqlite's 5 s timeout); "wal" adds configure_sqlite().
+
+Run from apps/api:
+    python -m bench.bench_sqlite --threads 4 16 --write-ratio 0.2 --seconds 5
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.database import configure_sqlite
+
+
+PLAYERS = 1000
+
+
+def make_engine(path: str, profile: str, threads: int):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        pool_size=threads,
+        max_overflow=0,
+    )
+    if profile == "wal":
+        configure_sqlite(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE players (id INTEGER PRIMARY KEY, x INTEGER, y INTEGER, coins INTEGER)"))
+        conn.execute(text("CREATE TABLE attempts (id INTEGER PRIMARY KEY, player_id INTEGER, score INTEGER)"))
+        conn.execute(text("CREATE INDEX ix_attempts_player_id ON attempts (player_id)"))
+        conn.execute(
+            text("INSERT INTO players (id, x, y, coins) VALUES (:id, 0, 0, 100)"),
+            [{"id": i} for i in range(1, PLAYERS + 1)],
+        )
+    return engine
+
+
+def read(conn, rng: random.Random) -> None:
+    player_id = rng.randint(1, PLAYERS)
+    conn.execute(text("SELECT x, y, coins FROM players WHERE id = :id"), {"id": player_id}).one()
+    conn.execute(text("SELECT count(*) FROM attempts WHERE player_id = :id"), {"id": player_id}).scalar()
+
+
+def write(conn, rng: random.Random) -> None:
+    """Shaped like /world/move plus /progress/attempt: read, then update and insert"""
+    player_id = rng.randint(1, PLAYERS)
+    conn.execute(text("SELECT coins FROM players WHERE id = :id"), {"id": player_id}).scalar()
+    conn.execute(
+        text("UPDATE players SET x = :x, y = :y WHERE id = :id"),
+        {"id": player_id, "x": rng.randrange(100), "y": rng.randrange(100)},
+    )
+    conn.execute(
+        text("INSERT INTO attempts (player_id, score) VALUES (:id, :score)"),
+        {"id": player_id, "score": rng.randrange(100)},
+    )
+
+
+def run(profile: str, threads: int, write_ratio: float, seconds: float, seed: int) -> dict:
+    directory = tempfile.mkdtemp()
+    engine = make_engine(os.path.join(directory, f"{profile}.db"), profile, threads)
+    latencies = {"read": [], "write": []}
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(worker_seed: int) -> None:
+        rng = random.Random(worker_seed)
+        local = {"read": [], "write": []}
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            kind = "write" if rng.random() < write_ratio else "read"
+            started = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    (write if kind == "write" else read)(conn, rng)
+            except OperationalError:  # "database is locked"
+                local_errors += 1
+                continue
+            local[kind].append(time.perf_counter() - started)
+        with lock:
+            for kind, values in local.items():
+                latencies[kind].extend(values)
+            errors.append(local_errors)
+
+    workers = [threading.Thread(target=worker, args=(seed + i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    engine.dispose()
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+    def p95_ms(values: list[float]) -> float:
+        return statistics.quantiles(values, n=20)[-1] * 1000 if len(values) >= 2 else 0.0
+
+    return {
+        "reads_per_s": len(latencies["read"]) / seconds,
+        "writes_per_s": len(latencies["write"]) / seconds,
+        "read_p95_ms": p95_ms(latencies["read"]),
+        "write_p95_ms": p95_ms(latencies["write"]),
+        "errors": sum(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[4, 16])
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Fraction of operations that write")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'profile':>8} {'threads':>8} {'reads/s':>10} {'writes/s':>10} {'read p95':>10} {'write p95':>10} {'errors':>7}")
+    for threads in args.threads:
+        for profile in ("default", "wal"):
+            result = run(profile, threads, args.write_ratio, args.seconds, args.seed)
+            print(
+                f"{profile:>8} {threads:>8} {result['reads_per_s']:>10.0f} {result['writes_per_s']:>10.0f} "
+                f"{result['read_p95_ms']:>8.2f}ms {result['write_p95_ms']:>8.2f}ms {result['errors']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""End-to-end endpoint timings through TestClient, per seeded world size"""
+
+import pytest
+
+
+READ_ENDPOINTS = [
+    "/api/world/state",
+    "/api/inventory",
+    "/api/npcs/merchant_marcus/shop",
+    "/api/progression/me",
+]
+
+
+@pytest.mark.parametrize("path", READ_ENDPOINTS)
+def test_get(benchmark, seeded_client, path):
+    assert seeded_client.get(path).status_code == 200
+    benchmark(seeded_client.get, path)
+
+
+def test_move(benchmark, seeded_client):
+    position = seeded_client.get("/api/world/state").json()["player"]["position"]
+    steps = iter(range(10**9))
+
+    def move():
+        step = next(steps) % 2
+        return seeded_client.post("/api/world/move", json={"x": position["x"] + step, "y": position["y"]})
+
+    assert move().status_code == 200
+    benchmark(move)
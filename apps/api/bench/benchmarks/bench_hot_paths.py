@@ -0,0 +1,80 @@
+"""Microbenchmarks for pure per-request hot paths"""
+
+import pytest
+
+from app.routers.combat import calculate_damage, scale_enemy_stats
+from app.routers.inventory import item_to_info
+from app.schemas.inventory import InventoryResponse
+from app.schemas.progression import calculate_xp_to_next_level
+from app.schemas.world import WorldStateResponse
+from app.services.catalog import EnemyEntry, ItemEntry
+
+
+ITEM = ItemEntry(
+    id=1, item_id="iron_sword", name="Iron Sword", description="A sturdy blade.", item_type="weapon",
+    rarity="uncommon", stackable=False, max_stack=1, buy_price=100, sell_price=40, attack_bonus=7,
+    defense_bonus=0, hp_bonus=0, crit_bonus=0.05, equip_slot="weapon", weapon_type="sword", weapon_range=1,
+    effect_type=None, effect_value=0, effect_duration=0, sprite_key="iron_sword", created_at=None,
+)
+
+ENEMY = EnemyEntry(
+    id=1, enemy_type="goblin", name="Goblin", description=None, base_hp=60, base_attack=12, base_defense=4,
+    base_speed=6, crit_chance=0.05, aggro_range=3, xp_reward=30, coin_reward=12, loot_table=[],
+    movement_pattern="wander", is_boss=False, sprite_key="goblin", created_at=None,
+)
+
+
+def entity(i: int) -> dict:
+    return {"id": str(i), "name": f"Entity {i}", "entity_type": "enemy", "position": {"x": i, "y": i}, "distance": i % 10}
+
+
+def world_state_payload(nearby: int) -> dict:
+    return {
+        "player": {
+            "zone_id": 1, "zone_slug": "starter_village", "zone_name": "Starter Village", "position": {"x": 10, "y": 10},
+            "hp": 100, "max_hp": 100, "mp": 30, "max_mp": 30, "level": 5, "xp": 120, "xp_to_next": 400,
+            "gold": 250, "attack": 18, "defense": 9,
+        },
+        "zone_hash": "0" * 16,
+        "nearby_enemies": [entity(i) for i in range(nearby)],
+        "nearby_npcs": [],
+        "nearby_chests": [],
+        "nearby_items": [],
+    }
+
+
+def inventory_payload(items: int) -> dict:
+    info = item_to_info(ITEM, 1, False).model_dump()
+    return {
+        "items": [{**info, "id": f"item_{i}"} for i in range(items)],
+        "equipped": {slot: None for slot in ("weapon", "head", "chest", "legs", "feet", "accessory")},
+        "gold": 250,
+        "max_slots": 200,
+        "used_slots": items,
+    }
+
+
+def test_calculate_damage(benchmark):
+    benchmark(calculate_damage, 42, 17, True)
+
+
+def test_scale_enemy_stats(benchmark):
+    benchmark(scale_enemy_stats, ENEMY, 12)
+
+
+def test_calculate_xp_to_next_level(benchmark):
+    benchmark(calculate_xp_to_next_level, 37)
+
+
+def test_item_to_info(benchmark):
+    benchmark(item_to_info, ITEM, 3, False)
+
+
+@pytest.mark.parametrize("nearby", [10, 200])
+def test_validate_world_state_response(benchmark, nearby):
+    benchmark(WorldStateResponse.model_validate, world_state_payload(nearby))
+
+
+@pytest.mark.parametrize("items", [10, 200])
+def test_validate_inventory_response(benchmark, items):
+    benchmark(InventoryResponse.model_validate, inventory_payload(items))
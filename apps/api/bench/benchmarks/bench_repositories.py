@@ -0,0 +1,127 @@
+"""ORM entity loading vs the Core fast-path reads, per seeded world size"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.models import NPC, Item, Level, PlayerInventory, Progress, User
+from app.repositories import progress as progress_repo
+from app.repositories.inventory import list_stacks
+from app.routers.inventory import item_to_info
+from app.routers.npcs import get_shop
+from app.schemas.npc import ShopItem
+from app.schemas.progress import UserProgressSummary
+from app.services.catalog import catalog_service
+from bench.benchmarks.conftest import WORLD_SIZES
+
+
+@pytest.fixture(scope="module")
+def bench_world(seeded_client):
+    """The seeded client plus as many levels as extra rows, every other one completed by the user"""
+    with seeded_client.session_factory() as db:
+        user = db.query(User).first()
+        count = max(WORLD_SIZES[seeded_client.size], 10)
+        levels = [Level(slug=f"bench-{i}", title=f"Bench {i}", order_index=i, json_data={}) for i in range(count)]
+        db.add_all(levels)
+        db.flush()
+        db.add_all(
+            Progress(user_id=user.id, level_id=level.id, attempts=2, completed_at=datetime.utcnow() if i % 2 == 0 else None)
+            for i, level in enumerate(levels)
+        )
+        db.commit()
+        seeded_client.user = user
+        seeded_client.catalog = catalog_service.get_sync(db)
+    return seeded_client
+
+
+# --- /inventory ---
+
+async def inventory_orm(client):
+    async with client.async_session_factory() as db:
+        stacks = (await db.execute(select(PlayerInventory).where(PlayerInventory.user_id == client.user.id))).scalars().all()
+        return [item_to_info(client.catalog.items[inv.item_id], inv.quantity, inv.is_equipped) for inv in stacks]
+
+
+async def inventory_core(client):
+    async with client.async_session_factory() as db:
+        return [
+            item_to_info(client.catalog.items[item_id], quantity, is_equipped)
+            for item_id, quantity, is_equipped in await list_stacks(db, client.user.id)
+        ]
+
+
+@pytest.mark.parametrize("path", ["orm", "core"])
+def test_inventory(benchmark, bench_world, path):
+    fn = inventory_orm if path == "orm" else inventory_core
+    assert len(bench_world.portal.call(fn, bench_world)) == WORLD_SIZES[bench_world.size]
+    benchmark(bench_world.portal.call, fn, bench_world)
+
+
+# --- /npcs/{npc_id}/shop ---
+
+def shop_orm(client):
+    """Merchant and its items loaded as entities per request"""
+    with client.session_factory() as db:
+        npc = db.query(NPC).filter(NPC.npc_id == "merchant_marcus").first()
+        keys = [entry["item_id"] for entry in npc.shop_items]
+        items = {item.item_id: item for item in db.query(Item).filter(Item.item_id.in_(keys))}
+        return [
+            ShopItem(
+                item_id=item.item_id, name=item.name, description=item.description, item_type=item.item_type,
+                rarity=item.rarity, price=entry.get("price", item.buy_price), stock=entry.get("stock", -1),
+                attack_bonus=item.attack_bonus, defense_bonus=item.defense_bonus, effect_type=item.effect_type,
+                effect_value=item.effect_value, sprite_key=item.sprite_key,
+            )
+            for entry in npc.shop_items if (item := items.get(entry["item_id"]))
+        ]
+
+
+def shop_catalog(client):
+    """What the router does: catalog snapshot, no statements"""
+    return client.portal.call(get_shop, "merchant_marcus", client.user, client.catalog).items
+
+
+@pytest.mark.parametrize("path", ["orm", "catalog"])
+def test_shop(benchmark, bench_world, path):
+    fn = shop_orm if path == "orm" else shop_catalog
+    assert len(fn(bench_world)) >= WORLD_SIZES[bench_world.size]
+    benchmark(fn, bench_world)
+
+
+# --- /progress ---
+
+def progress_orm(client):
+    with client.session_factory() as db:
+        levels = db.query(Level).order_by(Level.order_index).all()
+        records = {p.level_id: p for p in db.query(Progress).filter(Progress.user_id == client.user.id)}
+        result, unlocked = [], True
+        for level in levels:
+            record = records.get(level.id)
+            completed = record is not None and record.completed_at is not None
+            result.append(UserProgressSummary(
+                level_id=level.id, level_slug=level.slug, level_title=level.title, order_index=level.order_index,
+                attempts=record.attempts if record else 0, is_completed=completed, is_unlocked=unlocked,
+            ))
+            unlocked = completed
+        return result
+
+
+def progress_core(client):
+    with client.session_factory() as db:
+        result, unlocked = [], True
+        for row in progress_repo.list_level_summaries(db, client.user.id):
+            completed = row.completed_at is not None
+            result.append(UserProgressSummary(
+                level_id=row.id, level_slug=row.slug, level_title=row.title, order_index=row.order_index,
+                attempts=row.attempts or 0, is_completed=completed, is_unlocked=unlocked,
+            ))
+            unlocked = completed
+        return result
+
+
+@pytest.mark.parametrize("path", ["orm", "core"])
+def test_progress(benchmark, bench_world, path):
+    fn = progress_orm if path == "orm" else progress_core
+    assert fn(bench_world) == progress_orm(bench_world)
+    benchmark(fn, bench_world)
@@ -0,0 +1,93 @@
+"""Fixtures for the pytest-benchmark suite (run through `python -m bench.run_benchmarks`)"""
+
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.database import Base, get_async_db, get_db
+from app.core.identity_cache import identity_cache
+from app.main import app
+from app.models import NPC, Enemy, EnemySpawn, Item, PlayerInventory, User, WorldZone
+from app.seed_world import seed_world_data
+from app.services.catalog import catalog_service
+from app.services.position_buffer import position_buffer
+
+
+# Extra inventory rows, spawns and shop items on top of the starter world
+WORLD_SIZES = {"starter": 0, "medium": 100, "large": 1000}
+
+
+def grow_world(db, count: int) -> None:
+    """Give the first user `count` extra items and put as many spawns near the start point"""
+    user = db.query(User).first()
+    zone = db.query(WorldZone).filter(WorldZone.is_starting_zone.is_(True)).first()
+    enemy = db.query(Enemy).first()
+    merchant = db.query(NPC).filter(NPC.npc_id == "merchant_marcus").first()
+
+    items = [Item(item_id=f"bench_item_{i}", name=f"Bench Item {i}", item_type="material", sprite_key="item") for i in range(count)]
+    db.add_all(items)
+    db.flush()
+    db.add_all(PlayerInventory(user_id=user.id, item_id=item.id, quantity=1) for item in items)
+    db.add_all(
+        EnemySpawn(zone_id=zone.id, enemy_id=enemy.id, spawn_x=zone.spawn_x + i % 9 - 4, spawn_y=zone.spawn_y + i // 9 % 9 - 4)
+        for i in range(count)
+    )
+    merchant.shop_items = list(merchant.shop_items) + [{"item_id": item.item_id, "price": 1, "stock": -1} for item in items]
+    db.commit()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def quiet_settings():
+    """Keep startup calibration and the profiler out of the timings"""
+    settings.BCRYPT_TARGET_MS = 0
+    settings.PROFILE_SAMPLE_RATE = 0.0
+
+
+@pytest.fixture(scope="module", params=list(WORLD_SIZES))
+def seeded_client(request):
+    """TestClient against a fresh SQLite file seeded with the starter world plus N extra rows"""
+    path = os.path.join(tempfile.gettempdir(), f"codingcrazy_bench_{os.getpid()}_{request.param}.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, poolclass=NullPool)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    def override_get_db():
+        with SessionLocal() as db:
+            yield db
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    position_buffer.engine = async_engine
+    catalog_service.invalidate()
+    identity_cache.clear()
+
+    with TestClient(app) as client:
+        with SessionLocal() as db:
+            seed_world_data(db)
+        client.get("/api/world/state")  # Creates the dev user and assigns the starting zone
+        with SessionLocal() as db:
+            grow_world(db, WORLD_SIZES[request.param])
+        client.size = request.param
+        client.session_factory = SessionLocal
+        client.async_session_factory = AsyncSessionLocal
+        yield client
+
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+    os.remove(path)
@@ -0,0 +1,343 @@
+"""
+Load generator: virtual players replaying scripted sessions against a running API.
+
+Each virtual user logs in through /api/auth/login (accounts are created on
+first login in DEV_MODE, otherwise via /api/auth/signup), then loops over a
+weighted mix of sessions with think time in between:
+
+    explore  - poll /world/state and walk a few tiles with /world/move
+    combat   - start a fight with a nearby spawn and attack until it ends
+    inventory- fetch the inventory
+    shop     - open the merchant, buy a potion and sell it back
+    chest    - open a nearby chest (one-time chests answer 400 afterwards)
+    levels   - list levels, record an attempt and submit a completion
+
+Per-endpoint p50/p95/p99 latency and throughput are printed at the end (and
+every --report-every seconds). Start the server against a seeded database,
+e.g. from apps/api:
+
+    python -m app.seed_world && uvicorn app.main:app --workers 1
+    python -m bench.loadgen --users 200 --ramp-up 60 --duration 300
+    python -m bench.loadgen --stages 50:30 200:60 200:300 0:30 --mix explore=6,combat=2,shop=1
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+
+
+DEFAULT_MIX = {"explore": 6, "combat": 2, "inventory": 2, "shop": 1, "chest": 1, "levels": 2}
+
+
+# --- Stats ---
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    client_errors: int = 0  # 4xx (some are expected, e.g. reopening a chest)
+    errors: int = 0  # 5xx and transport failures
+
+
+class Stats:
+    def __init__(self):
+        self.endpoints: dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self.started = time.perf_counter()
+
+    def record(self, name: str, seconds: float, status: int | None) -> None:
+        entry = self.endpoints[name]
+        entry.latencies.append(seconds)
+        if status is None or status >= 500:
+            entry.errors += 1
+        elif status >= 400:
+            entry.client_errors += 1
+
+    def rows(self) -> list[dict]:
+        elapsed = time.perf_counter() - self.started
+        rows = []
+        for name, entry in sorted(self.endpoints.items()):
+            latencies = sorted(entry.latencies)
+            rows.append({
+                "endpoint": name,
+                "requests": len(latencies),
+                "rps": len(latencies) / elapsed if elapsed else 0.0,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+                "4xx": entry.client_errors,
+                "errors": entry.errors,
+            })
+        return rows
+
+    def format(self, active_users: int | None = None) -> str:
+        rows = self.rows()
+        header = f"{'endpoint':<34} {'reqs':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'4xx':>6} {'err':>5}"
+        lines = [header, "-" * len(header)]
+        for r in rows:
+            lines.append(
+                f"{r['endpoint']:<34} {r['requests']:>7} {r['rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+                f"{r['p99_ms']:>8.1f} {r['max_ms']:>8.1f} {r['4xx']:>6} {r['errors']:>5}"
+            )
+        total = sum(r["requests"] for r in rows)
+        summary = f"total {total} requests, {sum(r['rps'] for r in rows):.1f} req/s"
+        if active_users is not None:
+            summary += f", {active_users} active users"
+        lines.append(summary)
+        return "\n".join(lines)
+
+
+# --- Virtual users ---
+
+class VirtualUser:
+    def __init__(self, index: int, args, stats: Stats, rng: random.Random):
+        self.index = index
+        self.args = args
+        self.stats = stats
+        self.rng = rng
+        self.client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        self.zone_size: tuple[int, int] | None = None
+        self.stopping = False
+
+    async def request(self, name: str, method: str, path: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(name, time.perf_counter() - started, None)
+            return None
+        self.stats.record(name, time.perf_counter() - started, response.status_code)
+        return response
+
+    async def login(self) -> bool:
+        credentials = {"email": f"{self.args.email_prefix}{self.index}@example.com", "password": self.args.password}
+        response = await self.request("POST /api/auth/login", "POST", "/api/auth/login", json=credentials)
+        if response is not None and response.status_code == 401:
+            await self.request("POST /api/auth/signup", "POST", "/api/auth/signup", json=credentials)
+            response = await self.request("POST /api/auth/login", "POST", "/api/auth/login", json=credentials)
+        return response is not None and response.status_code == 200
+
+    async def world_state(self) -> dict | None:
+        response = await self.request("GET /api/world/state", "GET", "/api/world/state")
+        if response is None or response.status_code != 200:
+            return None
+        state = response.json()
+        if self.zone_size is None:
+            zone = await self.request("GET /api/world/zones/{slug}", "GET", f"/api/world/zones/{state['player']['zone_slug']}")
+            if zone is not None and zone.status_code == 200:
+                body = zone.json()
+                self.zone_size = (body["width"], body["height"])
+        return state
+
+    async def run(self, mix: list[tuple[str, int]]) -> None:
+        try:
+            if not await self.login():
+                return
+            names, weights = zip(*mix)
+            while not self.stopping:
+                scenario = self.rng.choices(names, weights)[0]
+                await SCENARIOS[scenario](self)
+                await asyncio.sleep(self.rng.uniform(*self.args.think_time))
+        finally:
+            await self.client.aclose()
+
+
+# --- Scenarios ---
+
+async def explore(vu: VirtualUser) -> None:
+    state = await vu.world_state()
+    if state is None:
+        return
+    x, y = state["player"]["position"]["x"], state["player"]["position"]["y"]
+    width, height = vu.zone_size or (x + 1, y + 1)
+    for _ in range(vu.rng.randint(3, 10)):
+        dx, dy = vu.rng.choice(((1, 0), (-1, 0), (0, 1), (0, -1)))
+        x, y = min(max(x + dx, 0), width - 1), min(max(y + dy, 0), height - 1)
+        await vu.request("POST /api/world/move", "POST", "/api/world/move", json={"x": x, "y": y})
+        await asyncio.sleep(vu.rng.uniform(0.05, 0.2))
+    if vu.rng.random() < 0.5:
+        await vu.world_state()
+
+
+async def combat(vu: VirtualUser) -> None:
+    state = await vu.world_state()
+    if state is None or not state["nearby_enemies"]:
+        return
+    spawn = vu.rng.choice(state["nearby_enemies"])
+    response = await vu.request("POST /api/combat/start", "POST", "/api/combat/start", json={"enemy_spawn_id": int(spawn["id"])})
+    if response is None or response.status_code != 200:
+        return
+    session_id = response.json()["session_id"]
+    for _ in range(50):
+        response = await vu.request(
+            "POST /api/combat/action", "POST", "/api/combat/action", json={"session_id": session_id, "action": "attack"}
+        )
+        if response is None or response.status_code != 200:
+            return
+        result = response.json()
+        if result["combat_ended"]:
+            if not result["victory"] and not result["fled"]:
+                await vu.request("POST /api/world/respawn", "POST", "/api/world/respawn")
+            return
+        await asyncio.sleep(vu.rng.uniform(0.2, 0.6))
+
+
+async def inventory(vu: VirtualUser) -> None:
+    await vu.request("GET /api/inventory", "GET", "/api/inventory")
+
+
+async def shop(vu: VirtualUser) -> None:
+    npc = vu.args.merchant
+    response = await vu.request("GET /api/npcs/{npc_id}/shop", "GET", f"/api/npcs/{npc}/shop")
+    if response is None or response.status_code != 200:
+        return
+    items = response.json()["items"]
+    if not items:
+        return
+    item = vu.rng.choice(items)
+    bought = await vu.request(
+        "POST /api/npcs/{npc_id}/shop/buy", "POST", f"/api/npcs/{npc}/shop/buy", json={"item_id": item["item_id"], "quantity": 1}
+    )
+    if bought is not None and bought.status_code == 200:
+        await vu.request(
+            "POST /api/npcs/{npc_id}/shop/sell", "POST", f"/api/npcs/{npc}/shop/sell", json={"item_id": item["item_id"], "quantity": 1}
+        )
+
+
+async def chest(vu: VirtualUser) -> None:
+    state = await vu.world_state()
+    if state is None or not state["nearby_chests"]:
+        return
+    target = vu.rng.choice(state["nearby_chests"])
+    await vu.request("POST /api/chests/open", "POST", "/api/chests/open", json={"chest_id": target["id"]})
+
+
+async def levels(vu: VirtualUser) -> None:
+    response = await vu.request("GET /api/levels", "GET", "/api/levels")
+    if response is None or response.status_code != 200 or not response.json():
+        return
+    level = vu.rng.choice(response.json())
+    await vu.request("POST /api/progress/attempt", "POST", "/api/progress/attempt", json={"level_id": level["id"]})
+    if vu.rng.random() < 0.5:
+        run_data = {"action_count": vu.rng.randint(3, 40), "time_taken": vu.rng.uniform(5, 120)}
+        await vu.request(
+            "POST /api/progress/complete", "POST", "/api/progress/complete", json={"level_id": level["id"], "run_data": run_data}
+        )
+
+
+SCENARIOS = {
+    "explore": explore,
+    "combat": combat,
+    "inventory": inventory,
+    "shop": shop,
+    "chest": chest,
+    "levels": levels,
+}
+
+
+# --- Ramp control ---
+
+def parse_stages(values: list[str]) -> list[tuple[int, float]]:
+    """"users:seconds" pairs; each stage ramps linearly from the previous target"""
+    stages = []
+    for value in values:
+        users, _, seconds = value.partition(":")
+        stages.append((int(users), float(seconds)))
+    return stages
+
+
+def parse_mix(value: str) -> list[tuple[str, int]]:
+    mix = []
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r} (choose from {', '.join(SCENARIOS)})")
+        mix.append((name, int(weight or 1)))
+    return mix
+
+
+def target_users(stages: list[tuple[int, float]], elapsed: float) -> int | None:
+    """Users that should be active `elapsed` seconds in, or None once every stage is done"""
+    previous = 0
+    for users, seconds in stages:
+        if elapsed < seconds:
+            return round(previous + (users - previous) * (elapsed / seconds if seconds else 1))
+        elapsed -= seconds
+        previous = users
+    return None
+
+
+async def run(args) -> Stats:
+    stats = Stats()
+    rng = random.Random(args.seed)
+    running: list[tuple[VirtualUser, asyncio.Task]] = []
+    next_index = 0
+    started = time.perf_counter()
+    last_report = started
+
+    while True:
+        running = [(vu, task) for vu, task in running if not task.done()]
+        active = [vu for vu, _ in running if not vu.stopping]
+        target = target_users(args.stages, time.perf_counter() - started)
+        if target is None:
+            break
+
+        for _ in range(target - len(active)):
+            vu = VirtualUser(next_index, args, stats, random.Random(rng.random()))
+            next_index += 1
+            running.append((vu, asyncio.create_task(vu.run(args.mix))))
+        for vu in active[target:]:
+            vu.stopping = True  # Finishes its current session, then exits
+
+        if args.report_every and time.perf_counter() - last_report >= args.report_every:
+            last_report = time.perf_counter()
+            print(stats.format(active_users=min(target, len(active))), end="\n\n", flush=True)
+        await asyncio.sleep(0.25)
+
+    for vu, _ in running:
+        vu.stopping = True
+    if running:
+        await asyncio.wait([task for _, task in running], timeout=args.timeout)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=50, help="Peak virtual users (ignored with --stages)")
+    parser.add_argument("--ramp-up", type=float, default=30, help="Seconds to reach --users")
+    parser.add_argument("--duration", type=float, default=120, help="Seconds to hold --users after ramp-up")
+    parser.add_argument("--stages", nargs="+", metavar="USERS:SECONDS", help="Custom ramp profile, e.g. 50:30 200:60 200:300 0:30")
+    parser.add_argument("--mix", type=parse_mix, default=list(DEFAULT_MIX.items()), help="Weighted scenarios, e.g. explore=6,combat=2")
+    parser.add_argument("--think-time", type=float, nargs=2, default=(0.5, 2.0), metavar=("MIN", "MAX"))
+    parser.add_argument("--merchant", default="merchant_marcus", help="Shopkeeper npc_id for the shop scenario")
+    parser.add_argument("--email-prefix", default="loadtest-")
+    parser.add_argument("--password", default="loadtest-password")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--report-every", type=float, default=0, help="Print interim stats every N seconds")
+    parser.add_argument("--json", metavar="PATH", help="Also write the final per-endpoint rows as JSON")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    args.stages = parse_stages(args.stages) if args.stages else [(args.users, args.ramp_up), (args.users, args.duration)]
+
+    stats = asyncio.run(run(args))
+    print(stats.format())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(stats.rows(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
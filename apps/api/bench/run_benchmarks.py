@@ -0,0 +1,97 @@
+"""
+Run the pytest-benchmark suite and compare results against saved baselines.
+
+Run from apps/api:
+    python -m bench.run_benchmarks run --save main          # writes bench/baselines/main.json
+    python -m bench.run_benchmarks run -k endpoints --save my-branch
+    python -m bench.run_benchmarks compare main my-branch --threshold 10
+
+`compare` takes baseline names or JSON paths, prints every benchmark's change
+in the chosen statistic and exits 1 if any got slower by more than --threshold
+percent, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import sys
+
+import pytest
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SUITE_DIR = os.path.join(BENCH_DIR, "benchmarks")
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+
+
+def baseline_path(name: str) -> str:
+    return name if name.endswith(".json") else os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def load_stats(name: str, stat: str) -> dict[str, float]:
+    with open(baseline_path(name)) as f:
+        data = json.load(f)
+    return {bench["fullname"]: bench["stats"][stat] for bench in data["benchmarks"]}
+
+
+def compare(baseline: dict[str, float], current: dict[str, float], threshold: float) -> tuple[list[str], list[str]]:
+    """Report lines and the names that regressed by more than threshold percent"""
+    lines, regressions = [], []
+    width = max((len(name) for name in baseline.keys() | current.keys()), default=10)
+    for name in sorted(baseline.keys() | current.keys()):
+        if name not in current or name not in baseline:
+            lines.append(f"{name:<{width}}  {'missing in ' + ('current' if name in baseline else 'baseline'):>30}")
+            continue
+        old, new = baseline[name], current[name]
+        change = (new - old) / old * 100 if old else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  improved"
+        lines.append(f"{name:<{width}}  {old * 1e6:>10.1f}us -> {new * 1e6:>10.1f}us  {change:>+7.1f}%{flag}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite")
+    run_parser.add_argument("--save", metavar="NAME", help="Write results to bench/baselines/NAME.json")
+    run_parser.add_argument("-k", dest="keyword", help="Only run benchmarks matching this pytest -k expression")
+    run_parser.add_argument("--min-rounds", type=int, default=20)
+
+    compare_parser = commands.add_parser("compare", help="Compare two saved runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="Percent slowdown that counts as a regression")
+    compare_parser.add_argument("--stat", default="median", choices=["min", "median", "mean", "max"])
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        pytest_args = [
+            SUITE_DIR,
+            "-q",
+            "-o", "python_files=bench_*.py",
+            "-p", "no:cacheprovider",
+            f"--benchmark-min-rounds={args.min_rounds}",
+            "--benchmark-sort=fullname",
+        ]
+        if args.keyword:
+            pytest_args += ["-k", args.keyword]
+        if args.save:
+            os.makedirs(BASELINE_DIR, exist_ok=True)
+            pytest_args.append(f"--benchmark-json={baseline_path(args.save)}")
+        sys.exit(pytest.main(pytest_args))
+
+    lines, regressions = compare(load_stats(args.baseline, args.stat), load_stats(args.current, args.stat), args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than {args.threshold:g}% ({args.stat})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,72 @@
 """Pytest configuration and fixtures"""
 
+import os
+import tempfile
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_async_db
+from app.core.identity_cache import identity_cache
 from app.main import app
+from app.services.catalog import catalog_service
+from app.services.position_buffer import position_buffer
 
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# File-backed SQLite database so the sync and async engines see the same data
+TEST_DB_PATH = os.path.join(tempfile.gettempdir(), f"codingcrazy_test_{os.getpid()}.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{TEST_DB_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+    poolclass=NullPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DB_PATH}", poolclass=NullPool)
+AsyncTestingSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+@contextmanager
+def count_queries():
+    """Collect every statement sent through the sync or async test engine"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    targets = (engine, async_engine.sync_engine)
+    for target in targets:
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", record)
+
+
+@contextmanager
+def count_commits():
+    """Count COMMITs sent through the sync or async test engine: `with count_commits() as commits: ...`"""
+    commits = []
+
+    def record(conn):
+        commits.append(conn)
+
+    targets = (engine, async_engine.sync_engine)
+    for target in targets:
+        event.listen(target, "commit", record)
+    try:
+        yield commits
+    finally:
+        for target in targets:
+            event.remove(target, "commit", record)
 
 
 def override_get_db():
@@ -29,6 +77,11 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with AsyncTestingSessionLocal() as db:
+        yield db
+
+
 @pytest.fixture(scope="function")
 def db():
     """Create a fresh database for each test"""
@@ -45,7 +98,11 @@ def db():
 def client(db):
     """Create a test client with database override"""
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     Base.metadata.create_all(bind=engine)
+    catalog_service.invalidate()
+    identity_cache.clear()
+    position_buffer.engine = async_engine
 
     with TestClient(app) as test_client:
         yield test_client
@@ -54,6 +111,27 @@ def client(db):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def query_budget():
+    """Assert a block runs at most `budget` statements: `with query_budget(2): ...`"""
+    @contextmanager
+    def check(budget: int):
+        with count_queries() as statements:
+            yield statements
+        assert len(statements) <= budget, (
+            f"{len(statements)} queries (budget {budget}):\n" + "\n".join(statements)
+        )
+    return check
+
+
+@pytest.fixture(scope="function")
+def world(db):
+    """Seed the starter world (zones, enemies, items, NPCs, chests)"""
+    from app.seed_world import seed_world_data
+    seed_world_data(db)
+    return db
+
+
 @pytest.fixture
 def test_user_data():
     """Sample user data for testing"""
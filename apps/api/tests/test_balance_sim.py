@@ -0,0 +1,61 @@
+"""Tests for the Monte Carlo balance simulator"""
+
+import math
+
+import numpy as np
+
+from app.models import EnemySpawn
+from app.routers.combat import calculate_damage
+from app.services.balance_sim import (
+    OUTCOME_DEFEAT,
+    OUTCOME_VICTORY,
+    build_loadouts,
+    player_stats,
+    run_grid,
+    simulate_fights,
+)
+from app.services.catalog import build_catalog
+
+
+def test_fights_without_crits_are_deterministic():
+    """Test that with no crits the turn count is plain hp / damage arithmetic"""
+    n = 1000
+    hit = calculate_damage(10, 4)
+    outcome, turns = simulate_fights(
+        player_hp=np.full(n, 100), player_hit=np.full(n, hit), player_crit_hit=np.full(n, hit),
+        player_crit=np.zeros(n), enemy_hp=np.full(n, 50), enemy_hit=np.full(n, 3),
+        enemy_crit_hit=np.full(n, 3), enemy_crit=np.zeros(n), rng=np.random.default_rng(0),
+    )
+    assert (outcome == OUTCOME_VICTORY).all()
+    assert (turns == math.ceil(50 / hit)).all()
+
+    outcome, turns = simulate_fights(
+        player_hp=np.full(n, 10), player_hit=np.full(n, 1), player_crit_hit=np.full(n, 1),
+        player_crit=np.zeros(n), enemy_hp=np.full(n, 50), enemy_hit=np.full(n, 5),
+        enemy_crit_hit=np.full(n, 5), enemy_crit=np.zeros(n), rng=np.random.default_rng(0),
+    )
+    assert (outcome == OUTCOME_DEFEAT).all()
+    assert (turns == 2).all()
+
+
+def test_grid_covers_seeded_content_and_is_reproducible(world):
+    """Test that every enemy type gets a row per loadout and level, and the seed fixes the result"""
+    catalog = build_catalog(world)
+    spawns = world.query(EnemySpawn).all()
+
+    rows = run_grid(catalog, spawns, [1, 5], fights=500, seed=7, loadout_names=["none"])
+    assert {r.enemy_type for r in rows} == {e.enemy_type for e in catalog.enemies.values()}
+    assert len(rows) == len(catalog.enemies) * 2
+    assert all(0 <= r.win_rate <= 1 for r in rows)
+
+    assert run_grid(catalog, spawns, [1, 5], fights=500, seed=7, loadout_names=["none"]) == rows
+    assert run_grid(catalog, spawns, [1, 5], fights=500, seed=8, loadout_names=["none"]) != rows
+
+
+def test_loadouts_apply_item_bonuses(world):
+    """Test that loadouts cover empty slots and add item bonuses to player stats"""
+    loadouts = {l.name: l for l in build_loadouts(build_catalog(world))}
+    assert "none" in loadouts
+
+    sword = loadouts["wooden_sword"]
+    assert player_stats(1, sword).attack == player_stats(1).attack + sword.attack
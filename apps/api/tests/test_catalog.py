@@ -0,0 +1,69 @@
+"""Tests for the game content catalog cache"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import Enemy, Item
+from app.services.catalog import catalog_service
+from app.services.loot import EMPTY_LOOT_TABLE
+
+
+def test_catalog_version(client: TestClient, world):
+    """Test that the catalog version is exposed and stable"""
+    response = client.get("/api/catalog/version")
+    assert response.status_code == 200
+    version = response.json()["version"]
+    assert client.get("/api/catalog/version").json()["version"] == version
+
+
+def test_catalog_lookups(client: TestClient, world):
+    """Test id and natural key lookups"""
+    catalog = catalog_service.get_sync(world)
+    item = catalog.items_by_key["health_potion"]
+    assert catalog.items[item.id] is item
+    assert catalog.starting_zone.slug == "peaceful-meadow"
+
+    with pytest.raises(TypeError):
+        catalog.items[item.id] = None
+    with pytest.raises(AttributeError):
+        item.name = "Renamed"
+
+
+def test_catalog_invalidated_on_content_write(client: TestClient, world):
+    """Test that committing a content change drops the cached catalog and bumps the version"""
+    version = client.get("/api/catalog/version").json()["version"]
+
+    item = world.query(Item).filter(Item.item_id == "health_potion").first()
+    item.sell_price += 1
+    world.commit()
+
+    assert catalog_service.version is None
+    assert client.get("/api/catalog/version").json()["version"] != version
+
+
+def test_catalog_not_invalidated_by_player_writes(client: TestClient, world):
+    """Test that gameplay writes keep the cached catalog"""
+    client.get("/api/world/state")
+    version = catalog_service.version
+    assert version is not None
+
+    client.post("/api/world/move", json={"x": 10, "y": 10})
+    assert catalog_service.version == version
+
+
+def test_bad_loot_entry_does_not_break_the_catalog(client: TestClient, world, caplog):
+    """Test that a malformed loot entry is logged and skipped, and the rest of its table still drops"""
+    enemies = world.query(Enemy).order_by(Enemy.id).all()
+    item_key = world.query(Item).first().item_id
+    enemies[0].loot_table = [
+        {"item_id": "no_such_item", "quantity": 1, "chance": 1.0},
+        {"item_id": item_key, "quantity": 2},
+    ]
+    world.commit()
+
+    assert client.get("/api/world/state").status_code == 200
+    catalog = catalog_service.get_sync(world)
+    table = catalog.enemy_loot[enemies[0].id]
+    assert [(d.item.item_id, d.quantity) for d in table.guaranteed] == [(item_key, 2)]
+    assert any(catalog.enemy_loot[enemy.id] is not EMPTY_LOOT_TABLE for enemy in enemies[1:])
+    assert "Invalid loot entry" in caplog.text and "no_such_item" in caplog.text
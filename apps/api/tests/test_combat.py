@@ -0,0 +1,278 @@
+"""Tests for combat sessions"""
+
+import asyncio
+from dataclasses import replace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import EnemySpawn, Item, PlayerInventory, User
+from app.routers import combat
+from app.services.combat_sessions import (
+    CombatState,
+    DatabaseCombatSessionStore,
+    MemoryCombatSessionStore,
+)
+from tests.conftest import AsyncTestingSessionLocal
+
+
+def start_fight(client: TestClient, world) -> dict:
+    spawn = world.query(EnemySpawn).first()
+    response = client.post("/api/combat/start", json={"enemy_spawn_id": spawn.id})
+    assert response.status_code == 200
+    return response.json()
+
+
+def make_state(session_id: str = "s1") -> CombatState:
+    return CombatState(
+        session_id=session_id, user_id=1, spawn_id=1, enemy_id=1, enemy_level=1,
+        enemy_hp=50, enemy_max_hp=50, enemy_attack=10, enemy_defense=5,
+        enemy_crit_chance=0.05, xp_reward=25, coin_reward=10, rng_seed=1234,
+    )
+
+
+@pytest.fixture(params=["memory", "database"])
+def session_store(request, monkeypatch):
+    """Run router tests against both combat session backends"""
+    store = MemoryCombatSessionStore() if request.param == "memory" else DatabaseCombatSessionStore()
+    monkeypatch.setattr(combat, "combat_sessions", store)
+    return store
+
+
+def test_enemy_hp_persists_between_turns(client: TestClient, world, session_store):
+    """Test that damage accumulates on the enemy rolled at combat start"""
+    client.post("/api/dev/set-level", params={"level": 1})
+    started = start_fight(client, world)
+    enemy_hp = started["enemy"]["hp"]
+
+    response = client.post("/api/combat/action", json={"session_id": started["session_id"], "action": "defend"})
+    assert response.json()["enemy_hp"] == enemy_hp
+
+    response = client.post("/api/combat/action", json={"session_id": started["session_id"], "action": "attack"})
+    data = response.json()
+    assert data["enemy_hp"] == max(0, enemy_hp - data["player_damage"]["amount"])
+
+
+def test_fight_to_victory_grants_scaled_rewards(client: TestClient, world, session_store):
+    """Test that the session's rewards are granted and the session is closed"""
+    client.post("/api/dev/heal")
+    started = start_fight(client, world)
+
+    data = None
+    for _ in range(100):
+        data = client.post("/api/combat/action", json={"session_id": started["session_id"], "action": "attack"}).json()
+        if data["combat_ended"]:
+            break
+        client.post("/api/dev/heal")
+
+    assert data["victory"]
+    assert data["xp_gained"] == started["enemy"]["xp_reward"]
+    assert data["gold_gained"] == started["enemy"]["coin_reward"]
+
+    response = client.post("/api/combat/action", json={"session_id": started["session_id"], "action": "attack"})
+    assert response.status_code == 404
+
+
+def test_unknown_session(client: TestClient, world):
+    """Test that actions require a live session"""
+    response = client.post("/api/combat/action", json={"session_id": "missing", "action": "attack"})
+    assert response.status_code == 404
+
+
+def test_resolve_to_victory(client: TestClient, world, session_store):
+    """Test that an auto-battle plays out the fight and grants rewards in one request"""
+    client.post("/api/dev/set-level", params={"level": 20})
+    started = start_fight(client, world)
+
+    response = client.post("/api/combat/resolve", json={"session_id": started["session_id"]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["outcome"] == "victory"
+    assert data["enemy_hp"] == 0
+    assert data["turns"] == len(data["turn_log"])
+    assert data["xp_gained"] == started["enemy"]["xp_reward"]
+    assert data["gold_gained"] == started["enemy"]["coin_reward"]
+
+    response = client.post("/api/combat/resolve", json={"session_id": started["session_id"]})
+    assert response.status_code == 404
+
+
+def test_resolve_defeat(client: TestClient, world):
+    """Test that a hopeless fight ends in defeat with no rewards"""
+    store = MemoryCombatSessionStore()
+    combat.combat_sessions, original = store, combat.combat_sessions
+    try:
+        started = start_fight(client, world)
+        state = asyncio.run(store.get(None, started["session_id"]))
+        state.enemy_attack = 10000
+        asyncio.run(store.save(None, state))
+
+        data = client.post("/api/combat/resolve", json={"session_id": started["session_id"]}).json()
+    finally:
+        combat.combat_sessions = original
+
+    assert data["outcome"] == "defeat"
+    assert data["player_hp"] == 0
+    assert data["xp_gained"] == 0
+    assert len(store) == 0
+
+
+def test_resolve_heal_policy_consumes_potions(client: TestClient, world, session_store):
+    """Test that the heal policy drinks potions below the threshold and debits them once"""
+    client.get("/api/world/state")
+    user = world.query(User).first()
+    potion = world.query(Item).filter(Item.item_id == "health_potion").first()
+    world.add(PlayerInventory(user_id=user.id, item_id=potion.id, quantity=3))
+    world.commit()
+
+    started = start_fight(client, world)
+    response = client.post("/api/combat/resolve", json={
+        "session_id": started["session_id"],
+        "policy": "heal",
+        "heal_item_id": "health_potion",
+        "heal_below": 1.0,
+        "max_turns": 3,
+    })
+    data = response.json()
+    heals = [t for t in data["turn_log"] if t["action"] == "heal"]
+    assert data["items_used"] == len(heals) > 0
+
+    inventory = client.get("/api/inventory").json()
+    remaining = sum(i["quantity"] for i in inventory["items"] if i["id"] == "health_potion")
+    assert remaining == 3 - data["items_used"]
+
+
+def test_resolve_heal_requires_consumable(client: TestClient, world):
+    """Test that the heal policy rejects items that can't heal"""
+    started = start_fight(client, world)
+    response = client.post("/api/combat/resolve", json={
+        "session_id": started["session_id"], "policy": "heal", "heal_item_id": "wooden_sword",
+    })
+    assert response.status_code == 400
+
+
+def test_memory_store_lru_eviction():
+    """Test that the least recently used session is evicted at capacity"""
+    store = MemoryCombatSessionStore(max_sessions=2)
+
+    async def run():
+        await store.save(None, make_state("a"))
+        await store.save(None, make_state("b"))
+        await store.get(None, "a")
+        await store.save(None, make_state("c"))
+        return [await store.get(None, sid) for sid in ("a", "b", "c")]
+
+    a, b, c = asyncio.run(run())
+    assert a is not None and b is None and c is not None
+
+
+def test_memory_store_hands_out_copies():
+    """Test that only save() changes a stored session, as with the database backend"""
+    store = MemoryCombatSessionStore()
+
+    async def run():
+        state = make_state("a")
+        await store.save(None, state)
+        state.turn = 5
+        loaded = await store.get(None, "a")
+        loaded.turn += 1
+        unsaved = (await store.get(None, "a")).turn
+        await store.save(None, loaded)
+        return unsaved, (await store.get(None, "a")).turn
+
+    assert asyncio.run(run()) == (0, 1)
+
+
+@pytest.mark.parametrize("backend", ["memory", "database"])
+def test_claim_lets_one_request_settle_a_turn(world, backend):
+    """Test that of two requests that read the same turn only the first to claim it may write"""
+    user = User(email="claim@example.com", password_hash="x")
+    world.add(user)
+    world.commit()
+    user_id = user.id
+    store = MemoryCombatSessionStore() if backend == "memory" else DatabaseCombatSessionStore()
+
+    async def run():
+        async with AsyncTestingSessionLocal() as db:
+            state = make_state()
+            state.user_id = user_id
+            await store.save(db, state)
+            await db.commit()
+
+        async with AsyncTestingSessionLocal() as first, AsyncTestingSessionLocal() as second:
+            mine, theirs = await store.get(first, "s1"), await store.get(second, "s1")
+            assert await store.claim(first, mine)
+            mine.turn += 1
+            await store.save(first, mine)
+            await first.commit()
+            stale_claim = await store.claim(second, theirs)
+            await second.rollback()
+
+        async with AsyncTestingSessionLocal() as db:
+            return stale_claim, (await store.get(db, "s1")).turn
+
+    assert asyncio.run(run()) == (False, 1)
+
+
+def test_memory_store_applies_writes_on_commit_only():
+    """Test that a rolled-back request neither moves the encounter forward nor keeps the claim"""
+    store = MemoryCombatSessionStore()
+
+    async def run():
+        await store.save(None, make_state("a"))
+        async with AsyncTestingSessionLocal() as db:
+            state = await store.get(db, "a")
+            assert await store.claim(db, state)
+            assert not await store.claim(db, replace(state))  # Held until the transaction ends
+            state.turn += 1
+            await store.save(db, state)
+            await db.rollback()
+        async with AsyncTestingSessionLocal() as db:
+            state = await store.get(db, "a")
+            reclaimed = await store.claim(db, state)
+            await db.rollback()
+        return state.turn, reclaimed
+
+    assert asyncio.run(run()) == (0, True)
+
+
+def test_claimed_session_returns_409(client: TestClient, world):
+    """Test that an action on an encounter another request is settling is refused"""
+    store = MemoryCombatSessionStore()
+    combat.combat_sessions, original = store, combat.combat_sessions
+    try:
+        started = start_fight(client, world)
+
+        async def hold_claim():
+            db = AsyncTestingSessionLocal()
+            assert await store.claim(db, await store.get(db, started["session_id"]))
+            return db
+
+        db = asyncio.run(hold_claim())
+        for path, body in (("/api/combat/action", {"action": "attack"}), ("/api/combat/resolve", {})):
+            response = client.post(path, json={"session_id": started["session_id"], **body})
+            assert response.status_code == 409
+        asyncio.run(db.close())
+    finally:
+        combat.combat_sessions = original
+
+
+def test_memory_store_ttl_expiry():
+    """Test that expired sessions are not returned"""
+    store = MemoryCombatSessionStore(ttl_seconds=-1)
+
+    async def run():
+        await store.save(None, make_state("a"))
+        return await store.get(None, "a")
+
+    assert asyncio.run(run()) is None
+    assert len(store) == 0
+
+
+def test_turn_rng_is_reproducible():
+    """Test that the per-turn RNG is derived from seed and turn"""
+    state = make_state()
+    first = state.rng().random()
+    assert state.rng().random() == first
+    state.turn += 1
+    assert state.rng().random() != first
@@ -0,0 +1,82 @@
+"""Tests for the bcrypt worker pool, cost calibration and rehash on login"""
+
+import asyncio
+import threading
+
+import bcrypt
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import security
+from app.core.hashing import PasswordHasher, PasswordHasherBusy
+from app.models import User
+from app.routers import auth
+
+
+def test_saturated_hasher_fails_fast():
+    """Test that calls beyond workers + queue are rejected instead of queued"""
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        blocked = [asyncio.ensure_future(hasher._run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher._run(release.wait)
+        release.set()
+        await asyncio.gather(*blocked)
+
+    asyncio.run(run())
+    assert hasher.pending == 0
+
+
+def test_calibration_respects_bounds(monkeypatch):
+    """Test that calibration sets the current cost within the configured range"""
+    monkeypatch.setattr(security, "bcrypt_rounds", security.bcrypt_rounds)
+    assert security.calibrate_bcrypt_rounds(10_000, min_rounds=4, max_rounds=9) == 9
+    assert security.calibrate_bcrypt_rounds(0.001, min_rounds=5, max_rounds=9) == 5
+    assert security.hash_rounds(security.get_password_hash("pw")) == 5
+    assert security.hash_rounds("not-a-hash") is None
+
+
+def test_rehash_only_upgrades(monkeypatch):
+    """Test that a hash made with a higher cost than the current one is kept"""
+    monkeypatch.setattr(security, "bcrypt_rounds", 5)
+    assert security.needs_rehash(bcrypt.hashpw(b"pw", bcrypt.gensalt(rounds=4)).decode())
+    assert not security.needs_rehash(bcrypt.hashpw(b"pw", bcrypt.gensalt(rounds=5)).decode())
+    assert not security.needs_rehash(bcrypt.hashpw(b"pw", bcrypt.gensalt(rounds=6)).decode())
+    assert security.needs_rehash("not-a-hash")
+
+
+def test_blocking_hash_uses_the_pool():
+    """Test the sync entry point: same bound, same worker threads"""
+    hasher = PasswordHasher(workers=1, max_queue=-1)
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash_blocking("pw")
+
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    assert security.verify_password("pw", hasher.hash_blocking("pw"))
+
+
+def test_login_rehashes_outdated_cost(client: TestClient, db, monkeypatch):
+    """Test that a successful login upgrades a hash made with another cost"""
+    monkeypatch.setattr(security, "bcrypt_rounds", 5)
+    old_hash = bcrypt.hashpw(b"secret123", bcrypt.gensalt(rounds=4)).decode()
+    db.add(User(email="old@example.com", password_hash=old_hash))
+    db.commit()
+
+    response = client.post("/api/auth/login", json={"email": "old@example.com", "password": "secret123"})
+    assert response.status_code == 200
+
+    db.expire_all()
+    new_hash = db.query(User).filter(User.email == "old@example.com").one().password_hash
+    assert security.hash_rounds(new_hash) == 5
+    assert security.verify_password("secret123", new_hash)
+
+
+def test_signup_returns_503_when_saturated(client: TestClient, monkeypatch):
+    """Test the fast 503 when the hashing pool is full"""
+    monkeypatch.setattr(auth, "password_hasher", PasswordHasher(workers=1, max_queue=-1))
+    response = client.post("/api/auth/signup", json={"email": "busy@example.com", "password": "secret123"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,147 @@
+"""Tests for the auth identity cache"""
+
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.config import settings
+from app.core import identity_cache as identity_cache_module
+from app.core.identity_cache import IdentityCache
+from app.core.security import create_access_token
+from app.models import User
+from app.repositories.users import add_coins
+from tests.conftest import AsyncTestingSessionLocal, TestingSessionLocal, engine
+
+
+def count_selects():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", record)
+
+
+def test_token_claims_are_memoized(monkeypatch):
+    """Test that a token is verified once and reported through the metrics hook"""
+    cache = IdentityCache()
+    calls = []
+    real_decode = identity_cache_module.decode_access_token
+    monkeypatch.setattr(identity_cache_module, "decode_access_token", lambda t: calls.append(t) or real_decode(t))
+    events = []
+    cache.add_metrics_hook(lambda name, hit: events.append((name, hit)))
+
+    token = create_access_token({"sub": "7"})
+    assert cache.claims(token)["sub"] == "7"
+    assert cache.claims(token)["sub"] == "7"
+    assert cache.claims("not-a-token") is None
+
+    assert len(calls) == 2
+    assert events == [("token", False), ("token", True), ("token", False)]
+    assert cache.hit_rate("token") == 1 / 3
+
+
+def test_expired_claims_are_not_served():
+    """Test that a cached entry past its exp falls through to verification"""
+    cache = IdentityCache()
+    token = create_access_token({"sub": "7"})
+    cache._tokens[token] = (time.time() - 1, {"sub": "stale"})
+    assert cache.claims(token)["sub"] == "7"
+
+
+def test_token_cache_is_bounded():
+    """Test LRU eviction of verified tokens"""
+    cache = IdentityCache(max_entries=2)
+    for sub in ("1", "2", "3"):
+        cache.claims(create_access_token({"sub": sub}))
+    assert len(cache._tokens) == 2
+
+
+def test_user_snapshot_skips_select_until_written(db):
+    """Test that a cached user is attached without a query and reloaded after a write"""
+    db.add(User(email="cache@example.com", password_hash="x", coins=5))
+    db.commit()
+    cache = IdentityCache(user_ttl_seconds=30)
+    identity_cache_module.identity_cache, original = cache, identity_cache_module.identity_cache
+
+    try:
+        with TestingSessionLocal() as session:
+            assert cache.get_user(session, 1).coins == 5
+
+        statements, stop = count_selects()
+        with TestingSessionLocal() as session:
+            user = cache.get_user(session, 1)
+            assert user.coins == 5
+            assert statements == []
+            user.coins = 6
+            session.commit()
+        stop()
+
+        async def core_write():
+            async with AsyncTestingSessionLocal() as session:
+                user = await cache.get_user_async(session, 1)
+                assert user.coins == 6
+                await add_coins(session, user, 10)
+                await session.commit()
+            async with AsyncTestingSessionLocal() as session:
+                return (await cache.get_user_async(session, 1)).coins
+
+        assert asyncio.run(core_write()) == 16
+    finally:
+        identity_cache_module.identity_cache = original
+
+    assert cache.hits["user"] == 1
+    assert cache.misses["user"] == 3
+
+
+@pytest.mark.parametrize("ttl", [0, 30])
+def test_concurrent_writers_lose_no_update(db, ttl):
+    """Test two workers writing the same user: neither update is silently overwritten"""
+    db.add(User(email="race@example.com", password_hash="x", hp=100, world_x=0))
+    db.commit()
+    # Each worker has its own process-local cache, so commits in one never invalidate the other
+    worker_a, worker_b = IdentityCache(user_ttl_seconds=ttl), IdentityCache(user_ttl_seconds=ttl)
+    with TestingSessionLocal() as session:
+        worker_b.get_user(session, 1)  # Warm B's snapshot
+
+    with TestingSessionLocal() as session:
+        worker_a.get_user(session, 1).hp = 40
+        session.commit()
+
+    with TestingSessionLocal() as session:
+        user = worker_b.get_user(session, 1)
+        user.world_x = 7
+        if ttl:
+            # B's snapshot still says hp=100: refuse the write rather than flush stale state
+            with pytest.raises(StaleDataError):
+                session.commit()
+            session.rollback()
+            user = worker_b.get_user(session, 1)
+            user.world_x = 7
+        session.commit()
+
+    db.expire_all()
+    user = db.get(User, 1)
+    assert (user.hp, user.world_x) == (40, 7)
+
+
+def test_dev_user_cached_across_requests(client: TestClient):
+    """Test that the DEV_MODE user is cached by default and still sees its own writes"""
+    from app.core.identity_cache import identity_cache
+
+    assert identity_cache.user_ttl_seconds == settings.AUTH_USER_TTL_SECONDS > 0
+
+    client.get("/api/auth/me")
+    client.post("/api/dev/give-gold", params={"amount": 40})
+    hits = identity_cache.hits["user"]
+    response = client.get("/api/inventory")
+    assert response.json()["gold"] == 40
+
+    client.get("/api/auth/me")
+    assert identity_cache.hits["user"] > hits
@@ -0,0 +1,44 @@
+"""Query plans for the hot lookups must use an index, never a full table scan"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.models import ChestProgress, CombatSession, EnemySpawn, NPC, PlayerInventory, Progress, WorldChest
+
+
+HOT_QUERIES = {
+    "inventory_list": select(PlayerInventory).where(PlayerInventory.user_id == 1),
+    "inventory_stack": select(PlayerInventory).where(PlayerInventory.user_id == 1, PlayerInventory.item_id == 2),
+    "chest_by_slug": select(WorldChest).where(WorldChest.chest_id == "starter_chest_1"),
+    "chest_opened": select(ChestProgress).where(ChestProgress.user_id == 1, ChestProgress.chest_id == 2),
+    "zone_spawns": select(EnemySpawn).where(EnemySpawn.zone_id == 1),
+    "zone_npcs": select(NPC).where(NPC.zone_id == 1),
+    "zone_chests": select(WorldChest).where(WorldChest.zone_id == 1),
+    "level_progress": select(Progress).where(Progress.user_id == 1, Progress.level_id == 2),
+    "expired_combat_sessions": delete(CombatSession).where(
+        CombatSession.user_id == 1, CombatSession.expires_at < datetime(2026, 1, 1)
+    ),
+}
+
+
+def query_plan(db, statement) -> list[str]:
+    compiled = statement.compile(dialect=db.bind.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(db, name):
+    """Test that no step of the plan scans a whole table"""
+    plan = query_plan(db, HOT_QUERIES[name])
+    assert plan
+    assert not [step for step in plan if step.startswith("SCAN")], plan
+
+
+def test_combat_sweep_uses_both_columns(db):
+    """Test that the expired-session sweep narrows on user_id and expires_at"""
+    plan = query_plan(db, HOT_QUERIES["expired_combat_sessions"])
+    assert any("ix_combat_sessions_user_id_expires_at" in step and "expires_at<?" in step for step in plan), plan
@@ -0,0 +1,125 @@
+"""Tests for compiled loot tables"""
+
+import random
+from collections import Counter, namedtuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import Enemy, EnemySpawn, Item, PlayerInventory, User
+from app.routers import combat
+from app.services.catalog import build_catalog
+from app.services.combat_sessions import MemoryCombatSessionStore
+from app.services.loot import AliasSampler, LootTableError, compile_loot_table
+
+
+FakeItem = namedtuple("FakeItem", ["id", "item_id"])
+ITEMS = {key: FakeItem(i, key) for i, key in enumerate(["potion", "sword", "key"], start=1)}
+
+
+def test_alias_sampler_matches_weights():
+    """Test that the alias method reproduces the weight distribution"""
+    sampler = AliasSampler([1, 2, 7])
+    rng = random.Random(3)
+    counts = Counter(sampler.sample(rng) for _ in range(50000))
+    for outcome, expected in enumerate([0.1, 0.2, 0.7]):
+        assert counts[outcome] / 50000 == pytest.approx(expected, abs=0.01)
+
+
+def test_compile_splits_entry_kinds():
+    """Test guaranteed, independent and weighted entries"""
+    table = compile_loot_table([
+        {"item_id": "potion", "quantity": 2},
+        {"item_id": "potion", "chance": 0.0},
+        {"item_id": "key", "chance": 0.5},
+        {"item_id": "sword", "weight": 1},
+        {"item_id": None, "weight": 3},
+    ], ITEMS)
+    assert len(table.guaranteed) == 1
+    assert len(table.independent) == 1
+    assert len(table.weighted) == 2
+
+    rng = random.Random(0)
+    rolls = [{d.item.item_id: d.quantity for d in table.roll(rng)} for _ in range(4000)]
+    assert all(r["potion"] == 2 for r in rolls)
+    assert sum("sword" in r for r in rolls) / 4000 == pytest.approx(0.25, abs=0.03)
+    assert sum("key" in r for r in rolls) / 4000 == pytest.approx(0.5, abs=0.03)
+
+
+def test_compile_merges_repeated_items():
+    """Test that drops of the same item are combined into one"""
+    table = compile_loot_table([{"item_id": "potion"}, {"item_id": "potion", "quantity": 3}], ITEMS)
+    assert [(d.item.item_id, d.quantity) for d in table.roll()] == [("potion", 4)]
+
+
+@pytest.mark.parametrize("entries", [
+    [{"item_id": "missing"}],
+    [{"item_id": "potion", "chance": 1.5}],
+    [{"item_id": "potion", "quantity": 0}],
+    [{"item_id": "potion", "weight": -1}],
+    [{"item_id": None, "chance": 0.5}],
+    [{"item_id": None, "weight": 0}],
+    {"item_id": "potion"},
+])
+def test_compile_rejects_bad_tables(entries):
+    """Test that malformed tables fail at compile time"""
+    with pytest.raises(LootTableError):
+        compile_loot_table(entries, ITEMS)
+
+
+def test_compile_skips_bad_entries_when_asked():
+    """Test that on_invalid gets each bad entry and the rest of the table still compiles"""
+    errors = []
+    table = compile_loot_table([
+        {"item_id": "missing"},
+        {"item_id": "potion", "quantity": 2},
+        {"item_id": "key", "chance": 1.5},
+        {"item_id": "sword", "weight": 1},
+    ], ITEMS, on_invalid=errors.append)
+    assert len(errors) == 2
+    assert [(d.item.item_id, d.quantity) for d in table.guaranteed] == [("potion", 2)]
+    assert table.independent == ()
+    assert [d.item.item_id for d in table.weighted] == ["sword"]
+
+
+def test_seeded_tables_compile(world):
+    """Test that every seeded enemy and chest table compiles"""
+    catalog = build_catalog(world)
+    assert catalog.chest_loot and catalog.enemy_loot
+    assert any(catalog.enemy_loot.values())
+
+
+def test_open_chest_adds_to_existing_stack(client: TestClient, world):
+    """Test that chest loot is upserted onto an existing inventory row"""
+    client.get("/api/world/state")
+    user = world.query(User).first()
+    potion = world.query(Item).filter(Item.item_id == "health_potion").first()
+    world.add(PlayerInventory(user_id=user.id, item_id=potion.id, quantity=1))
+    world.commit()
+
+    response = client.post("/api/chests/open", json={"chest_id": "starter_chest_1"})
+    assert response.status_code == 200
+    assert response.json()["items_received"] == [
+        {"item_id": "health_potion", "name": "Health Potion", "quantity": 2, "rarity": "common"},
+    ]
+
+    world.expire_all()
+    rows = world.query(PlayerInventory).filter(PlayerInventory.user_id == user.id).all()
+    assert [(r.item_id, r.quantity) for r in rows] == [(potion.id, 3)]
+
+
+def test_combat_victory_drops_loot(client: TestClient, world, monkeypatch):
+    """Test that defeating an enemy rolls its loot table into the inventory"""
+    for enemy in world.query(Enemy).all():
+        enemy.loot_table = [{"item_id": "mana_potion", "quantity": 2}]
+    world.commit()
+    monkeypatch.setattr(combat, "combat_sessions", MemoryCombatSessionStore())
+
+    spawn = world.query(EnemySpawn).first()
+    started = client.post("/api/combat/start", json={"enemy_spawn_id": spawn.id}).json()
+    data = client.post("/api/combat/resolve", json={"session_id": started["session_id"]}).json()
+
+    assert data["outcome"] == "victory"
+    assert data["loot"] == [{"item_id": "mana_potion", "name": "Mana Potion", "quantity": 2, "rarity": "common"}]
+    inventory = client.get("/api/inventory").json()["items"]
+    assert {i["id"]: i["quantity"] for i in inventory}["mana_potion"] == 2
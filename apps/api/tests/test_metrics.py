@@ -0,0 +1,120 @@
+"""Tests for the /metrics endpoint"""
+
+import re
+import threading
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from app.core.database import get_db
+from app.core.deps import get_request_db
+from app.core.metrics import Counter, Histogram, instrument_pool, registry
+
+
+def sample(body: str, line_prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not in metrics")
+
+
+def test_counter_sums_thread_shards():
+    """Test that per-thread shards add up to the total"""
+    counter = Counter("c_total", "test", ("kind",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert counter.values() == {("a",): 4000}
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test bucket placement, +Inf, sum and count"""
+    histogram = Histogram("h_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/x")
+    lines = histogram.render()
+    assert 'h_seconds_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'h_seconds_bucket{route="/x",le="1.0"} 3' in lines
+    assert 'h_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'h_seconds_count{route="/x"} 4' in lines
+    assert 'h_seconds_sum{route="/x"} 3.65' in lines
+
+
+def test_metrics_endpoint(client: TestClient, world):
+    """Test route-template labels, error counts and the live gauges"""
+    client.get("/api/npcs/merchant_marcus")
+    client.get("/api/npcs/merchant_marcus")
+    client.get("/definitely/not/here")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+
+    assert sample(body, 'http_requests_total{method="GET",route="/api/npcs/{npc_id}",status="200"}') >= 2
+    assert sample(body, 'http_requests_total{method="GET",route="unmatched",status="404"}') >= 1
+    assert sample(body, 'http_request_duration_seconds_count{method="GET",route="/api/npcs/{npc_id}"}') >= 2
+    assert sample(body, 'threadpool_workers{state="limit"}') > 0
+    assert sample(body, 'identity_cache_lookups_total{cache="user",result="miss"}') >= 1  # First lookup of the user
+    assert re.search(r"^# TYPE db_pool_connect_seconds histogram$", body, re.M)
+    assert re.search(r"^# TYPE db_pool_wait_seconds histogram$", body, re.M)
+
+
+def test_pool_instrumentation(tmp_path):
+    """Test checkout counts, in-use gauge and connect histogram for a QueuePool"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=2)
+    instrument_pool("test_pool", engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        body = registry.render()
+        assert sample(body, 'db_pool_connections_in_use{pool="test_pool"}') == 1
+        assert sample(body, 'db_pool_size{pool="test_pool"}') == 2
+
+    body = registry.render()
+    assert sample(body, 'db_pool_checkouts_total{pool="test_pool"}') == 1
+    assert sample(body, 'db_pool_connections_in_use{pool="test_pool"}') == 0
+    assert sample(body, 'db_pool_connect_seconds_count{pool="test_pool"}') == 1
+
+    with engine.connect():  # Reuses the pooled connection: a checkout, not a connect
+        pass
+    body = registry.render()
+    assert sample(body, 'db_pool_checkouts_total{pool="test_pool"}') == 2
+    assert sample(body, 'db_pool_connect_seconds_count{pool="test_pool"}') == 1
+    engine.dispose()
+
+
+def test_request_session_records_pool_wait(tmp_path):
+    """Test that a request's session checks out its connection up front and times the wait"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'wait.db'}", poolclass=QueuePool, pool_size=1)
+    instrument_pool("wait_pool", engine)
+
+    def pooled_db():
+        with Session(engine) as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/in-use")
+    def in_use(db: Session = Depends(get_request_db)):
+        return {"in_use": engine.pool.checkedout()}
+
+    app.dependency_overrides[get_db] = pooled_db
+    with TestClient(app) as client:
+        assert client.get("/in-use").json() == {"in_use": 1}
+        assert client.get("/in-use").json() == {"in_use": 1}
+
+    body = registry.render()
+    assert sample(body, 'db_pool_wait_seconds_count{pool="wait_pool"}') == 2
+    assert sample(body, 'db_pool_connections_in_use{pool="wait_pool"}') == 0
+    engine.dispose()
@@ -0,0 +1,113 @@
+"""Tests for the /world/move write-behind buffer"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.models import User, WorldZone
+from app.services import position_buffer as position_buffer_module
+from app.services.position_buffer import PositionBuffer, position_buffer
+from tests.conftest import async_engine
+
+
+def stored_position(db) -> tuple[int, int]:
+    db.expire_all()
+    user = db.query(User).first()
+    return user.world_x, user.world_y
+
+
+def test_move_is_buffered_and_visible(client: TestClient, world):
+    """Test that a move skips the write but /world/state sees it until the flush lands"""
+    start = client.get("/api/world/state").json()["player"]["position"]
+
+    response = client.post("/api/world/move", json={"x": 11, "y": 12})
+    assert response.json() == {"success": True, "message": "Position updated", "x": 11, "y": 12}
+    client.post("/api/world/move", json={"x": 12, "y": 12})
+
+    assert stored_position(world) == (start["x"], start["y"])
+    assert client.get("/api/world/state").json()["player"]["position"] == {"x": 12, "y": 12}
+
+    assert client.portal.call(position_buffer.flush) == 1
+    assert stored_position(world) == (12, 12)
+    assert client.get("/api/world/state").json()["player"]["position"] == {"x": 12, "y": 12}
+
+
+def test_move_out_of_bounds_is_not_buffered(client: TestClient, world):
+    """Test that the bounds check runs against the cached zone"""
+    client.get("/api/world/state")
+    response = client.post("/api/world/move", json={"x": 10_000, "y": 0})
+    assert response.status_code == 400
+    assert len(position_buffer) == 0
+
+
+def test_transition_drops_buffered_move(client: TestClient, world):
+    """Test that a pending step in the old zone can't overwrite the new spawn point"""
+    client.get("/api/world/state")
+    target = world.query(WorldZone).filter(WorldZone.is_starting_zone.is_(False)).first()
+    target.level_requirement = 1
+    world.commit()
+
+    client.post("/api/world/move", json={"x": 3, "y": 4})
+    client.post("/api/world/transition", json={"target_zone_slug": target.slug})
+    client.portal.call(position_buffer.flush)
+
+    assert stored_position(world) == (target.spawn_x, target.spawn_y)
+
+
+def test_flush_is_guarded_by_zone(world):
+    """Test that a buffered move made in another zone is ignored by the UPDATE"""
+    zone = world.query(WorldZone).first()
+    user = User(email="zone@example.com", password_hash="x", current_zone_id=zone.id, world_x=1, world_y=1)
+    world.add(user)
+    world.commit()
+
+    buffer = PositionBuffer(engine=async_engine)
+    buffer.record(user.id, zone.id + 100, 9, 9)
+    asyncio.run(buffer.flush())
+    assert stored_position(world) == (1, 1)
+
+
+def test_batch_stays_visible_until_flush_finishes(world, monkeypatch):
+    """Test that get() serves a batch while it is written and until its cache entry is dropped"""
+    zone = world.query(WorldZone).first()
+    user = User(email="inflight@example.com", password_hash="x", current_zone_id=zone.id, world_x=1, world_y=1)
+    world.add(user)
+    world.commit()
+
+    buffer = PositionBuffer(engine=async_engine)
+    seen = []
+    record = lambda *args: seen.append(buffer.get(user.id, zone.id))
+    event.listen(async_engine.sync_engine, "after_cursor_execute", record)
+    monkeypatch.setattr(position_buffer_module.identity_cache, "invalidate_user", record)
+    try:
+        buffer.record(user.id, zone.id, 9, 9)
+        asyncio.run(buffer.flush())
+    finally:
+        event.remove(async_engine.sync_engine, "after_cursor_execute", record)
+
+    assert seen and all(position == (zone.id, 9, 9) for position in seen)
+    assert buffer.get(user.id, zone.id) is None
+    assert stored_position(world) == (9, 9)
+
+
+def test_size_threshold_triggers_flush(world):
+    """Test that reaching max_pending flushes without waiting for the interval"""
+    zone = world.query(WorldZone).first()
+    world.add_all([
+        User(email=f"p{i}@example.com", password_hash="x", current_zone_id=zone.id) for i in range(2)
+    ])
+    world.commit()
+    ids = [u.id for u in world.query(User).all()]
+
+    async def run():
+        buffer = PositionBuffer(engine=async_engine, interval=60, max_pending=2)
+        buffer.record(ids[0], zone.id, 5, 6)
+        assert buffer._flush_task is None
+        buffer.record(ids[1], zone.id, 7, 8)
+        await buffer._flush_task
+        return buffer.flushed, len(buffer)
+
+    assert asyncio.run(run()) == (2, 0)
+    world.expire_all()
+    assert sorted((u.world_x, u.world_y) for u in world.query(User).all()) == [(5, 6), (7, 8)]
@@ -0,0 +1,70 @@
+"""Tests for the slow-request sampling profiler"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core import profiler
+from app.core.config import settings
+from app.core.profiler import ProfileStore, StackSampler
+from app.routers import world as world_router
+
+
+def busy_wait(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_collects_folded_stacks():
+    """Test that a busy thread shows up with its call chain"""
+    sampler = StackSampler(interval=0.001)
+    stacks = sampler.start()
+    busy_wait(0.1)
+    collected = sampler.stop(stacks)
+
+    assert collected
+    busy = [stack for stack in collected if "busy_wait (test_profiler.py" in stack]
+    assert busy
+    assert busy[0].split(";")[0] == "MainThread"
+    assert "test_sampler_collects_folded_stacks" in busy[0]
+
+
+def test_store_is_a_bounded_ring(tmp_path):
+    """Test that only the newest files are kept and foreign names are refused"""
+    store = ProfileStore(str(tmp_path), max_files=2)
+    names = [store.write("GET", "/api/world/state", 600 + i, {"a;b": i + 1}) for i in range(3)]
+
+    assert [f.name for f in store.list()] == names[:0:-1]
+    assert (tmp_path / names[2]).read_text() == "a;b 3\n"
+    assert store.path(names[0]) is None
+    assert store.path("../../etc/passwd") is None
+
+
+def test_slow_requests_are_kept(client: TestClient, world, tmp_path, monkeypatch):
+    """Test sampling, the latency threshold and the admin endpoints"""
+    monkeypatch.setattr(profiler.profile_store, "directory", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILE_THRESHOLD_MS", 10_000)
+
+    client.get("/api/world/state")
+    assert client.get("/api/admin/profiles").json() == []
+
+    query_nearby = world_router.query_nearby
+    monkeypatch.setattr(world_router, "query_nearby", lambda *args: busy_wait(0.05) or query_nearby(*args))
+    monkeypatch.setattr(settings, "PROFILE_THRESHOLD_MS", 0)
+    client.get("/api/world/state")
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 0.0)
+
+    listed = client.get("/api/admin/profiles").json()
+    assert len(listed) == 1
+    assert "-GET-api_world_state-" in listed[0]["name"]
+
+    response = client.get(f"/api/admin/profiles/{listed[0]['name']}")
+    assert response.status_code == 200
+    for line in response.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and ";" in stack
+    assert "busy_wait (test_profiler.py" in response.text
+
+    assert client.get("/api/admin/profiles/nope.folded").status_code == 404
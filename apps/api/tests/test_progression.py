@@ -0,0 +1,64 @@
+"""Tests for the XP table and level-ups"""
+
+from fastapi.testclient import TestClient
+
+from app.models import User
+from app.schemas.progression import calculate_xp_to_next_level
+from app.services.progression import LEVEL_UP_ATTACK, LEVEL_UP_HP, XPTable, grant_xp
+
+
+def test_table_matches_curve():
+    """Test that table lookups agree with the XP curve, including past the cap"""
+    table = XPTable(50)
+    for level in (1, 2, 10, 50, 51):
+        assert table.xp_to_next(level) == calculate_xp_to_next_level(level)
+
+    assert table.total_xp(1) == 0
+    assert table.total_xp(3) == calculate_xp_to_next_level(1) + calculate_xp_to_next_level(2)
+
+
+def test_level_for_total_xp():
+    """Test level lookup on and around level boundaries"""
+    table = XPTable(50)
+    assert table.level_for_total_xp(0) == 1
+    for level in (2, 7, 50):
+        assert table.level_for_total_xp(table.total_xp(level)) == level
+        assert table.level_for_total_xp(table.total_xp(level) - 1) == level - 1
+    assert table.level_for_total_xp(10 ** 12) == 50
+
+
+def test_apply_multiple_level_ups_and_cap():
+    """Test that one grant can cross several levels and stops at the max level"""
+    table = XPTable(10)
+    amount = table.total_xp(5) - 10 + 3
+    assert table.apply(1, 10, amount) == (5, 3, 4)
+
+    level, current_xp, gained = table.apply(9, 0, 10 ** 9)
+    assert (level, gained) == (10, 1)
+    assert current_xp == table.xp_to_next(10)
+
+
+def test_grant_xp_applies_stat_gains():
+    """Test that every level gained adds its stat gains"""
+    user = User(player_level=1, current_xp=0, hp=5, max_hp=100, attack=10, defense=5)
+    gained = grant_xp(user, calculate_xp_to_next_level(1) + calculate_xp_to_next_level(2))
+
+    assert gained == 2
+    assert user.player_level == 3
+    assert user.current_xp == 0
+    assert user.max_hp == 100 + 2 * LEVEL_UP_HP
+    assert user.hp == user.max_hp
+    assert user.attack == 10 + 2 * LEVEL_UP_ATTACK
+
+
+def test_progression_endpoint(client: TestClient):
+    """Test that /progression/me reflects a multi-level grant"""
+    response = client.post("/api/dev/grant-xp", params={"amount": 1000})
+    data = response.json()
+    assert data["levels_gained"] > 1
+
+    response = client.get("/api/progression/me")
+    assert response.status_code == 200
+    progression = response.json()
+    assert progression["player_level"] == data["new_level"]
+    assert progression["xp_to_next_level"] == calculate_xp_to_next_level(data["new_level"])
@@ -0,0 +1,69 @@
+"""Query budgets for the hot endpoints (N+1 regressions)"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import NPC, Enemy, EnemySpawn, Item, PlayerInventory, User, WorldZone
+from tests.conftest import count_queries
+
+
+# Statements per warm request (catalog loaded, user served from the identity cache)
+HOT_ENDPOINTS = {
+    "/api/inventory": 1,
+    "/api/world/state": 0,
+    "/api/npcs/merchant_marcus/shop": 0,
+    "/api/chests/starter_chest_1": 2,
+}
+
+
+def grow_world(world, count: int) -> None:
+    """Add `count` owned items, shop entries and spawns near the starting point"""
+    user = world.query(User).first()
+    zone = world.query(WorldZone).filter(WorldZone.is_starting_zone.is_(True)).first()
+    enemy = world.query(Enemy).first()
+    merchant = world.query(NPC).filter(NPC.npc_id == "merchant_marcus").first()
+    offset = world.query(Item).count()
+
+    items = [
+        Item(item_id=f"budget_item_{offset + i}", name=f"Item {i}", item_type="material", sprite_key="item")
+        for i in range(count)
+    ]
+    world.add_all(items)
+    world.flush()
+    world.add_all(PlayerInventory(user_id=user.id, item_id=item.id, quantity=1) for item in items)
+    world.add_all(
+        EnemySpawn(zone_id=zone.id, enemy_id=enemy.id, spawn_x=zone.spawn_x + i % 5, spawn_y=zone.spawn_y + i // 5 % 5)
+        for i in range(count)
+    )
+    merchant.shop_items = list(merchant.shop_items) + [
+        {"item_id": item.item_id, "price": 1, "stock": -1} for item in items
+    ]
+    world.commit()
+
+
+def warm_query_count(client: TestClient, path: str) -> int:
+    assert client.get(path).status_code == 200  # Rebuild the catalog after seeding
+    with count_queries() as statements:
+        assert client.get(path).status_code == 200
+    return len(statements)
+
+
+@pytest.mark.parametrize("path", HOT_ENDPOINTS)
+def test_query_count_is_independent_of_row_count(client: TestClient, world, path):
+    """Test that 5 and 500 seeded rows cost the same number of statements"""
+    client.get("/api/world/state")
+    grow_world(world, 5)
+    small = warm_query_count(client, path)
+    grow_world(world, 495)
+    large = warm_query_count(client, path)
+    assert small == large
+
+
+@pytest.mark.parametrize("path,budget", HOT_ENDPOINTS.items())
+def test_hot_endpoint_budget(client: TestClient, world, query_budget, path, budget):
+    """Test each hot endpoint against its fixed statement budget"""
+    assert client.get("/api/world/state").status_code == 200
+    grow_world(world, 50)
+    assert client.get(path).status_code == 200
+    with query_budget(budget):
+        assert client.get(path).status_code == 200
@@ -0,0 +1,81 @@
+"""Tests for the per-request SQL stats middleware"""
+
+import json
+import logging
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.query_stats import QueryStats, _current, normalize_statement
+
+
+def db_timing(response) -> tuple[float, int]:
+    match = re.fullmatch(r'db;dur=([\d.]+);desc="(\d+) queries"', response.headers["server-timing"])
+    return float(match.group(1)), int(match.group(2))
+
+
+def test_normalize_statement():
+    """Test that literals, bind markers and IN lists collapse to one shape"""
+    assert normalize_statement(
+        "SELECT *\n  FROM items WHERE id IN (?, ?, ?) AND name = 'it''s' AND qty > 10"
+    ) == "SELECT * FROM items WHERE id IN (?) AND name = ? AND qty > ?"
+    assert normalize_statement("UPDATE users SET coins=%(coins)s WHERE users.id = $1") == (
+        "UPDATE users SET coins=? WHERE users.id = ?"
+    )
+    assert normalize_statement("SELECT t1.c2 FROM t1") == "SELECT t1.c2 FROM t1"
+
+
+def test_slowest_statements_are_bounded():
+    """Test that only the top N slowest statements are kept"""
+    stats = QueryStats(top_n=2)
+    for ms in (5.0, 1.0, 9.0, 3.0):
+        stats.record(f"SELECT {ms}", ms)
+    assert stats.count == 4
+    assert stats.total_ms == 18.0
+    assert [entry["ms"] for entry in stats.top()] == [9.0, 5.0]
+
+
+def test_server_timing_on_async_and_sync_routes(client: TestClient, world):
+    """Test that queries from both engines are attributed to the request"""
+    _, async_queries = db_timing(client.get("/api/inventory"))
+    assert async_queries > 0
+
+    _, sync_queries = db_timing(client.get("/api/levels"))
+    assert sync_queries > 0
+
+    _, no_queries = db_timing(client.get("/health"))
+    assert no_queries == 0
+
+
+def test_slow_request_is_logged(client: TestClient, world, monkeypatch, caplog):
+    """Test the structured log line once a threshold is crossed"""
+    monkeypatch.setattr(settings, "SLOW_REQUEST_QUERY_COUNT", 1)
+    with caplog.at_level(logging.WARNING, logger="app.core.query_stats"):
+        client.get("/api/inventory")
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["event"] == "slow_request_db"
+    assert record["path"] == "/api/inventory"
+    assert record["queries"] >= 1
+    assert record["slowest"][0]["statement"].startswith("SELECT")
+
+
+def test_failed_statement_leaves_no_start_time():
+    """Test that a statement that raises doesn't leave its start time on the connection"""
+    engine = create_engine("sqlite://")
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+            assert not conn.info.get("query_started")
+            conn.execute(text("SELECT 1"))
+    finally:
+        _current.reset(token)
+    assert stats.count == 1
+    engine.dispose()
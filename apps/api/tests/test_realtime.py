@@ -0,0 +1,73 @@
+"""Tests for the /ws/world realtime channel"""
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core import deps
+from app.core.config import settings
+from app.models import NPC
+
+
+def test_channel_sends_state_then_diffs(client: TestClient, world):
+    """Test the initial snapshot and the entered/left diffs as the player moves"""
+    state = client.get("/api/world/state").json()
+    npc = world.query(NPC).filter(NPC.zone_id == state["player"]["zone_id"]).first()
+    key = f"npc:{npc.npc_id}"
+
+    with client.websocket_connect("/ws/world") as ws:
+        snapshot = ws.receive_json()
+        assert snapshot["type"] == "state"
+        assert snapshot["position"] == state["player"]["position"]
+        assert {e["key"] for e in snapshot["nearby"]} == {
+            f"{e['entity_type']}:{e['id']}"
+            for group in ("nearby_enemies", "nearby_npcs", "nearby_chests")
+            for e in state[group]
+        }
+
+        ws.send_json({"type": "move", "x": npc.position_x, "y": npc.position_y})
+        moved = ws.receive_json()
+        assert moved["position"] == {"x": npc.position_x, "y": npc.position_y}
+        seen = {e["key"] for e in snapshot["nearby"]} | {e["key"] for e in moved["added"]}
+        assert key in seen
+        assert not set(moved["removed"]) & {e["key"] for e in moved["added"]}
+
+    http_state = client.get("/api/world/state").json()
+    assert http_state["player"]["position"] == {"x": npc.position_x, "y": npc.position_y}
+    assert any(e["id"] == npc.npc_id for e in http_state["nearby_npcs"])
+
+
+def test_moves_within_window_are_coalesced(client: TestClient, world, monkeypatch):
+    """Test that a burst of moves produces one update for the latest position"""
+    monkeypatch.setattr(settings, "WS_MOVE_COALESCE_MS", 200)
+    client.get("/api/world/state")
+
+    with client.websocket_connect("/ws/world") as ws:
+        ws.receive_json()
+        for x in (1, 2, 3, 4):
+            ws.send_json({"type": "move", "x": x, "y": 1})
+        assert ws.receive_json()["position"] == {"x": 1, "y": 1}
+        assert ws.receive_json()["position"] == {"x": 4, "y": 1}
+
+
+def test_invalid_messages_get_errors(client: TestClient, world):
+    """Test that bad input is reported without dropping the connection"""
+    client.get("/api/world/state")
+
+    with client.websocket_connect("/ws/world") as ws:
+        ws.receive_json()
+        ws.send_text("not json")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json({"type": "move", "x": -1, "y": 0})
+        assert ws.receive_json() == {"type": "error", "detail": "Position out of bounds"}
+        ws.send_json({"type": "move", "x": 2, "y": 2})
+        assert ws.receive_json()["type"] == "moved"
+
+
+def test_channel_requires_session_cookie(client: TestClient, world, monkeypatch):
+    """Test that the handshake is refused without a valid cookie"""
+    monkeypatch.setattr(deps, "DEV_MODE", False)
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect("/ws/world"):
+            pass
+    assert exc.value.code == 1008
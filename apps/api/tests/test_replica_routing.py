@@ -0,0 +1,150 @@
+"""Tests for pool settings and read-replica routing (primary and replica are two SQLite files)"""
+
+import asyncio
+import os
+import tempfile
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base, RoutingSession, engine_options, get_db
+from app.core.deps import DbSession, get_request_db
+from app.models import Level
+
+
+def add_level(engine, slug: str) -> None:
+    with sessionmaker(bind=engine)() as db:
+        db.add(Level(slug=slug, title=slug, order_index=1, json_data={}))
+        db.commit()
+
+
+def slugs(db) -> list[str]:
+    return db.scalars(select(Level.slug).order_by(Level.id)).all()
+
+
+@pytest.fixture
+def database_files():
+    directory = tempfile.mkdtemp()
+    paths = [os.path.join(directory, f"{name}.db") for name in ("primary", "replica")]
+    engines = [create_engine(f"sqlite:///{path}") for path in paths]
+    for engine, name in zip(engines, ("primary", "replica")):
+        Base.metadata.create_all(engine)
+        add_level(engine, f"{name}_level")  # Tells the two apart
+    yield paths
+    for engine in engines:
+        engine.dispose()
+    for path in paths:
+        os.remove(path)
+
+
+@pytest.fixture
+def routed(database_files):
+    primary, replica = (create_engine(f"sqlite:///{path}") for path in database_files)
+    yield sessionmaker(class_=RoutingSession, primary=primary, replicas=[replica], autoflush=False)
+    primary.dispose()
+    replica.dispose()
+
+
+def test_read_only_session_uses_replica(routed):
+    """Test that a session that never writes reads from the replica"""
+    with routed() as db:
+        assert slugs(db) == ["replica_level"]
+        assert not db.sticky
+
+
+def test_session_reads_its_own_writes(routed):
+    """Test that after a flush every statement goes to the primary"""
+    with routed() as db:
+        assert slugs(db) == ["replica_level"]
+        db.add(Level(slug="new_level", title="New", order_index=2, json_data={}))
+        db.flush()
+        assert slugs(db) == ["primary_level", "new_level"]
+        db.commit()
+        assert slugs(db) == ["primary_level", "new_level"]
+
+    with routed() as db:
+        assert slugs(db) == ["replica_level"]  # Nothing replicates between two plain files
+
+
+def test_core_dml_and_explicit_primary(routed):
+    """Test that Core UPDATEs and use_primary() pin the session to the primary"""
+    with routed() as db:
+        db.execute(update(Level).values(title="Renamed"))
+        assert slugs(db) == ["primary_level"]
+
+    with routed() as db:
+        db.use_primary()
+        assert slugs(db) == ["primary_level"]
+
+
+def test_async_routing(database_files):
+    """Test the same routing through AsyncSession on aiosqlite"""
+    primary, replica = (create_async_engine(f"sqlite+aiosqlite:///{path}") for path in database_files)
+    session_factory = async_sessionmaker(
+        sync_session_class=RoutingSession,
+        primary=primary.sync_engine,
+        replicas=[replica.sync_engine],
+        expire_on_commit=False,
+    )
+
+    async def run():
+        async with session_factory() as db:
+            before = (await db.scalars(select(Level.slug))).all()
+            await db.execute(update(Level).values(title="Renamed"))
+            after = (await db.scalars(select(Level.slug))).all()
+        await primary.dispose()
+        await replica.dispose()
+        return before, after
+
+    assert asyncio.run(run()) == (["replica_level"], ["primary_level"])
+
+
+def test_requests_that_write_read_from_the_primary(routed):
+    """Test that only read-only GETs use the replica; non-GETs and unit-of-work routes start on the primary"""
+    app = FastAPI()
+
+    @app.get("/read")
+    def read(db=Depends(get_request_db)):
+        return slugs(db)
+
+    @app.get("/read-in-unit-of-work")
+    def read_in_unit_of_work(db: DbSession):
+        return slugs(db)
+
+    @app.post("/write")
+    def write(db=Depends(get_request_db)):
+        return slugs(db)
+
+    def routed_db():
+        with routed() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = routed_db
+    client = TestClient(app)
+    assert client.get("/read").json() == ["replica_level"]
+    assert client.get("/read-in-unit-of-work").json() == ["primary_level"]
+    assert client.post("/write").json() == ["primary_level"]
+
+
+def test_engine_options_follow_settings(monkeypatch):
+    """Test pool sizing for server and file databases, and none for in-memory SQLite"""
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(settings, "DB_POOL_RECYCLE", 600)
+
+    options = engine_options("postgresql://localhost/codingcrazy")
+    assert options["pool_size"] == 20
+    assert options["pool_recycle"] == 600
+    assert options["pool_pre_ping"] is settings.DB_POOL_PRE_PING
+    assert "connect_args" not in options
+
+    assert engine_options("sqlite:///./codingcrazy.db")["connect_args"] == {"check_same_thread": False}
+    assert "connect_args" not in engine_options("sqlite+aiosqlite:///./codingcrazy.db")
+
+    memory = engine_options("sqlite://")
+    assert "pool_size" not in memory
+    create_engine("sqlite://", **memory).dispose()  # Accepted by the in-memory pool
@@ -0,0 +1,212 @@
+"""Tests for the set-based inventory and coin writes and the fast-path reads"""
+
+import asyncio
+
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.models import Character, Item, Level, PlayerInventory, Progress, User
+from app.repositories import progress as progress_repo
+from app.repositories.inventory import add_item, list_stacks, remove_item
+from app.repositories.users import deduct_coins, spend_coins
+from tests.conftest import AsyncTestingSessionLocal, engine
+
+
+def make_user(world, coins: int = 0) -> tuple[int, int]:
+    user = User(email="repo@example.com", password_hash="x", coins=coins)
+    world.add(user)
+    world.commit()
+    potion = world.query(Item).filter(Item.item_id == "health_potion").first()
+    return user.id, potion.id
+
+
+def test_add_and_remove_item(world):
+    """Test upsert accumulation and guarded removal down to deletion"""
+    user_id, item_id = make_user(world)
+
+    async def run():
+        async with AsyncTestingSessionLocal() as db:
+            results = [
+                await add_item(db, user_id, item_id, 2),
+                await add_item(db, user_id, item_id, 3),
+                await remove_item(db, user_id, item_id, 10),
+                await remove_item(db, user_id, item_id, 4),
+                await remove_item(db, user_id, item_id, 1),
+            ]
+            await db.commit()
+            return results
+
+    assert asyncio.run(run()) == [2, 5, None, 1, 0]
+    assert world.query(PlayerInventory).count() == 0
+
+
+def test_remove_item_guard_spans_sessions(world):
+    """Test that two sessions taking the last item can't both get it"""
+    user_id, item_id = make_user(world)
+    world.add(PlayerInventory(user_id=user_id, item_id=item_id, quantity=1))
+    world.commit()
+
+    async def take():
+        async with AsyncTestingSessionLocal() as db:
+            remaining = await remove_item(db, user_id, item_id, 1)
+            await db.commit()
+            return remaining
+
+    async def run():
+        return [await take(), await take()]
+
+    assert asyncio.run(run()) == [0, None]
+
+
+def test_spend_coins_never_overdraws(world):
+    """Test that spending is refused once the balance is too low"""
+    user_id, _ = make_user(world, coins=30)
+
+    async def run():
+        async with AsyncTestingSessionLocal() as db:
+            user = await db.get(User, user_id)
+            results = [await spend_coins(db, user, 20), await spend_coins(db, user, 20)]
+            await db.commit()
+            return results, user.coins
+
+    assert asyncio.run(run()) == ([10, None], 10)
+
+
+@pytest.mark.parametrize("amount", [0, -5])
+def test_non_positive_amounts_are_rejected(world, amount):
+    """Test that a negative removal or spend can't be used to grant items or coins"""
+    user_id, item_id = make_user(world, coins=30)
+
+    async def run():
+        async with AsyncTestingSessionLocal() as db:
+            user = await db.get(User, user_id)
+            for write in (
+                add_item(db, user_id, item_id, amount),
+                remove_item(db, user_id, item_id, amount),
+                spend_coins(db, user, amount),
+            ):
+                with pytest.raises(ValueError):
+                    await write
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("path,body", [
+    ("/api/inventory/drop", {"item_id": "health_potion", "quantity": -3}),
+    ("/api/npcs/merchant_marcus/shop/sell", {"item_id": "health_potion", "quantity": -3}),
+    ("/api/npcs/merchant_marcus/shop/buy", {"item_id": "health_potion", "quantity": 0}),
+])
+def test_non_positive_quantities_are_422(client: TestClient, world, path, body):
+    """Test the request schemas: quantities start at 1"""
+    assert client.post(path, json=body).status_code == 422
+
+
+def test_deduct_coins_clamps_at_zero(world):
+    """Test that a deduction larger than the balance leaves zero, not a negative balance"""
+    user_id, _ = make_user(world, coins=30)
+
+    async def run():
+        async with AsyncTestingSessionLocal() as db:
+            user = await db.get(User, user_id)
+            results = [await deduct_coins(db, user, 20), await deduct_coins(db, user, 20)]
+            await db.commit()
+            return results, user.coins
+
+    assert asyncio.run(run()) == ([10, 0], 0)
+
+
+def test_purchase_character_without_coins_is_refused(client: TestClient, world):
+    """Test that a character purchase goes through the guarded spend"""
+    world.add(Character(name="knight", display_name="Knight", sprite_key="knight", coin_cost=50))
+    world.commit()
+    client.get("/api/world/state")
+    knight = world.query(Character).one()
+
+    response = client.post("/api/characters/purchase", json={"character_id": knight.id})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Not enough coins"
+
+    client.post("/api/dev/give-gold", params={"amount": 80})
+    response = client.post("/api/characters/purchase", json={"character_id": knight.id})
+    assert response.json() == {"success": True, "remaining_coins": 30}
+    world.expire_all()
+    assert world.query(User).one().selected_character_id == knight.id
+
+
+def test_sell_equipped_item_is_refused(client: TestClient, world):
+    """Test that a guarded removal still reports equipped stacks"""
+    client.get("/api/world/state")
+    user = world.query(User).first()
+    sword = world.query(Item).filter(Item.item_id == "wooden_sword").first()
+    world.add(PlayerInventory(user_id=user.id, item_id=sword.id, quantity=1, is_equipped=True))
+    world.commit()
+
+    response = client.post("/api/npcs/merchant_marcus/shop/sell", json={"item_id": "wooden_sword", "quantity": 1})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cannot sell equipped items"
+
+    response = client.post("/api/npcs/merchant_marcus/shop/sell", json={"item_id": "wooden_sword", "quantity": 2})
+    assert response.json()["detail"] == "Not enough items"
+
+
+def test_buy_without_gold_changes_nothing(client: TestClient, world):
+    """Test that a refused purchase neither charges nor grants"""
+    response = client.post("/api/npcs/merchant_marcus/shop/buy", json={"item_id": "health_potion", "quantity": 1000})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Not enough gold"
+    assert client.get("/api/inventory").json()["items"] == []
+
+
+def test_list_stacks_returns_plain_rows(world):
+    """Test the inventory listing: only this user's stacks, as tuples"""
+    user_id, potion_id = make_user(world)
+    world.add(PlayerInventory(user_id=user_id, item_id=potion_id, quantity=3, is_equipped=False))
+    world.commit()
+
+    async def run():
+        async with AsyncTestingSessionLocal() as db:
+            return [tuple(row) for row in await list_stacks(db, user_id)], await list_stacks(db, user_id + 1)
+
+    assert asyncio.run(run()) == ([(potion_id, 3, False)], [])
+
+
+def test_level_summaries_join_only_this_users_progress(world):
+    """Test one row per level in order, with progress columns only for the given user"""
+    user_id, _ = make_user(world)
+    other = User(email="other@example.com", password_hash="x")
+    first = Level(slug="first", title="First", order_index=1, json_data={})
+    second = Level(slug="second", title="Second", order_index=2, json_data={})
+    world.add_all([other, first, second])
+    world.flush()
+    world.add_all([
+        Progress(user_id=user_id, level_id=first.id, attempts=2, completed_at=datetime(2026, 1, 1)),
+        Progress(user_id=other.id, level_id=second.id, attempts=5),
+    ])
+    world.commit()
+
+    rows = progress_repo.list_level_summaries(world, user_id)
+    assert [(row.slug, row.attempts, row.completed_at is not None) for row in rows] == [
+        ("first", 2, True),
+        ("second", None, False),
+    ]
+    assert progress_repo.get_level_progress(world, user_id, first.id).attempts == 2
+    assert progress_repo.get_level_progress(world, user_id, second.id) is None
+
+
+def test_fast_path_reuses_compiled_statement(db):
+    """Test that repeated calls hit the engine's compiled-statement cache"""
+    cache_hits = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        cache_hits.append(context.cache_hit)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        progress_repo.list_level_summaries(db, 1)
+        progress_repo.list_level_summaries(db, 2)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert cache_hits[-1] == db.get_bind().dialect.CACHE_HIT
@@ -0,0 +1,39 @@
+"""Tests for the spatial grid index"""
+
+import random
+
+from app.services.spatial import SpatialEntry, SpatialGrid
+
+
+def make_entry(seq: int, x: int, y: int) -> SpatialEntry:
+    return SpatialEntry(seq, "npc", str(seq), f"NPC {seq}", x, y)
+
+
+def test_query_matches_linear_scan():
+    """Test that grid queries return exactly what a full scan would"""
+    rng = random.Random(7)
+    entries = [make_entry(i, rng.randrange(200), rng.randrange(200)) for i in range(2000)]
+    grid = SpatialGrid(entries, cell_size=10)
+
+    for _ in range(50):
+        x, y, radius = rng.randrange(-20, 220), rng.randrange(-20, 220), rng.randrange(0, 30)
+        expected = [
+            (e, abs(e.x - x) + abs(e.y - y))
+            for e in entries
+            if abs(e.x - x) + abs(e.y - y) <= radius
+        ]
+        assert grid.query(x, y, radius) == expected
+
+
+def test_query_radius_is_inclusive():
+    """Test that entities exactly at the radius are included"""
+    grid = SpatialGrid([make_entry(0, 10, 0), make_entry(1, 11, 0)], cell_size=4)
+    assert [e.seq for e, _ in grid.query(0, 0, 10)] == [0]
+
+
+def test_world_state_uses_zone_index(client, world):
+    """Test that /world/state reports seeded entities near the spawn point"""
+    data = client.get("/api/world/state").json()
+    nearby = data["nearby_enemies"] + data["nearby_npcs"] + data["nearby_chests"]
+    assert nearby
+    assert all(e["distance"] <= 10 for e in nearby)
@@ -0,0 +1,159 @@
+"""Tests for the SQLite WAL profile and single-writer gate"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.database import configure_sqlite
+
+
+@pytest.fixture
+def db_path():
+    path = os.path.join(tempfile.mkdtemp(), "profile.db")
+    yield path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def make_counter(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE counter (id INTEGER PRIMARY KEY, n INTEGER NOT NULL)"))
+        conn.execute(text("INSERT INTO counter (id, n) VALUES (1, 0)"))
+
+
+def test_pragmas_applied_on_connect(db_path):
+    """Test that every new connection gets the WAL profile"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    configure_sqlite(engine)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -settings.SQLITE_CACHE_SIZE_KB
+    engine.dispose()
+
+
+def test_threaded_writers_queue_on_the_gate(db_path):
+    """Test that concurrent read-then-write transactions neither fail nor lose the gate"""
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    gate = configure_sqlite(engine)
+    make_counter(engine)
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(25):
+                with engine.begin() as conn:
+                    conn.execute(text("SELECT n FROM counter WHERE id = 1")).scalar()
+                    conn.execute(text("UPDATE counter SET n = n + 1 WHERE id = 1"))
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT n FROM counter")).scalar() == 200
+    assert not gate._lock.locked()
+
+    # A rolled-back write hands the gate back too
+    with engine.connect() as conn:
+        conn.execute(text("UPDATE counter SET n = 0"))
+        assert gate._lock.locked()
+        conn.rollback()
+    assert not gate._lock.locked()
+    engine.dispose()
+
+
+def test_async_writers_share_one_gate(db_path):
+    """Test the aiosqlite engine: concurrent tasks write in turn on the event loop"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    configure_sqlite(engine.sync_engine)
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE counter (id INTEGER PRIMARY KEY, n INTEGER NOT NULL)"))
+            await conn.execute(text("INSERT INTO counter (id, n) VALUES (1, 0)"))
+
+        async def writer():
+            async with engine.begin() as conn:
+                await conn.execute(text("UPDATE counter SET n = n + 1 WHERE id = 1"))
+                await asyncio.sleep(0)  # Let the other tasks reach the gate
+
+        await asyncio.gather(*(writer() for _ in range(20)))
+        async with engine.connect() as conn:
+            count = (await conn.execute(text("SELECT n FROM counter"))).scalar()
+        await engine.dispose()
+        return count
+
+    assert asyncio.run(run()) == 20
+
+
+def test_sync_and_async_engines_share_the_files_gate(db_path, monkeypatch):
+    """Test sync threads and async tasks writing one file at once: they queue on one gate"""
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 0)  # Any write that skipped the gate would fail
+    sync_engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    gate = configure_sqlite(sync_engine)
+    assert configure_sqlite(async_engine.sync_engine) is gate
+    make_counter(sync_engine)
+    errors = []
+
+    def sync_writer():
+        try:
+            for _ in range(20):
+                with sync_engine.begin() as conn:
+                    conn.execute(text("SELECT n FROM counter WHERE id = 1")).scalar()
+                    conn.execute(text("UPDATE counter SET n = n + 1 WHERE id = 1"))
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    async def async_writers():
+        async def writer():
+            for _ in range(20):
+                async with async_engine.begin() as conn:
+                    await conn.execute(text("UPDATE counter SET n = n + 1 WHERE id = 1"))
+                    await asyncio.sleep(0)
+
+        await asyncio.gather(*(writer() for _ in range(4)))
+        await async_engine.dispose()
+
+    threads = [threading.Thread(target=sync_writer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    asyncio.run(async_writers())
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with sync_engine.connect() as conn:
+        assert conn.execute(text("SELECT n FROM counter")).scalar() == 160
+    assert not gate._lock.locked()
+    sync_engine.dispose()
+
+
+def test_gate_wait_has_its_own_budget(db_path, monkeypatch):
+    """Test that a writer gives up on the gate after SQLITE_WRITE_GATE_TIMEOUT_MS, not busy_timeout"""
+    monkeypatch.setattr(settings, "SQLITE_WRITE_GATE_TIMEOUT_MS", 50)
+    engine = create_engine(f"sqlite:///{db_path}")
+    gate = configure_sqlite(engine)
+    assert gate.timeout == 0.05
+
+    release = gate.acquire(is_async=False)
+    started = time.perf_counter()
+    assert gate.acquire(is_async=False) is None
+    assert time.perf_counter() - started < settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+    release()
+    engine.dispose()
@@ -0,0 +1,73 @@
+"""Tests for the request-scoped unit of work (one COMMIT per request)"""
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.database import get_async_db
+from app.core.deps import AsyncDbSession
+from app.models import EnemySpawn, Level
+from tests.conftest import count_commits, override_get_async_db
+
+
+WRITE_REQUESTS = [
+    ("/api/auth/signup", {"email": "uow@example.com", "password": "secret123"}),
+    ("/api/progress/attempt", {"level_id": 1}),
+    ("/api/progress/complete", {"level_id": 1, "run_data": {"action_count": 3}}),
+    ("/api/npcs/merchant_marcus/shop/buy", {"item_id": "health_potion", "quantity": 1}),
+    ("/api/chests/open", {"chest_id": "starter_chest_1"}),
+    ("/api/world/transition", {"target_zone_slug": "peaceful-meadow"}),
+]
+
+
+@pytest.fixture
+def level(world):
+    world.add(Level(slug="uow-level", title="UoW", order_index=1, json_data={}))
+    world.commit()
+    return world
+
+
+@pytest.mark.parametrize("path,payload", WRITE_REQUESTS)
+def test_write_request_commits_once(client: TestClient, level, path, payload):
+    """Test that a write endpoint ends in exactly one COMMIT"""
+    client.post("/api/dev/give-gold", params={"amount": 100})
+    with count_commits() as commits:
+        response = client.post(path, json=payload)
+    assert response.status_code < 400, response.text
+    assert len(commits) == 1
+
+
+def test_combat_turns_commit_once(client: TestClient, world):
+    """Test combat start and each action (including the final blow) commit once"""
+    client.post("/api/dev/set-level", params={"level": 20})
+    spawn = world.query(EnemySpawn).first()
+    with count_commits() as commits:
+        session_id = client.post("/api/combat/start", json={"enemy_spawn_id": spawn.id}).json()["session_id"]
+    assert len(commits) == 1
+
+    for _ in range(100):
+        with count_commits() as commits:
+            data = client.post("/api/combat/action", json={"session_id": session_id, "action": "attack"}).json()
+        assert len(commits) == 1
+        if data["combat_ended"]:
+            break
+
+
+def test_commit_after_handler_and_rollback_on_error(db):
+    """Test the dependency itself: handlers never commit, errors leave nothing behind"""
+    app = FastAPI()
+
+    @app.post("/levels/{slug}")
+    async def add_level(slug: str, db: AsyncDbSession, fail: bool = False):
+        db.add(Level(slug=slug, title=slug, order_index=1, json_data={}))
+        await db.flush()
+        if fail:
+            raise HTTPException(status_code=400, detail="Nope")
+        return {"slug": slug}
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as client:
+        assert client.post("/levels/kept").status_code == 200
+        assert client.post("/levels/dropped", params={"fail": True}).status_code == 400
+
+    assert [level.slug for level in db.query(Level)] == ["kept"]
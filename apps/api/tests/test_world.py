@@ -0,0 +1,96 @@
+"""Tests for the RPG world and combat endpoints"""
+
+from fastapi.testclient import TestClient
+
+
+def test_world_state_assigns_starting_zone(client: TestClient, world):
+    """Test that a new player is placed in the starting zone"""
+    response = client.get("/api/world/state")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["player"]["zone_slug"] == "peaceful-meadow"
+    assert "zone" not in data
+
+    zone = client.get(f"/api/world/zones/peaceful-meadow@{data['zone_hash']}").json()
+    assert data["player"]["position"] == {"x": zone["spawn_x"], "y": zone["spawn_y"]}
+
+
+def test_hashed_zone_is_immutable(client: TestClient, world):
+    """Test that content-addressed zone URLs carry strong ETags and immutable caching"""
+    zone_hash = client.get("/api/world/state").json()["zone_hash"]
+
+    response = client.get(f"/api/world/zones/peaceful-meadow@{zone_hash}")
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{zone_hash}"'
+    assert "immutable" in response.headers["cache-control"]
+    assert response.json()["slug"] == "peaceful-meadow"
+
+    response = client.get(
+        f"/api/world/zones/peaceful-meadow@{zone_hash}",
+        headers={"If-None-Match": f'"{zone_hash}"'},
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_stale_zone_hash(client: TestClient, world):
+    """Test that an outdated zone hash is not served"""
+    response = client.get("/api/world/zones/peaceful-meadow@0000000000000000")
+    assert response.status_code == 404
+
+
+def test_unhashed_zone_must_revalidate(client: TestClient, world):
+    """Test that the plain slug URL is revalidated rather than cached forever"""
+    response = client.get("/api/world/zones/peaceful-meadow")
+    assert response.status_code == 200
+    assert "immutable" not in response.headers["cache-control"]
+    assert response.headers["etag"]
+
+
+def test_move_updates_position(client: TestClient, world):
+    """Test that moving persists the new position"""
+    client.get("/api/world/state")
+
+    response = client.post("/api/world/move", json={"x": 10, "y": 12})
+    assert response.status_code == 200
+
+    data = client.get("/api/world/state").json()
+    assert data["player"]["position"] == {"x": 10, "y": 12}
+
+
+def test_move_out_of_bounds(client: TestClient, world):
+    """Test that moving outside the zone is rejected"""
+    client.get("/api/world/state")
+
+    response = client.post("/api/world/move", json={"x": -1, "y": 0})
+    assert response.status_code == 400
+
+
+def test_combat_start_and_attack(client: TestClient, world):
+    """Test starting a fight and attacking"""
+    from app.models import EnemySpawn
+    spawn = world.query(EnemySpawn).first()
+
+    response = client.post("/api/combat/start", json={"enemy_spawn_id": spawn.id})
+    assert response.status_code == 200
+    assert response.json()["enemy"]["hp"] > 0
+    session_id = response.json()["session_id"]
+
+    response = client.post("/api/combat/action", json={"session_id": session_id, "action": "attack"})
+    assert response.status_code == 200
+    assert response.json()["player_damage"]["amount"] > 0
+
+
+def test_shop_buy_and_inventory(client: TestClient, world):
+    """Test buying from a merchant and seeing the item in the inventory"""
+    from app.models import NPC
+    merchant = world.query(NPC).filter(NPC.is_shopkeeper == True).first()
+    shop = client.get(f"/api/npcs/{merchant.npc_id}/shop").json()
+    item_id = shop["items"][0]["item_id"]
+
+    client.post("/api/dev/give-gold", params={"amount": 1000})
+    response = client.post(f"/api/npcs/{merchant.npc_id}/shop/buy", json={"item_id": item_id, "quantity": 2})
+    assert response.status_code == 200
+
+    inventory = client.get("/api/inventory").json()
+    assert any(i["id"] == item_id and i["quantity"] == 2 for i in inventory["items"])
@@ -12,6 +12,7 @@ import {
 
 interface CombatState {
   isInCombat: boolean;
+  sessionId: string | null;
   enemy: EnemyStats | null;
   enemyHp: number;
   playerHp: number;
@@ -46,6 +47,7 @@ export function WorldProvider({ children }: { children: ReactNode }) {
   const [inventory, setInventory] = useState<InventoryResponse | null>(null);
   const [combatState, setCombatState] = useState<CombatState>({
     isInCombat: false,
+    sessionId: null,
     enemy: null,
     enemyHp: 0,
     playerHp: 0,
@@ -94,6 +96,7 @@ export function WorldProvider({ children }: { children: ReactNode }) {
       const result: CombatStartResponse = await api.startCombat(enemySpawnId);
       setCombatState({
         isInCombat: true,
+        sessionId: result.session_id,
         enemy: result.enemy,
         enemyHp: result.enemy.hp,
         playerHp: result.player_hp,
@@ -112,8 +115,11 @@ export function WorldProvider({ children }: { children: ReactNode }) {
     action: string,
     itemId?: string
   ): Promise<CombatActionResponse | null> => {
+    if (!combatState.sessionId) {
+      return null;
+    }
     try {
-      const result = await api.combatAction(action, itemId);
+      const result = await api.combatAction(combatState.sessionId, action, itemId);
 
       setCombatState(prev => ({
         ...prev,
@@ -122,6 +128,7 @@ export function WorldProvider({ children }: { children: ReactNode }) {
         lastPlayerAction: result.player_action_result,
         lastEnemyAction: result.enemy_action_result,
         isInCombat: !result.combat_ended,
+        sessionId: result.combat_ended ? null : prev.sessionId,
         enemy: result.combat_ended ? null : prev.enemy,
       }));
 
@@ -135,7 +142,7 @@ export function WorldProvider({ children }: { children: ReactNode }) {
       console.error('Combat action failed:', err);
       return null;
     }
-  }, [loadWorldState, loadInventory]);
+  }, [combatState.sessionId, loadWorldState, loadInventory]);
 
   const useItem = useCallback(async (itemId: string): Promise<boolean> => {
     try {
@@ -10,6 +10,8 @@ interface ApiError {
 
 class ApiClient {
   private baseUrl: string;
+  // Zone payloads keyed by "slug@hash"; a given key never changes content
+  private zoneCache = new Map<string, ZoneResponse>();
 
   constructor(baseUrl: string) {
     this.baseUrl = baseUrl;
@@ -128,8 +130,21 @@ class ApiClient {
   }
 
   // World endpoints
-  async getWorldState() {
-    return this.request<WorldStateResponse>('/api/world/state');
+  async getWorldState(): Promise<WorldStateResponse> {
+    const state = await this.request<WorldStateSnapshot>('/api/world/state');
+    const zone = await this.getZoneVersion(state.player.zone_slug, state.zone_hash);
+    return { ...state, zone };
+  }
+
+  async getZoneVersion(zoneSlug: string, zoneHash: string) {
+    const key = `${zoneSlug}@${zoneHash}`;
+    const cached = this.zoneCache.get(key);
+    if (cached) {
+      return cached;
+    }
+    const zone = await this.request<ZoneResponse>(`/api/world/zones/${key}`);
+    this.zoneCache.set(key, zone);
+    return zone;
   }
 
   async getZone(zoneSlug: string) {
@@ -165,10 +180,10 @@ class ApiClient {
     });
   }
 
-  async combatAction(action: string, itemId?: string) {
+  async combatAction(sessionId: string, action: string, itemId?: string) {
     return this.request<CombatActionResponse>('/api/combat/action', {
       method: 'POST',
-      body: JSON.stringify({ action, item_id: itemId }),
+      body: JSON.stringify({ session_id: sessionId, action, item_id: itemId }),
     });
   }
 
@@ -337,15 +352,20 @@ export interface ZoneResponse {
   connections: ZoneConnection[];
 }
 
-export interface WorldStateResponse {
+// Raw /api/world/state payload; static zone data is fetched separately by hash
+export interface WorldStateSnapshot {
   player: PlayerWorldState;
-  zone: ZoneResponse;
+  zone_hash: string;
   nearby_enemies: NearbyEntity[];
   nearby_npcs: NearbyEntity[];
   nearby_chests: NearbyEntity[];
   nearby_items: NearbyEntity[];
 }
 
+export interface WorldStateResponse extends WorldStateSnapshot {
+  zone: ZoneResponse;
+}
+
 // Combat Types
 export interface EnemyStats {
   id: string;
@@ -377,6 +397,7 @@ export interface LootItem {
 export interface CombatStartResponse {
   success: boolean;
   message: string;
+  session_id: string;
   enemy: EnemyStats;
   player_hp: number;
   player_max_hp: number;